@@ -0,0 +1,17 @@
+# Packages
+import pytest
+
+# Locals
+from benchmarks.fixtures import create_config, create_feeds
+
+
+@pytest.fixture(scope="session")
+def feeds():
+    return create_feeds()
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = create_config(str(tmp_path))
+    (tmp_path / config["opt_name"]).mkdir()
+    return config
@@ -0,0 +1,124 @@
+# Libraries
+import json
+import os
+from typing import Any, Dict, List
+
+# Packages
+import numpy as np
+
+# Locals
+from oandatradingbot.optimizer.engine import RESULTS_FILE
+from oandatradingbot.types.config import ConfigType
+from tests.feeds import create_feed, create_higher_frame
+
+# Number of 5 minutes bars of every benchmark feed (about 3 weeks)
+BARS = 6000
+INSTRUMENTS = ["EUR_USD", "EUR_GBP"]
+
+strategy_params = {
+    "macd_fast_ema": 5,
+    "macd_slow_ema": 26,
+    "macd_signal_ema": 8,
+    "ema_period": 200,
+    "atr_period": 14,
+    "atr_distance": 1.5,
+    "profit_risk_ratio": 1.5,
+}
+
+
+def create_config(results_path: str) -> ConfigType:
+    return {
+        "results_path": results_path,
+        "opt_name": "Optimization_benchmark",
+        "instruments": INSTRUMENTS,
+        "cash": 10000,
+        "risk": 1,
+        "account_currency": "EUR",
+        "language": "EN-US",
+        "timeframes": [
+            {"timeframe": "Minutes", "compression": 5, "interval": "5m"},
+            {"timeframe": "Minutes", "compression": 60, "interval": "60m"}
+        ],
+        "optimize": True,
+        "debug": False,
+    }
+
+
+def create_feeds(bars: int = BARS) -> Dict[str, List[Any]]:
+    """Deterministic random walk feeds of every benchmark instrument and
+    their 60 minutes frames"""
+    feeds = {}
+    for seed, instrument in enumerate(INSTRUMENTS, start=17):
+        feed = create_feed(seed, bars)
+        feeds[instrument] = [feed, create_higher_frame(feed)]
+    return feeds
+
+
+def create_results(
+    results_path: str, strategies: int, seed: int = 0
+) -> str:
+    """Writes the results file of an optimization of ``strategies``
+    combinations, as the optimizer engine writes it, and returns its path"""
+    rng = np.random.default_rng(seed)
+    opt_folder = os.path.join(
+        results_path, create_config(results_path)["opt_name"]
+    )
+    os.makedirs(opt_folder, exist_ok=True)
+    results_file = os.path.join(opt_folder, RESULTS_FILE)
+    with open(results_file, "w") as file:
+        for i in range(strategies):
+            params = {
+                **strategy_params,
+                "macd_fast_ema": 5 + i % 10,
+                "ema_period": 100 + 10 * (i // 10),
+            }
+            name = (
+                f"MACDEMAATR_({params['macd_fast_ema']}-"
+                f"{params['macd_slow_ema']}-{params['macd_signal_ema']}-"
+                f"{params['ema_period']}-{params['atr_distance']})-"
+                f"{params['profit_risk_ratio']}-5m"
+            )
+            result: Dict[str, Any] = {
+                "Name": name,
+                "Trades": 0, "Won": 0, "Lost": 0,
+                "Long": 0, "Long won": 0, "Long lost": 0,
+                "Short": 0, "Short won": 0, "Short lost": 0,
+                "Total profit": 0.0, "Total loss": 0.0,
+            }
+            for instrument in INSTRUMENTS:
+                won, lost = (int(n) for n in rng.integers(5, 40, 2))
+                profit = won * float(rng.uniform(10, 30))
+                loss = lost * float(rng.uniform(10, 20))
+                long_won = won // 2
+                long_lost = lost // 2
+                result["Trades"] += won + lost
+                result["Won"] += won
+                result["Lost"] += lost
+                result["Long"] += long_won + long_lost
+                result["Long won"] += long_won
+                result["Long lost"] += long_lost
+                result["Short"] += won + lost - long_won - long_lost
+                result["Short won"] += won - long_won
+                result["Short lost"] += lost - long_lost
+                result["Total profit"] += profit
+                result["Total loss"] += loss
+                result[f"Trades {instrument}"] = won + lost
+                result[f"Won {instrument}"] = won
+                result[f"Lost {instrument}"] = lost
+                result[f"Returns {instrument}"] = profit - loss
+            result["SQN"] = float(rng.normal(0, 1))
+            result["Parameters"] = params
+            result["Window"] = [0.0, 1.0]
+            file.write(json.dumps(result) + "\n")
+    return results_file
+
+
+def record_rate(benchmark, unit: str, count: int) -> float:
+    """Stores in the benchmark results the ``unit`` processed per second,
+    given ``count`` units are processed per benchmarked call"""
+    if benchmark.stats is None:
+        # Benchmarks run as plain tests (--benchmark-disable)
+        return 0.0
+    rate: float = count / benchmark.stats.stats.mean
+    benchmark.extra_info[f"{unit} per second"] = round(rate, 2)
+    return rate
@@ -0,0 +1,164 @@
+# Libraries
+from typing import Any, Dict
+
+# Packages
+import backtrader as bt
+import pytest
+
+# Locals
+from benchmarks.fixtures import BARS, INSTRUMENTS, record_rate, \
+    strategy_params
+from oandatradingbot.optimizer.engine import create_cerebro
+from oandatradingbot.strategies.macd_ema_atr_backtest import MacdEmaAtrBackTest
+from oandatradingbot.strategies.macd_ema_atr_signals import \
+    MacdEmaAtrSignals, frame_arrays
+from oandatradingbot.utils.array_feed import ArrayData, arrays_from_frame
+from oandatradingbot.utils.feed_cache import compact_frame
+
+
+def run_backtest(config, feeds, **kwargs) -> MacdEmaAtrBackTest:
+    cerebro = create_cerebro(config, feeds)
+    cerebro.addstrategy(
+        MacdEmaAtrBackTest, **config, **strategy_params, **kwargs
+    )
+    strategy: MacdEmaAtrBackTest = cerebro.run()[0]
+    return strategy
+
+
+def test_backtest_bars(benchmark, config, feeds):
+    """Backtest computing the indicators and the entry checks per bar"""
+    strategy = benchmark.pedantic(
+        run_backtest, args=(config, feeds), rounds=3, iterations=1
+    )
+    assert strategy.optimization_results["Trades"] > 0
+    record_rate(benchmark, "bars", BARS * len(INSTRUMENTS))
+
+
+def precompute_signals(feeds) -> Dict[str, MacdEmaAtrSignals]:
+    signals = {}
+    for instrument in INSTRUMENTS:
+        arrays = frame_arrays(feeds[instrument][0])
+        arrays_higher_frame = frame_arrays(feeds[instrument][1])
+        signals[instrument] = MacdEmaAtrSignals(
+            arrays["high"],
+            arrays["low"],
+            arrays["close"],
+            strategy_params["macd_fast_ema"],
+            strategy_params["macd_slow_ema"],
+            strategy_params["macd_signal_ema"],
+            strategy_params["ema_period"],
+            strategy_params["atr_period"],
+            arrays_higher_frame["close"],
+        )
+    return signals
+
+
+def signals_bytes(signals: Dict[str, MacdEmaAtrSignals]) -> int:
+    return sum(
+        getattr(instrument_signals, name).nbytes
+        for instrument_signals in signals.values()
+        for name in ("macd", "signal", "ema", "atr", "slope_ema")
+    )
+
+
+def net_profit(results: Dict[str, Any]) -> float:
+    return round(results["Total profit"] - results["Total loss"], 2)
+
+
+def test_backtest_bars_precomputed_signals(benchmark, config, feeds):
+    """Backtest with the entry signals precomputed, as the optimizer runs
+    it"""
+    signals = precompute_signals(feeds)
+    strategy = benchmark.pedantic(
+        run_backtest,
+        args=(config, feeds),
+        kwargs={"signals": signals},
+        rounds=3,
+        iterations=1
+    )
+    assert strategy.optimization_results["Trades"] > 0
+    record_rate(benchmark, "bars", BARS * len(INSTRUMENTS))
+
+
+def test_backtest_compact_feeds(benchmark, config, feeds):
+    """Backtest with precomputed signals of float32 (compact) feeds. The
+    memory used by the feeds and the indicators and the results of the
+    float64 backtest are kept in the benchmark results to compare them"""
+    compact_feeds = {
+        instrument: [compact_frame(frame) for frame in frames]
+        for instrument, frames in feeds.items()
+    }
+    signals = precompute_signals(feeds)
+    compact_signals = precompute_signals(compact_feeds)
+    results = run_backtest(
+        config, feeds, signals=signals
+    ).optimization_results
+    compact_results = benchmark.pedantic(
+        lambda: run_backtest(
+            config, compact_feeds, signals=compact_signals
+        ).optimization_results,
+        rounds=3,
+        iterations=1
+    )
+
+    benchmark.extra_info.update({
+        "feeds bytes": int(sum(
+            frame.memory_usage().sum()
+            for frames in compact_feeds.values() for frame in frames
+        )),
+        "float64 feeds bytes": int(sum(
+            frame.memory_usage().sum()
+            for frames in feeds.values() for frame in frames
+        )),
+        "indicators bytes": signals_bytes(compact_signals),
+        "float64 indicators bytes": signals_bytes(signals),
+        "trades": compact_results["Trades"],
+        "float64 trades": results["Trades"],
+        "net profit": net_profit(compact_results),
+        "float64 net profit": net_profit(results),
+    })
+    assert compact_results["Trades"] > 0
+    record_rate(benchmark, "bars", BARS * len(INSTRUMENTS))
+
+
+def test_signals_bars(benchmark, feeds):
+    """Vectorized entry signals of every instrument"""
+    arrays = [
+        (frame_arrays(frames[0]), frame_arrays(frames[1]))
+        for frames in feeds.values()
+    ]
+
+    def compute_signals():
+        for lower, higher in arrays:
+            MacdEmaAtrSignals(
+                lower["high"],
+                lower["low"],
+                lower["close"],
+                strategy_params["macd_fast_ema"],
+                strategy_params["macd_slow_ema"],
+                strategy_params["macd_signal_ema"],
+                strategy_params["ema_period"],
+                strategy_params["atr_period"],
+                higher["close"],
+            )
+
+    benchmark(compute_signals)
+    record_rate(benchmark, "bars", BARS * len(INSTRUMENTS))
+
+
+@pytest.mark.parametrize("feed", ["pandas", "arrays"])
+def test_feed_bars(benchmark, feeds, feed):
+    """Bars loaded by backtrader from the DataFrame and the array feeds,
+    without strategy"""
+    def load_feeds():
+        cerebro = bt.Cerebro(stdstats=False)
+        for frames in feeds.values():
+            data = bt.feeds.PandasData(dataname=frames[0]) \
+                if feed == "pandas" \
+                else ArrayData(dataname=arrays_from_frame(frames[0]))
+            cerebro.adddata(data)
+        cerebro.addstrategy(bt.Strategy)
+        cerebro.run()
+
+    benchmark.pedantic(load_feeds, rounds=3, iterations=1)
+    record_rate(benchmark, "bars", BARS * len(INSTRUMENTS))
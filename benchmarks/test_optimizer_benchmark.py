@@ -0,0 +1,42 @@
+# Locals
+from benchmarks.fixtures import create_results, record_rate, strategy_params
+from oandatradingbot.optimizer.engine import OptimizerEngine, \
+    parameter_grid, parameter_values
+from oandatradingbot.optimizer.summarizer_opt import Summarizer
+
+# 2 indicator groups of 2 combinations each
+combinations = parameter_grid(parameter_values({
+    **strategy_params,
+    "macd_fast_ema": [5, 8],
+    "atr_distance": [1.0, 1.5],
+}))
+
+
+def test_optimizer_combinations(benchmark, config, feeds):
+    with OptimizerEngine(config, feeds) as engine:
+        results = benchmark.pedantic(
+            engine.evaluate, args=(combinations,), rounds=2, iterations=1
+        )
+    assert len(results) == len(combinations)
+    record_rate(benchmark, "combinations", len(combinations))
+
+
+def test_summarizer_results(benchmark, config):
+    """Summary workbook of an optimization of 500 combinations"""
+    create_results(config["results_path"], 500)
+    summarizer = Summarizer(config)
+
+    benchmark(summarizer.save_optimization_results)
+    record_rate(benchmark, "combinations", 500)
+
+
+def test_summarizer_plots(benchmark, config):
+    create_results(config["results_path"], 500)
+    summarizer = Summarizer(config)
+    summarizer.save_optimization_results()
+
+    def save_plots():
+        summarizer.save_instruments_plots()
+        summarizer.parameters_plots()
+
+    benchmark.pedantic(save_plots, rounds=2, iterations=1)
@@ -0,0 +1,86 @@
+# Libraries
+from datetime import datetime, timedelta, timezone
+
+# Locals
+from benchmarks.fixtures import INSTRUMENTS, record_rate
+from oandatradingbot.types.api_transaction import empty_transaction
+from oandatradingbot.utils.instrument_manager import InstrumentManager
+from oandatradingbot.utils.transaction_manager import TransactionManager
+
+# Trades opened and closed per benchmarked call
+TRADES = 100
+# Transactions per trade: submitted, filled, TK, SL, SL replaced and TK hit
+TRANSACTIONS = 6
+
+
+def get_instrument_units(self, instruments):
+    # The pip units of the instruments are not requested to Oanda
+    self.units = {instrument: 1e4 for instrument in instruments}
+
+
+def create_transaction(**fields):
+    return {**empty_transaction, **fields}
+
+
+def trade_transactions(trade_id: int, instrument: str):
+    entry_time = datetime(2022, 10, 3, tzinfo=timezone.utc) \
+        + timedelta(minutes=5 * trade_id)
+    entry = str(entry_time.timestamp())
+    exit = str((entry_time + timedelta(minutes=30)).timestamp())
+    id = str(trade_id)
+    return [
+        ("market_order_submitted", create_transaction(
+            id=id, instrument=instrument, units="1000"
+        )),
+        ("register_market_order", create_transaction(
+            id=id, instrument=instrument, units="1000", price="1.1000",
+            time=entry
+        )),
+        ("register_take_profit_order", create_transaction(
+            tradeID=id, price="1.1020", time=entry
+        )),
+        ("register_stop_loss_order", create_transaction(
+            tradeID=id, price="1.0990", time=entry
+        )),
+        ("replace_stop_loss_order", create_transaction(
+            tradeID=id, price="1.0995", time=entry
+        )),
+        ("take_profit_order_completed", create_transaction(
+            instrument=instrument, units="-1000", price="1.1020", pl="2.0",
+            time=exit, tradesClosed=[{"tradeID": id}]
+        )),
+    ]
+
+
+def test_transaction_manager(benchmark, monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        InstrumentManager, "_get_instrument_units", get_instrument_units
+    )
+    transaction_manager = TransactionManager({
+        "instruments": INSTRUMENTS,
+        "practice": True,
+        "oanda_token": "",
+        "oanda_account_id": "",
+        "language": "EN-US",
+        "account_currency": "EUR",
+        "database_uri": f"sqlite:///{tmp_path / 'benchmark.db'}",
+        "account_type": "Demo",
+    })
+    for instrument in INSTRUMENTS:
+        transaction_manager._reset_instrument_order("BUY", instrument)
+        transaction_manager._reset_instrument_order("SELL", instrument)
+    # Every round trades new ids since the trades are saved in the database
+    trade_ids = iter(range(1, 10**9))
+
+    def process_transactions():
+        for _ in range(TRADES):
+            trade_id = next(trade_ids)
+            instrument = INSTRUMENTS[trade_id % len(INSTRUMENTS)]
+            for method, transaction in trade_transactions(
+                trade_id, instrument
+            ):
+                assert getattr(transaction_manager, method)(transaction)
+
+    benchmark.pedantic(process_transactions, rounds=5, iterations=1)
+    assert transaction_manager.repository.get_trade(1) is not None
+    record_rate(benchmark, "transactions", TRADES * TRANSACTIONS)
@@ -0,0 +1,369 @@
+# Libraries
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta, timezone
+from functools import partial
+import math
+from threading import Event, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+# Packages
+import numpy as np
+
+# Locals
+from oandatradingbot.strategies.macd_ema_atr_live import MacdEmaAtrLive
+from oandatradingbot.strategies.macd_ema_atr_signals import \
+    FloatArray, MacdEmaAtrSignals
+from oandatradingbot.types.api_transaction import ApiTransactionType
+from oandatradingbot.types.config import ConfigType
+from oandatradingbot.types.order import OperationType
+from oandatradingbot.utils.instrument_manager import InstrumentManager, \
+    use_price_stream
+from oandatradingbot.utils.oanda_candles import UNIX_TIMES, bar_seconds, \
+    granularity
+from oandatradingbot.utils.oanda_client import POOL_SIZE, get_client
+from oandatradingbot.utils.order_manager import OrderManager
+from oandatradingbot.utils.telegram_bot import TelegramBot
+
+T = TypeVar("T")
+
+# Complete candles requested per time frame, enough to warm up the
+# indicators
+CANDLES = 500
+# Seconds to wait after a bar closes so OANDA has completed the candle
+CANDLE_DELAY = 2.0
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+CandlesType = Dict[str, FloatArray]
+
+
+def seconds_until(at: time, weekdays: List[int], now: datetime) -> float:
+    """Seconds from ``now`` to the next time ``at`` of one of the ISO
+    ``weekdays`` (every day if empty)"""
+    for days in range(8):
+        when = datetime.combine(now.date() + timedelta(days=days), at)
+        if when > now and (
+            len(weekdays) == 0 or when.isoweekday() in weekdays
+        ):
+            return (when - now).total_seconds()
+    return 7 * 24 * 60 * 60
+
+
+def fresh_candle(candle_time: float, seconds: int, now: float) -> bool:
+    """Whether the candle starting at ``candle_time`` closed less than a bar
+    before ``now``"""
+    return now - (candle_time + seconds) < seconds
+
+
+def parse_candles(response: Dict[str, Any]) -> CandlesType:
+    """Time, high, low and close arrays of the complete candles"""
+    candles = [c for c in response["candles"] if c["complete"]]
+    return {
+        "time": np.array([float(c["time"]) for c in candles]),
+        "high": np.array([float(c["mid"]["h"]) for c in candles]),
+        "low": np.array([float(c["mid"]["l"]) for c in candles]),
+        "close": np.array([float(c["mid"]["c"]) for c in candles]),
+    }
+
+
+def position_size(
+    balance: float, risk: float, stop_loss: float, conversion: float
+) -> int:
+    """Units risking ``risk`` percent of the balance if the stop loss
+    distance (in the quote currency) is hit"""
+    if stop_loss <= 0 or conversion <= 0:
+        return 0
+    return math.floor(balance * risk / 100 / (stop_loss * conversion))
+
+
+class AsyncBot:
+    """Live trading engine running on asyncio instead of backtrader. The
+    complete candles of every instrument are requested concurrently at
+    every bar close and checked with the vectorized strategy signals, while
+    the transactions stream is dispatched to the OrderManager.
+
+    The blocking calls (REST requests, database writes, Telegram and TTS
+    notifications) run in thread pools, so a slow call never delays the
+    candles of the other instruments. The transactions, timers and other
+    side effects that change the OrderManager state run one at a time in
+    their own thread, in the order they are received.
+    """
+
+    def __init__(self, config: ConfigType) -> None:
+        self.config = config
+        self.testing = "testing" in config and config["testing"]
+        self.instruments = config["instruments"]
+        self.timeframes = config["timeframes"]
+        self.granularities = [granularity(t) for t in self.timeframes]
+        # Default parameters of the live strategy unless set in the config
+        defaults = MacdEmaAtrLive.params._getpairs()  # type: ignore
+        self.params: Dict[str, Any] = {
+            key: config.get(key, value) for key, value in defaults.items()
+        }
+        self.client = get_client(config)
+        self.instrument_manager = InstrumentManager(config)
+        self.telegram_bot = TelegramBot(config) \
+            if "telegram_token" in config else None
+        self.order_manager = OrderManager(config, self.telegram_bot)
+        self.io = ThreadPoolExecutor(POOL_SIZE)
+        self.serial = ThreadPoolExecutor(1)
+        self.last_candle: Dict[str, float] = {}
+        self.stopped = Event()
+
+    def log(self, text: str) -> None:
+        print(f"{datetime.strftime(datetime.now(), '%Y-%m-%d %H:%M:%S')} - "
+              f"{text}")
+
+    async def _io(self, func: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.io, partial(func, *args)
+        )
+
+    async def _serial(self, func: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.serial, partial(func, *args)
+        )
+
+    def _get_candles(self, instrument: str, granularity: str) -> CandlesType:
+        response = self.client.get(
+            f"/v3/instruments/{instrument}/candles",
+            params={
+                "granularity": granularity, "count": CANDLES, "price": "M"
+            },
+            headers=UNIX_TIMES
+        )
+        return parse_candles(response.json())
+
+    def _get_balance(self) -> float:
+        response = self.client.get(f"{self.client.account_path}/summary")
+        return float(response.json()["account"]["balance"])
+
+    def _create_order(
+        self, instrument: str, units: int, sl_price: float, tk_price: float
+    ) -> bool:
+        decimals = round(
+            math.log10(self.instrument_manager.get_units(instrument))
+        ) + 1
+        response = self.client.post(
+            f"{self.client.account_path}/orders",
+            json={"order": {
+                "type": "MARKET",
+                "instrument": instrument,
+                "units": str(units),
+                "timeInForce": "FOK",
+                "positionFill": "DEFAULT",
+                "stopLossOnFill": {"price": f"{sl_price:.{decimals}f}"},
+                "takeProfitOnFill": {"price": f"{tk_price:.{decimals}f}"},
+            }}
+        )
+        if response.status_code != 201:
+            self.log(
+                f"ERROR: {instrument} order not created: {response.text}"
+            )
+        return response.status_code == 201
+
+    async def check_instrument(self, instrument: str) -> Optional[bool]:
+        """Checks the entry signals on the last complete candle of the
+        instrument and creates the bracket order. Returns whether the order
+        was created, or None if there is no entry or no new, fresh candle.
+        Like the backtrader strategy, no order is created in test runs"""
+        frames: List[CandlesType] = await asyncio.gather(*(
+            self._io(self._get_candles, instrument, granularity)
+            for granularity in self.granularities
+        ))
+        candles = frames[0]
+        if len(candles["close"]) == 0 \
+                or self.last_candle.get(instrument) == candles["time"][-1]:
+            return None
+        self.last_candle[instrument] = candles["time"][-1]
+        # Like backtrader's live data, a candle that closed earlier (e.g. at
+        # startup) is not traded
+        if not fresh_candle(
+            candles["time"][-1],
+            bar_seconds(self.timeframes[0]),
+            datetime.now(timezone.utc).timestamp()
+        ):
+            return None
+
+        signals = MacdEmaAtrSignals(
+            candles["high"],
+            candles["low"],
+            candles["close"],
+            self.params["macd_fast_ema"],
+            self.params["macd_slow_ema"],
+            self.params["macd_signal_ema"],
+            self.params["ema_period"],
+            self.params["atr_period"],
+            frames[1]["close"] if len(frames) > 1 else None,
+        )
+        index = len(candles["close"]) - 1
+        index_higher_frame = len(frames[1]["close"]) - 1 \
+            if len(frames) > 1 else None
+
+        op_type: OperationType
+        if signals.enter_buy_signal(index, index_higher_frame) \
+                and not self.order_manager.has_buyed(instrument):
+            op_type = "BUY"
+        elif signals.enter_sell_signal(index, index_higher_frame) \
+                and not self.order_manager.has_selled(instrument):
+            op_type = "SELL"
+        else:
+            return None
+        if self.testing:
+            return None
+        return await self._enter(
+            instrument, op_type, float(candles["close"][-1]),
+            float(signals.atr[index])
+        )
+
+    async def _enter(
+        self, instrument: str, op_type: OperationType, close: float,
+        atr: float
+    ) -> bool:
+        stop_loss = atr * self.params["atr_distance"]
+        take_profit = stop_loss * self.params["profit_risk_ratio"]
+        price, balance, conversion = await asyncio.gather(
+            self._io(
+                self.instrument_manager.get_ask_price if op_type == "BUY"
+                else self.instrument_manager.get_bid_price,
+                instrument
+            ),
+            self._io(self._get_balance),
+            self._io(self.instrument_manager.get_home_conversion, instrument)
+        )
+        size = position_size(
+            balance, self.config["risk"], stop_loss, conversion
+        )
+        if size == 0:
+            return False
+        # Same prices as the backtrader strategy
+        if op_type == "BUY":
+            diff = price - close
+            sl_price = price - diff - stop_loss
+            tk_price = price - diff + take_profit
+        else:
+            diff = close - price
+            sl_price = price + diff + stop_loss
+            tk_price = price + diff - take_profit
+        if self.config["debug"]:
+            self.log(
+                f"Instrument: {instrument} - Close: {close} - "
+                f"{'Ask' if op_type == 'BUY' else 'Bid'}: {price:.5f} - "
+                f"ATR: {atr:.4f} - SL price: {sl_price:.5f} - "
+                f"TK price: {tk_price:.5f} - Size: {size}"
+            )
+        return await self._io(
+            self._create_order,
+            instrument,
+            size if op_type == "BUY" else -size,
+            sl_price,
+            tk_price
+        )
+
+    async def run_candles(self) -> None:
+        seconds = bar_seconds(self.timeframes[0])
+        while not self.stopped.is_set():
+            results = await asyncio.gather(
+                *(self.check_instrument(i) for i in self.instruments),
+                return_exceptions=True
+            )
+            for instrument, result in zip(self.instruments, results):
+                if isinstance(result, Exception):
+                    self.log(f"ERROR: {instrument} candles failed: {result}")
+            now = datetime.now(timezone.utc).timestamp()
+            await asyncio.sleep(seconds - now % seconds + CANDLE_DELAY)
+
+    async def dispatch_transaction(
+        self, transaction: ApiTransactionType
+    ) -> str:
+        if transaction["type"] == "HEARTBEAT":
+            return ""
+        if self.config["debug"]:
+            self.log(str(transaction))
+        response = await self._serial(
+            self.order_manager.manage_transaction, transaction
+        )
+        if response != "":
+            self.log(response)
+        return response
+
+    def _read_transactions(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: "asyncio.Queue[Dict[str, Any]]"
+    ) -> None:
+        delay = RECONNECT_DELAY
+        while not self.stopped.is_set():
+            try:
+                for message in self.client.stream(
+                    f"{self.client.account_path}/transactions/stream",
+                    headers=UNIX_TIMES
+                ):
+                    if self.stopped.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, message)
+                    delay = RECONNECT_DELAY
+            except Exception as e:
+                self.log(f"WARNING: Transactions stream failed: {e}")
+            self.stopped.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def run_transactions(self) -> None:
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        Thread(
+            target=self._read_transactions,
+            args=(asyncio.get_running_loop(), queue),
+            daemon=True
+        ).start()
+        while True:
+            transaction: ApiTransactionType = await queue.get()  # type: ignore
+            await self.dispatch_transaction(transaction)
+
+    async def run_timer(
+        self, at: time, weekdays: List[int], func: Callable[[], Any]
+    ) -> None:
+        while True:
+            await asyncio.sleep(
+                seconds_until(at, weekdays, datetime.utcnow())
+            )
+            await self._serial(func)
+
+    async def run(self) -> None:
+        if use_price_stream(self.config):
+            self.instrument_manager.start_price_stream()
+        tasks: List[Tuple[str, Any]] = [
+            ("candles", self.run_candles()),
+            ("transactions", self.run_transactions()),
+            # Close pending trades on Fridays at session close
+            ("session_close", self.run_timer(
+                time(20, 30), [5], self.order_manager.cancel_pending_trades
+            )),
+        ]
+        if self.telegram_bot is not None:
+            telegram_bot = self.telegram_bot
+            tasks.append(("telegram", self.run_timer(
+                time(self.config["telegram_report_hour"]
+                     if "telegram_report_hour" in self.config else 20, 0),
+                [1, 2, 3, 4, 5],
+                lambda: telegram_bot.manage_notifications(datetime.utcnow())
+            )))
+        try:
+            await asyncio.gather(*(task for _, task in tasks))
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.stopped.set()
+        self.instrument_manager.stop_price_stream()
+        self.io.shutdown(wait=False)
+        self.serial.shutdown(wait=True)
+        self.order_manager.close()
+
+
+def run_async_bot(config: ConfigType) -> None:
+    bot = AsyncBot(config)
+    try:
+        asyncio.run(bot.run())
+    except KeyboardInterrupt:
+        pass
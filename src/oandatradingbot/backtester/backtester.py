@@ -1,17 +1,25 @@
 # Libraries
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from itertools import repeat
 import json
 import os
+from typing import List
 
 # Packages
 import backtrader as bt
+from pandas import DataFrame
 
 # Locals
 from oandatradingbot.backtester.summarizer import Summarizer
+from oandatradingbot.repository.backtest_trade import backtest_trade_rows
+from oandatradingbot.repository.repository import Repository
 from oandatradingbot.strategies.macd_ema_atr_backtest import MacdEmaAtrBackTest
 from oandatradingbot.types.config import ConfigType
+from oandatradingbot.utils.array_feed import add_feeds
 from oandatradingbot.utils.config_checker import check_config
-from oandatradingbot.utils.financial_feed import FinancialFeed
+from oandatradingbot.utils.financial_feed import get_feeds, preresampled
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -36,6 +44,12 @@ def parse_args(pargs=None):
         action="store_true", default=False,
         required=False, help="Show extended information")
 
+    parser.add_argument(
+        '--workers',
+        type=int, default=1,
+        required=False,
+        help="Number of instruments backtested in parallel processes")
+
     parser.add_argument(
         '--basetemp',
         required=False, help=argparse.SUPPRESS)
@@ -45,6 +59,43 @@ def parse_args(pargs=None):
     return parser.parse_args(pargs)
 
 
+def run_backtest(
+    instrument: str, config: ConfigType, feeds: List[DataFrame]
+) -> Summarizer:
+    # Work on a copy so parallel runs do not share the instruments list
+    config = copy.copy(config)
+    cerebro = bt.Cerebro(stdstats=True)
+
+    add_feeds(
+        cerebro, instrument, feeds, config["timeframes"], preresampled(config)
+    )
+
+    cerebro.broker = bt.brokers.BackBroker(cash=config["cash"])
+    # Allow cheat con close, otherwise order will match next open price
+    # and SL and TK calculation are messed up
+    cerebro.broker.set_coc(True)
+
+    config["instruments"] = [instrument]
+    kwargs = config
+    kwargs["config"] = config  # type: ignore[typeddict-item]
+    cerebro.addstrategy(MacdEmaAtrBackTest, **kwargs)
+
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
+
+    print(f"Running {instrument} backtest...")
+    results = cerebro.run()
+
+    summarizer = Summarizer(
+        results[0], config, instrument, results[0].strat_name
+    )
+
+    # Save strategy performance figure. Figures are only shown when
+    # backtesting in the main process
+    summarizer.save_plots(cerebro, interactive=config["workers"] == 1)
+
+    return summarizer
+
+
 def main(config_obj=None):
     print("====== Starting backtrader ======")
     args = parse_args()
@@ -60,49 +111,44 @@ def main(config_obj=None):
 
     config = check_config(config, "backtest")
 
-    for instrument in list(config["instruments"]):
-        cerebro = bt.Cerebro(stdstats=True)
-
-        for i, tframe in enumerate(config["timeframes"]):
-            print(
-                f"Downloading {instrument} feed with interval "
-                f"{tframe['interval']}..."
-            )
-            feed = FinancialFeed(instrument, tframe['interval']).get_feed()
-            data = bt.feeds.PandasData(dataname=feed, name=instrument)
-            if i == 0:
-                data_name = instrument
-            else:
-                data_name = f"{instrument}t{tframe['compression']}"
-
-            cerebro.resampledata(
-                data, name=data_name,
-                timeframe=eval(f"bt.TimeFrame.{tframe['timeframe']}"),
-                compression=tframe['compression']
+    instruments = list(config["instruments"])
+    config["workers"] = max(1, min(args.workers, len(instruments)))
+    feeds = get_feeds(instruments, config)
+
+    if config["workers"] > 1:
+        # Each instrument is backtested in its own process, summaries are
+        # gathered back and saved once every backtest has finished
+        with ProcessPoolExecutor(max_workers=config["workers"]) as executor:
+            summarizers = list(
+                executor.map(
+                    run_backtest,
+                    instruments,
+                    repeat(config),
+                    [feeds[instrument] for instrument in instruments]
+                )
             )
+    else:
+        summarizers = [
+            run_backtest(instrument, config, feeds[instrument])
+            for instrument in instruments
+        ]
 
-        cerebro.broker = bt.brokers.BackBroker(cash=config["cash"])
-        # Allow cheat con close, otherwise order will match next open price
-        # and SL and TK calculation are messed up
-        cerebro.broker.set_coc(True)
-
-        config["instruments"] = [instrument]
-        kwargs = config
-        kwargs["config"] = config  # type: ignore[typeddict-item]
-        cerebro.addstrategy(MacdEmaAtrBackTest, **kwargs)
-
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
-
-        print("Running backtest...")
-        results = cerebro.run()
-
-        summarizer = Summarizer(
-            results[0], config, instrument, results[0].strat_name
-        )
-
+    for summarizer in summarizers:
         # Print and save summary in the results Excel file
         summarizer.print_summary()
         summarizer.save_summary()
 
-        # Save strategy performance figure
-        summarizer.save_plots(cerebro)
+    if "database_uri" in config:
+        rows = [
+            row for summarizer in summarizers
+            for row in backtest_trade_rows(
+                config["run_id"],
+                summarizer.strategy,
+                summarizer.parameters,
+                summarizer.trades_list
+            )
+        ]
+        Repository(config["database_uri"]).save_backtest_trades(rows)
+        print(
+            f"{len(rows)} trades saved in the database as {config['run_id']}"
+        )
@@ -28,8 +28,12 @@ class Summarizer:
         self.strategy = strategy
         self.trades_list: Dict[str, List[TradeType]] = \
             results.order_manager.trades
-        self.drawdown: Dict[str, Any] = \
-            results.analyzers.drawdown.get_analysis()
+        self.parameters: Dict[str, Any] = dict(results.p._getkwargs())
+        # Plain dictionaries so the summarizer can be sent across processes
+        self.drawdown: Dict[str, Any] = {
+            key: dict(val) if isinstance(val, dict) else val
+            for key, val in results.analyzers.drawdown.get_analysis().items()
+        }
         self.summary_file: str = results.summary_file
         self.p_r_ratio: float = \
             config["profit_risk_ratio"]  # type: ignore[typeddict-item]
@@ -200,7 +204,7 @@ class Summarizer:
 
     def save_plots(
         self, cerebro, numfigs=1, iplot=False, start=None, end=None, dpi=300,
-        tight=True, use=None, **kwargs
+        tight=True, use=None, interactive=True, **kwargs
     ):
 
         plt.rcParams["figure.figsize"] = (15, 10)
@@ -210,7 +214,7 @@ class Summarizer:
         )
 
         # Only show the figure if not running a test
-        if self.testing:
+        if self.testing or not interactive:
             if cerebro.p.oldsync:
                 plotter = plot.Plot_OldSync(**kwargs)
             else:
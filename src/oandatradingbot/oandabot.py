@@ -9,9 +9,11 @@ import btoandav20 as bto
 from btoandav20.sizers.oandav20sizer import OandaV20RiskPercentSizer
 
 # Local
+from oandatradingbot.async_bot import run_async_bot
 from oandatradingbot.strategies.macd_ema_atr_live import MacdEmaAtrLive
 from oandatradingbot.types.config import ConfigType
 from oandatradingbot.utils.config_checker import check_config
+from oandatradingbot.utils.oanda_client import close_clients
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -34,6 +36,11 @@ def parse_args(pargs=None):
         action="store_true", default=False,
         required=False, help="Show runtime information")
 
+    parser.add_argument(
+        '--async-engine',
+        action="store_true", default=False,
+        required=False, help="Run the asyncio engine instead of backtrader")
+
     parser.add_argument(
         '--basetemp',
         required=False, help=argparse.SUPPRESS)
@@ -58,6 +65,11 @@ def main(config_obj=None) -> None:
 
     config = check_config(config, "live")
 
+    if args.async_engine:
+        run_async_bot(config)
+        close_clients()
+        return
+
     # Instantiate cerebro
     cerebro = bt.Cerebro()
 
@@ -100,3 +112,4 @@ def main(config_obj=None) -> None:
     # Add a timer to notify on Fridays before session ends
     # cerebro.add_timer()
     cerebro.run()
+    close_clients()
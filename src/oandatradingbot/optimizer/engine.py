@@ -0,0 +1,512 @@
+# Libraries
+from itertools import product
+import json
+from multiprocessing import Pool
+from multiprocessing.pool import Pool as PoolType
+from multiprocessing.shared_memory import SharedMemory
+import os
+from threading import Lock
+from typing import Any, Dict, List, Optional, Protocol, TextIO, Tuple, \
+    TypedDict
+
+# Packages
+import backtrader as bt
+import numpy as np
+from numpy.typing import NDArray
+import pandas as pd
+from pandas import DataFrame
+
+# Locals
+from oandatradingbot.repository.backtest_trade import backtest_trade_rows
+from oandatradingbot.repository.repository import Repository
+from oandatradingbot.strategies.indicator_cache import IndicatorCache
+from oandatradingbot.strategies.macd_ema_atr_backtest import MacdEmaAtrBackTest
+from oandatradingbot.strategies.macd_ema_atr_signals \
+    import MacdEmaAtrSignals, frame_arrays
+from oandatradingbot.types.config import ConfigType
+from oandatradingbot.utils.array_feed import add_feeds
+from oandatradingbot.utils.feed_cache import COMPACT_DTYPE
+from oandatradingbot.utils.financial_feed import preresampled
+
+# Strategy parameters the indicators depend on, combinations sharing them
+# share the precomputed signals
+INDICATOR_PARAMS = (
+    "macd_fast_ema",
+    "macd_slow_ema",
+    "macd_signal_ema",
+    "ema_period",
+    "atr_period",
+)
+
+SharedFeedType = TypedDict(
+    "SharedFeedType",
+    {
+        "instrument": str,
+        "shm_name": str,
+        "rows": int,
+        "columns": List[str],
+        "dtype": str,
+        "tz": Optional[str],
+    }
+)
+
+# Results of every combination, one JSON object per line
+RESULTS_FILE = "results.jsonl"
+
+# Maximum number of indicator arrays and signals kept by every worker
+INDICATOR_CACHE_SIZE = 256
+
+FULL_HISTORY: "WindowType" = (0.0, 1.0)
+
+ParamsType = Dict[str, Any]
+# Start and end of a window of the history, as fractions of its duration
+WindowType = Tuple[float, float]
+# Indicator parameters, combinations and window of the history to backtest
+TaskType = Tuple[ParamsType, List[ParamsType], WindowType]
+ResultType = Dict[str, Any]
+# Key of the trades of a result, "Trades" is their number
+TRADES_KEY = "Trades list"
+
+
+class EvaluatorType(Protocol):
+    """Anything backtesting combinations like the OptimizerEngine"""
+
+    workers: int
+
+    def evaluate(
+        self,
+        combinations: List[ParamsType],
+        window: WindowType = FULL_HISTORY
+    ) -> List[ResultType]:
+        ...
+
+
+# State of every worker process, set by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def parameter_values(strategy_params: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Expands every strategy parameter of the optimization config (a range
+    dictionary, a list or a single value) into the list of its values
+    """
+    values: Dict[str, List[Any]] = {}
+    for param, value in strategy_params.items():
+        if isinstance(value, dict):
+            values[param] = np.arange(
+                value["start"], value["end"], value["step"]
+            ).tolist()
+        elif isinstance(value, list):
+            values[param] = value
+        else:
+            values[param] = [value]
+    return values
+
+
+def parameter_grid(values: Dict[str, List[Any]]) -> List[ParamsType]:
+    return [
+        dict(zip(values.keys(), combination))
+        for combination in product(*values.values())
+    ]
+
+
+def group_combinations(
+    combinations: List[ParamsType],
+    workers: int,
+    window: WindowType = FULL_HISTORY
+) -> List[TaskType]:
+    """Groups the combinations by their indicator parameters so every task
+    computes the indicators once. If there are fewer groups than workers the
+    groups are split so no worker stays idle.
+    """
+    groups: Dict[Tuple[Any, ...], List[ParamsType]] = {}
+    for params in combinations:
+        key = tuple(params.get(p) for p in INDICATOR_PARAMS)
+        groups.setdefault(key, []).append(params)
+
+    chunks = max(1, int(np.ceil(workers / len(groups)))) if groups else 1
+    tasks: List[TaskType] = []
+    for group in groups.values():
+        indicator_params = {
+            p: group[0][p] for p in INDICATOR_PARAMS if p in group[0]
+        }
+        size = int(np.ceil(len(group) / chunks))
+        for i in range(0, len(group), size):
+            tasks.append((indicator_params, group[i:i + size], window))
+    return tasks
+
+
+class SharedFeeds:
+    """Copies the feeds into shared memory blocks so the worker processes
+    read them without receiving a copy of every DataFrame. Every block holds
+    the timestamps (int64 nanoseconds, UTC) followed by one float64 array per
+    column, or float32 for compact feeds.
+    """
+
+    def __init__(self, feeds: Dict[str, List[DataFrame]]) -> None:
+        self.blocks: List[SharedMemory] = []
+        self.feeds: List[List[SharedFeedType]] = []
+        for instrument, frames in feeds.items():
+            self.feeds.append([
+                self._share(instrument, frame) for frame in frames
+            ])
+
+    def _share(self, instrument: str, frame: DataFrame) -> SharedFeedType:
+        rows = len(frame)
+        columns = [str(col) for col in frame.columns]
+        compact = any(dtype == COMPACT_DTYPE for dtype in frame.dtypes)
+        dtype = np.dtype(COMPACT_DTYPE if compact else np.float64)
+        block = SharedMemory(
+            create=True,
+            size=max(1, rows * (8 + dtype.itemsize * len(columns)))
+        )
+        self.blocks.append(block)
+        index = pd.DatetimeIndex(frame.index)
+        tz = None if index.tz is None else str(index.tz)
+        if index.tz is not None:
+            index = index.tz_convert("UTC")
+        index_array, values = _block_arrays(
+            block, rows, len(columns), dtype.name
+        )
+        index_array[:] = index.asi8
+        values[:] = frame.to_numpy(dtype=dtype).T
+        return {
+            "instrument": instrument,
+            "shm_name": block.name,
+            "rows": rows,
+            "columns": columns,
+            "dtype": dtype.name,
+            "tz": tz,
+        }
+
+    def close(self) -> None:
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _block_arrays(
+    block: SharedMemory, rows: int, columns: int, dtype: str
+) -> Tuple[NDArray[np.int64], NDArray[np.floating[Any]]]:
+    index: NDArray[np.int64] = np.ndarray(
+        (rows,), dtype=np.int64, buffer=block.buf
+    )
+    values: NDArray[np.floating[Any]] = np.ndarray(
+        (columns, rows), dtype=dtype, buffer=block.buf, offset=rows * 8
+    )
+    return index, values
+
+
+def _attach_feed(block: SharedMemory, shared: SharedFeedType) -> DataFrame:
+    index, values = _block_arrays(
+        block, shared["rows"], len(shared["columns"]), shared["dtype"]
+    )
+    dates = pd.to_datetime(index, utc=True)
+    if shared["tz"] is None:
+        dates = dates.tz_localize(None)
+    elif shared["tz"] != "UTC":
+        dates = dates.tz_convert(shared["tz"])
+    # The DataFrame is a view over the shared memory, not a copy
+    return DataFrame(
+        values.T, index=dates, columns=shared["columns"], copy=False
+    )
+
+
+def _init_worker(
+    config: ConfigType, shared_feeds: List[List[SharedFeedType]]
+) -> None:
+    _worker["config"] = config
+    # Shared by every window, the indicators are computed over the history
+    _worker["cache"] = IndicatorCache(INDICATOR_CACHE_SIZE)
+    _worker["blocks"] = []
+    _worker["feeds"] = {}
+    for frames in shared_feeds:
+        for shared in frames:
+            block = SharedMemory(shared["shm_name"])
+            _worker["blocks"].append(block)
+            _worker["feeds"].setdefault(shared["instrument"], []).append(
+                _attach_feed(block, shared)
+            )
+
+
+def _release_worker() -> None:
+    blocks: List[SharedMemory] = _worker.get("blocks", [])
+    # Drop the DataFrames first, they keep the shared memory buffers in use
+    _worker.clear()
+    for block in blocks:
+        block.close()
+
+
+def window_positions(
+    frames: List[DataFrame], window: WindowType
+) -> List[Tuple[int, int]]:
+    """First and last (excluded) bar positions of a window of the history
+    in every time frame of an instrument, cut at the same timestamps"""
+    start, end = window_timestamps(frames[0], window)
+    return [
+        (
+            int(frame.index.searchsorted(start)),
+            int(frame.index.searchsorted(end)) if window[1] < 1
+            else len(frame)
+        )
+        for frame in frames
+    ]
+
+
+def window_feeds(
+    feeds: Dict[str, List[DataFrame]], window: WindowType
+) -> Dict[str, List[DataFrame]]:
+    """Keeps the bars within a window of the history of every feed. The time
+    frames of an instrument are cut at the same timestamps and the cut feeds
+    are views of the original ones.
+    """
+    if window == FULL_HISTORY:
+        return feeds
+    return {
+        instrument: [
+            frame.iloc[first:last]
+            for frame, (first, last) in zip(
+                frames, window_positions(frames, window)
+            )
+        ]
+        for instrument, frames in feeds.items()
+    }
+
+
+def window_timestamps(
+    frame: DataFrame, window: WindowType
+) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    index = frame.index
+    if len(index) == 0:
+        return pd.NaT, pd.NaT
+    span = index[-1] - index[0]
+    return index[0] + span * window[0], index[0] + span * window[1]
+
+
+def create_cerebro(
+    config: ConfigType, feeds: Dict[str, List[DataFrame]]
+) -> bt.Cerebro:
+    cerebro = bt.Cerebro(stdstats=False, maxcpus=1)
+    for instrument in config["instruments"]:
+        add_feeds(
+            cerebro,
+            instrument,
+            feeds[instrument],
+            config["timeframes"],
+            preresampled(config)
+        )
+
+    cerebro.broker = bt.brokers.BackBroker(cash=config["cash"])
+    # Allow cheat con close, otherwise order will match next open price
+    # and SL and TK calculation are messed up
+    cerebro.broker.set_coc(True)
+    return cerebro
+
+
+def _compute_signals(
+    instrument: str,
+    intervals: List[str],
+    feeds: List[DataFrame],
+    params: ParamsType,
+    cache: IndicatorCache
+) -> Optional[MacdEmaAtrSignals]:
+    arrays = frame_arrays(feeds[0])
+    if arrays is None:
+        return None
+    close_higher_frame = None
+    if len(feeds) > 1:
+        arrays_higher_frame = frame_arrays(feeds[1])
+        if arrays_higher_frame is None:
+            return None
+        close_higher_frame = arrays_higher_frame["close"]
+    return MacdEmaAtrSignals(
+        arrays["high"],
+        arrays["low"],
+        arrays["close"],
+        params["macd_fast_ema"],
+        params["macd_slow_ema"],
+        params["macd_signal_ema"],
+        params["ema_period"],
+        params["atr_period"],
+        close_higher_frame,
+        cache,
+        instrument,
+        intervals
+    )
+
+
+def _run_task(task: TaskType) -> List[ResultType]:
+    indicator_params, combinations, window = task
+    config: ConfigType = _worker["config"]
+    cache: IndicatorCache = _worker["cache"]
+    intervals = [tframe["interval"] for tframe in config["timeframes"]]
+
+    signals: Dict[str, MacdEmaAtrSignals] = {}
+    for instrument in config["instruments"]:
+        frames: List[DataFrame] = _worker["feeds"][instrument]
+        # The same group may be split across several tasks
+        instrument_signals = cache.get(
+            (
+                instrument,
+                intervals[0],
+                "signals",
+                tuple(indicator_params[p] for p in INDICATOR_PARAMS)
+            ),
+            lambda: _compute_signals(
+                instrument, intervals, frames, indicator_params, cache
+            )
+        )
+        if instrument_signals is not None:
+            # The indicators are warmed up by the bars before the window
+            signals[instrument] = instrument_signals.window(*[
+                first for first, _ in window_positions(frames, window)
+            ])
+    # The cut feeds are views, cheaper to create than to keep
+    feeds = window_feeds(_worker["feeds"], window)
+
+    results: List[ResultType] = []
+    for params in combinations:
+        cerebro = create_cerebro(config, feeds)
+        cerebro.addstrategy(
+            MacdEmaAtrBackTest, **config, **params, signals=signals
+        )
+        strategy: MacdEmaAtrBackTest = cerebro.run()[0]
+        results.append({
+            "Name": strategy.strat_name,
+            **strategy.optimization_results,
+            "Parameters": params,
+            "Window": list(window),
+        })
+        if "database_uri" in config:
+            # Sent back to be saved by the main process
+            results[-1][TRADES_KEY] = strategy.order_manager.trades
+    return results
+
+
+class OptimizerEngine:
+    """Backtests parameter combinations in a pool of worker processes. The
+    feeds are loaded once into shared memory and the combinations are grouped
+    by their indicator parameters, so the indicators and entry signals are
+    computed once per group instead of once per combination.
+
+    The engine is used as a context manager, which starts the workers and
+    opens the results file, and evaluate() can be called several times (e.g.
+    by the search strategies) while the workers are alive. Several threads
+    can call evaluate() at the same time when there are several workers.
+    """
+
+    def __init__(
+        self,
+        config: ConfigType,
+        feeds: Dict[str, List[DataFrame]],
+        workers: int = 1
+    ) -> None:
+        self.config = config
+        self.feeds = feeds
+        self.workers = workers
+        self.results_file = os.path.join(
+            config["results_path"], config["opt_name"], RESULTS_FILE
+        )
+        self.shared: Optional[SharedFeeds] = None
+        self.pool: Optional[PoolType] = None
+        self.file: Optional[TextIO] = None
+        self.repository: Optional[Repository] = None
+        self.lock = Lock()
+
+    def __enter__(self) -> "OptimizerEngine":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        self.shared = SharedFeeds(self.feeds)
+        if self.workers > 1:
+            self.pool = Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.config, self.shared.feeds)
+            )
+        else:
+            _init_worker(self.config, self.shared.feeds)
+        self.file = open(self.results_file, "a")
+        if "database_uri" in self.config:
+            self.repository = Repository(self.config["database_uri"])
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        else:
+            _release_worker()
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def window_dates(self, window: WindowType) -> Tuple[str, str]:
+        """Dates of a window of the history of the first instrument"""
+        frame = self.feeds[self.config["instruments"][0]][0]
+        return tuple(  # type: ignore
+            "" if pd.isna(date) else date.strftime("%Y-%m-%d %H:%M")
+            for date in window_timestamps(frame, window)
+        )
+
+    def evaluate(
+        self,
+        combinations: List[ParamsType],
+        window: WindowType = FULL_HISTORY
+    ) -> List[ResultType]:
+        """Backtests the combinations over a window of the history and
+        appends their results, as soon as they are received, to the results
+        file of the optimization folder (one JSON object per line). The
+        indicators are computed over the whole history, so they are warmed
+        up by the bars before the window and every trade enters within it.
+        """
+        if self.shared is None:
+            raise SystemExit("ERROR: The optimizer engine is not started")
+        tasks = group_combinations(combinations, self.workers, window)
+        results: List[ResultType] = []
+        if self.pool is not None:
+            for task_results in self.pool.imap_unordered(_run_task, tasks):
+                self._save_trades(task_results)
+                self._write_results(task_results)
+                results.extend(task_results)
+                print(f"Backtests: {len(results)}/{len(combinations)}")
+        else:
+            for task in tasks:
+                task_results = _run_task(task)
+                self._save_trades(task_results)
+                self._write_results(task_results)
+                results.extend(task_results)
+                print(f"Backtests: {len(results)}/{len(combinations)}")
+        return results
+
+    def _save_trades(self, results: List[ResultType]) -> None:
+        """Saves the trades of the results in the database with a single
+        insert and removes them from the results"""
+        rows = [
+            row for result in results if TRADES_KEY in result
+            for row in backtest_trade_rows(
+                self.config["run_id"],
+                result["Name"],
+                result["Parameters"],
+                result.pop(TRADES_KEY),
+                "{:.2f}-{:.2f}".format(*result["Window"])
+            )
+        ]
+        if self.repository is not None:
+            with self.lock:
+                self.repository.save_backtest_trades(rows)
+
+    def _write_results(self, results: List[ResultType]) -> None:
+        with self.lock:
+            if self.file is None:
+                return
+            for result in results:
+                self.file.write(json.dumps(result) + "\n")
+            self.file.flush()
@@ -3,16 +3,14 @@ import argparse
 import json
 from multiprocessing import cpu_count
 import os
-from typing import List
-
-# Packages
-import backtrader as bt
-import numpy as np
 
 # Locals
-from oandatradingbot.strategies.macd_ema_atr_backtest import MacdEmaAtrBackTest
-from oandatradingbot.utils.financial_feed import FinancialFeed
+from oandatradingbot.utils.financial_feed import get_feeds
+from oandatradingbot.optimizer.engine import OptimizerEngine, \
+    parameter_values
+from oandatradingbot.optimizer.search import create_search
 from oandatradingbot.optimizer.summarizer_opt import Summarizer
+from oandatradingbot.optimizer.walk_forward import WalkForward
 from oandatradingbot.types.config import ConfigType
 from oandatradingbot.utils.config_checker import check_config
 
@@ -34,6 +32,14 @@ def parse_args(pargs=None):
         help="Configuration json file required to run the bot",
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=cpu_count(),
+        required=False,
+        help="Number of processes running backtests in parallel",
+    )
+
     parser.add_argument("--basetemp", required=False, help=argparse.SUPPRESS)
 
     parser.add_argument("args", nargs=argparse.REMAINDER)
@@ -56,64 +62,36 @@ def main(config_obj=None):
 
     config = check_config(config, "optimize")
 
+    workers = max(1, args.workers)
+    config["workers"] = workers
+
     # Create ranges from strategy parameters
-    variations: List[int] = []
+    values = parameter_values(
+        config["strategy_params"]  # type: ignore
+    )
     print("Parameters values:")
-    for param in config["strategy_params"]:
-        param_dict = config["strategy_params"][param]  # type: ignore
-        if isinstance(param_dict, dict):
-            config[param] = np.arange(  # type: ignore
-                param_dict["start"], param_dict["end"], param_dict["step"]
-            )
-            print(f"    {param}: {config[param]}")  # type: ignore
-            variations.append(len(config[param]))  # type: ignore
-        elif isinstance(param_dict, list):
-            config[param] = param_dict  # type: ignore
-            print(f"    {param}: {config[param]}")  # type: ignore
-            variations.append(len(config[param]))  # type: ignore
-        else:
-            config[param] = param_dict  # type: ignore
-            print(f"    {param}: {config[param]}")  # type: ignore
-    print(f"Simulations: {np.prod(variations)}")
-    print(f"Batches: {int(np.ceil(np.prod(variations) / cpu_count()))}\n")
+    for param, param_values in values.items():
+        print(f"    {param}: {param_values}")
+    search_config = config["search"] if "search" in config else {}
+    search = create_search(values, search_config)
+    print(f"Combinations: {search.size}")
+    print(f"Search method: {type(search).__name__}")
+    print(f"Workers: {workers}\n")
     config.pop("strategy_params", None)
 
-    cerebro = bt.Cerebro(stdstats=False, optreturn=True)
-
-    for instrument in config["instruments"]:
-        for i, tframe in enumerate(config["timeframes"]):
-            print(
-                f"Downloading {instrument} feed with interval "
-                f"{tframe['interval']}..."
-            )
-            feed = FinancialFeed(instrument, tframe["interval"]).get_feed()
-            data = bt.feeds.PandasData(dataname=feed, name=instrument)
-            if i == 0:
-                data_name = instrument
-            else:
-                data_name = f"{instrument}t{tframe['compression']}"
-
-            cerebro.resampledata(
-                data,
-                name=data_name,
-                timeframe=eval(f"bt.TimeFrame.{tframe['timeframe']}"),
-                compression=tframe["compression"],
-            )
-
-    cerebro.broker = bt.brokers.BackBroker(cash=config["cash"])
-    # Allow cheat con close, otherwise order will match next open price
-    # and SL and TK calculation are messed up
-    cerebro.broker.set_coc(True)
-
-    # Envolve instruments and timeframes in an array for multiprocessing
-    config["instruments"] = [config["instruments"]]  # type: ignore
-    config["timeframes"] = [config["timeframes"]]  # type: ignore
-    cerebro.optstrategy(MacdEmaAtrBackTest, **config)
+    feeds = get_feeds(config["instruments"], config)
 
+    summarizer = Summarizer(config)
     print("Running backtests...")
-    cerebro.run()
+    with OptimizerEngine(config, feeds, workers) as engine:
+        if "walk_forward" in config:
+            folds = WalkForward(
+                values, search_config, config["walk_forward"]
+            ).run(engine)
+            summarizer.save_walk_forward_results(folds)
+            return
+        search.run(engine)
 
-    summarizer = Summarizer(config)
     summarizer.save_optimization_results()
     summarizer.save_instruments_plots()
     summarizer.parameters_plots()
@@ -0,0 +1,251 @@
+# Libraries
+import math
+from typing import Any, Dict, List, Set
+
+# Packages
+import numpy as np
+from numpy.typing import NDArray
+
+# Locals
+from oandatradingbot.optimizer.engine import EvaluatorType, ParamsType, \
+    ResultType
+from oandatradingbot.types.config import SearchType
+
+SEARCH_METHODS = ["grid", "random", "halving", "tpe"]
+METRICS = ["SQN", "Returns", "Win rate"]
+
+
+def result_score(result: ResultType, metric: str) -> float:
+    """Score used to rank the combinations, the higher the better. Results
+    without a valid score (e.g. no trades) are ranked last.
+    """
+    if metric == "Returns":
+        score = result["Total profit"] - result["Total loss"]
+    elif metric == "Win rate":
+        score = result["Won"] / result["Trades"] \
+            if result["Trades"] > 0 else math.nan
+    else:
+        score = result["SQN"]
+    if score is None or math.isnan(score):
+        return -math.inf
+    return float(score)
+
+
+class GridSearch:
+    """Backtests every combination of the parameter values. Combinations
+    are identified by their position in the grid, ordered as
+    itertools.product orders them.
+    """
+
+    def __init__(
+        self, values: Dict[str, List[Any]], search: SearchType
+    ) -> None:
+        self.values = values
+        self.keys = list(values)
+        self.sizes = [len(values[key]) for key in self.keys]
+        self.size = math.prod(self.sizes)
+        self.metric = search["metric"] if "metric" in search else "SQN"
+        self.rng = np.random.default_rng(
+            search["seed"] if "seed" in search else None
+        )
+
+    def digits(self, index: int) -> List[int]:
+        digits = []
+        for size in reversed(self.sizes):
+            index, digit = divmod(index, size)
+            digits.append(digit)
+        return digits[::-1]
+
+    def index(self, digits: List[int]) -> int:
+        index = 0
+        for digit, size in zip(digits, self.sizes):
+            index = index * size + digit
+        return index
+
+    def combination(self, index: int) -> ParamsType:
+        return {
+            key: self.values[key][digit]
+            for key, digit in zip(self.keys, self.digits(index))
+        }
+
+    def combination_index(self, params: ParamsType) -> int:
+        return self.index(
+            [self.values[key].index(params[key]) for key in self.keys]
+        )
+
+    def rank(self, results: List[ResultType]) -> List[ResultType]:
+        return sorted(
+            results,
+            key=lambda result: result_score(result, self.metric),
+            reverse=True
+        )
+
+    def run(self, engine: EvaluatorType) -> List[ResultType]:
+        return engine.evaluate(
+            [self.combination(index) for index in range(self.size)]
+        )
+
+
+class RandomSearch(GridSearch):
+    """Backtests a random sample of ``samples`` combinations of the grid"""
+
+    def __init__(
+        self, values: Dict[str, List[Any]], search: SearchType
+    ) -> None:
+        super().__init__(values, search)
+        self.samples = min(
+            search["samples"] if "samples" in search else self.size,
+            self.size
+        )
+
+    def sample(self, samples: int, exclude: Set[int]) -> List[int]:
+        """Draws up to ``samples`` different combinations which are not in
+        ``exclude``"""
+        if self.size - len(exclude) <= samples:
+            return [i for i in range(self.size) if i not in exclude]
+        seen = set(exclude)
+        indexes: List[int] = []
+        while len(indexes) < samples:
+            index = int(self.rng.integers(self.size))
+            if index not in seen:
+                seen.add(index)
+                indexes.append(index)
+        return indexes
+
+    def run(self, engine: EvaluatorType) -> List[ResultType]:
+        return engine.evaluate(
+            [self.combination(i) for i in self.sample(self.samples, set())]
+        )
+
+
+class HalvingSearch(RandomSearch):
+    """Successive halving: the candidates (a random sample, or the whole grid
+    if ``samples`` is not set) are backtested over the most recent
+    ``min_fraction`` of the history, the best 1/``eta`` of them are promoted
+    to a window ``eta`` times longer, and so on until the survivors are
+    backtested over the full history.
+    """
+
+    def __init__(
+        self, values: Dict[str, List[Any]], search: SearchType
+    ) -> None:
+        super().__init__(values, search)
+        self.min_fraction = search["min_fraction"] \
+            if "min_fraction" in search else 0.25
+        self.eta = search["eta"] if "eta" in search else 3
+
+    def run(self, engine: EvaluatorType) -> List[ResultType]:
+        candidates = [
+            self.combination(i) for i in self.sample(self.samples, set())
+        ]
+        fraction = self.min_fraction
+        while fraction < 1 and len(candidates) > 1:
+            print(
+                f"Successive halving: {len(candidates)} combinations over "
+                f"{fraction:.0%} of the history"
+            )
+            ranked = self.rank(
+                engine.evaluate(candidates, (1 - fraction, 1.0))
+            )
+            keep = max(1, math.ceil(len(candidates) / self.eta))
+            candidates = [result["Parameters"] for result in ranked[:keep]]
+            fraction = min(1.0, fraction * self.eta)
+
+        print(
+            f"Successive halving: {len(candidates)} combinations over the "
+            "full history"
+        )
+        return engine.evaluate(candidates)
+
+
+class TPESearch(RandomSearch):
+    """Tree-structured Parzen estimator over the discrete parameter values.
+    After ``startup`` random combinations, the evaluated ones are split into
+    the best ``gamma`` fraction and the rest, and every new combination is
+    the one, out of ``candidates`` drawn from the value frequencies of the
+    best group, maximizing the ratio between the frequencies of the best and
+    the rest. Combinations are proposed in batches of one per worker until
+    ``samples`` combinations have been backtested.
+    """
+
+    def __init__(
+        self, values: Dict[str, List[Any]], search: SearchType
+    ) -> None:
+        super().__init__(values, search)
+        if "samples" not in search:
+            self.samples = min(50, self.size)
+        self.startup = search["startup"] if "startup" in search else 10
+        self.candidates = search["candidates"] \
+            if "candidates" in search else 24
+        self.gamma = search["gamma"] if "gamma" in search else 0.25
+
+    def _frequencies(self, indexes: List[int]) -> List[NDArray[np.float64]]:
+        # Every value starts with one observation so none is discarded
+        counts = [np.ones(size) for size in self.sizes]
+        for index in indexes:
+            for count, digit in zip(counts, self.digits(index)):
+                count[digit] += 1
+        return [count / count.sum() for count in counts]
+
+    def propose(self, samples: int, scores: Dict[int, float]) -> List[int]:
+        ranked = sorted(scores, key=lambda i: scores[i], reverse=True)
+        n_best = max(1, math.ceil(self.gamma * len(ranked)))
+        best = self._frequencies(ranked[:n_best])
+        rest = self._frequencies(ranked[n_best:])
+
+        seen = set(scores)
+        indexes: List[int] = []
+        while len(indexes) < samples:
+            proposal, proposal_ratio = -1, -math.inf
+            for _ in range(self.candidates):
+                digits = [
+                    int(self.rng.choice(len(freq), p=freq)) for freq in best
+                ]
+                index = self.index(digits)
+                if index in seen:
+                    continue
+                ratio = sum(
+                    math.log(b[digit]) - math.log(r[digit])
+                    for b, r, digit in zip(best, rest, digits)
+                )
+                if ratio > proposal_ratio:
+                    proposal, proposal_ratio = index, ratio
+            if proposal < 0:
+                # Every candidate was already evaluated, explore instead
+                random_indexes = self.sample(1, seen)
+                if not random_indexes:
+                    break
+                proposal = random_indexes[0]
+            seen.add(proposal)
+            indexes.append(proposal)
+        return indexes
+
+    def run(self, engine: EvaluatorType) -> List[ResultType]:
+        scores: Dict[int, float] = {}
+        results: List[ResultType] = []
+        indexes = self.sample(min(self.startup, self.samples), set())
+        while indexes:
+            for result in engine.evaluate(
+                [self.combination(index) for index in indexes]
+            ):
+                scores[self.combination_index(result["Parameters"])] = \
+                    result_score(result, self.metric)
+                results.append(result)
+            remaining = self.samples - len(scores)
+            indexes = self.propose(
+                min(engine.workers, remaining), scores
+            ) if remaining > 0 else []
+        return results
+
+
+def create_search(
+    values: Dict[str, List[Any]], search: SearchType
+) -> GridSearch:
+    method = search["method"] if "method" in search else "grid"
+    if method == "random":
+        return RandomSearch(values, search)
+    if method == "halving":
+        return HalvingSearch(values, search)
+    if method == "tpe":
+        return TPESearch(values, search)
+    return GridSearch(values, search)
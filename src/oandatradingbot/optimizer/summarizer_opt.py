@@ -1,4 +1,5 @@
 # Libraries
+import json
 import os
 from typing import Any, Dict, List
 
@@ -9,6 +10,7 @@ import pylab as plt
 import warnings
 import xlsxwriter
 
+from oandatradingbot.optimizer.engine import FULL_HISTORY, RESULTS_FILE
 from oandatradingbot.types.config import ConfigType
 
 warnings.filterwarnings("ignore")
@@ -16,66 +18,71 @@ warnings.filterwarnings("ignore")
 
 class Summarizer:
     def __init__(self, config: ConfigType) -> None:
-        self.strat_files = []
-        self.instruments = config["instruments"][0]
+        self.instruments = config["instruments"]
         self.results_path = config["results_path"]
         self.initial_cash = config["cash"]
         self.currency = config["account_currency"]
         self.opt_name = config["opt_name"]
-        for file in os.listdir(
-            os.path.join(self.results_path, self.opt_name, "temp")
-        ):
-            if file.endswith(".csv"):
-                self.strat_files.append(file)
+        self.results_file = os.path.join(
+            self.results_path, self.opt_name, RESULTS_FILE
+        )
 
     def _get_strategy_summary(self) -> List[Dict[str, Any]]:
 
         strats_results = []
 
-        for strategy in self.strat_files:
-            df_strat = pd.read_csv(
-                os.path.join(
-                    self.results_path, self.opt_name, "temp", strategy
-                ),
-                sep=";"
-            )
-            cash = df_strat["Total profit"][0] - df_strat["Total loss"][0]
+        with open(self.results_file, "r") as file:
+            for line in file:
+                if line.strip() == "":
+                    continue
+                strat = json.loads(line)
+                # Skip the backtests over a part of the history
+                if "Window" in strat \
+                        and tuple(strat["Window"]) != FULL_HISTORY:
+                    continue
+                strats_results.append(self._summarize_strategy(strat))
 
-            res = {
-                "Name": strategy.split(".csv")[0],
-                "Trades": df_strat["Trades"][0],
-                "Won": df_strat["Won"][0],
-                "Lost": df_strat["Lost"][0],
-                "Long total": df_strat["Long"][0],
-                "Long won": df_strat["Long won"][0],
-                "Long lost": df_strat["Long lost"][0],
-                "Short total": df_strat["Short"][0],
-                "Short won": df_strat["Short won"][0],
-                "Short lost": df_strat["Short lost"][0],
-                "Win rate": df_strat["Won"][0] / df_strat["Trades"][0],
-                "Win/loss ratio": df_strat["Won"][0] / df_strat["Lost"][0],
-                "SQN": df_strat['SQN'][0],
-                "Returns": cash,
-                "Returns %": cash / self.initial_cash * 100
-            }
+        return strats_results
 
-            for inst in self.instruments:
-                try:
-                    res[f"Trades {inst}"] = df_strat[f"Trades {inst}"][0]
-                    res[f"Won {inst}"] = df_strat[f"Won {inst}"][0]
-                    res[f"Lost {inst}"] = df_strat[f"Lost {inst}"][0]
-                    res[f"Returns {inst}"] = df_strat[f"Returns {inst}"][0]
-                except KeyError:
-                    res[f"Trades {inst}"] = 0
-                    res[f"Won {inst}"] = 0
-                    res[f"Lost {inst}"] = 0
-                    res[f"Returns {inst}"] = 0.0
+    def _summarize_strategy(self, strat: Dict[str, Any]) -> Dict[str, Any]:
+        cash = strat["Total profit"] - strat["Total loss"]
+        # NumPy division keeps the NaN and inf values of strategies
+        # without trades or without losses
+        won = np.float64(strat["Won"])
+
+        res = {
+            "Name": strat["Name"],
+            "Trades": strat["Trades"],
+            "Won": strat["Won"],
+            "Lost": strat["Lost"],
+            "Long total": strat["Long"],
+            "Long won": strat["Long won"],
+            "Long lost": strat["Long lost"],
+            "Short total": strat["Short"],
+            "Short won": strat["Short won"],
+            "Short lost": strat["Short lost"],
+            "Win rate": won / strat["Trades"],
+            "Win/loss ratio": won / strat["Lost"],
+            "SQN": strat["SQN"],
+            "Returns": cash,
+            "Returns %": cash / self.initial_cash * 100
+        }
 
-            res["Best instruments"] = self._get_best_instruments(res)
+        for inst in self.instruments:
+            try:
+                res[f"Trades {inst}"] = strat[f"Trades {inst}"]
+                res[f"Won {inst}"] = strat[f"Won {inst}"]
+                res[f"Lost {inst}"] = strat[f"Lost {inst}"]
+                res[f"Returns {inst}"] = strat[f"Returns {inst}"]
+            except KeyError:
+                res[f"Trades {inst}"] = 0
+                res[f"Won {inst}"] = 0
+                res[f"Lost {inst}"] = 0
+                res[f"Returns {inst}"] = 0.0
 
-            strats_results.append(res)
+        res["Best instruments"] = self._get_best_instruments(res)
 
-        return strats_results
+        return res
 
     def _get_best_instruments(self, results: Dict[str, Any]) -> str:
 
@@ -91,20 +98,14 @@ class Summarizer:
                 "trades": results[f"Trades {ins}"]
             })
 
+        if len(stats) == 0:
+            return ""
         stats_pd = pd.DataFrame(stats)
         stats_pd = stats_pd[stats_pd["win_rate"] >= 0.5].sort_values(
             by=["trades"], ascending=False
         )
         return ", ".join(stats_pd["instrument"].values)
 
-    def _remove_temp_files(self):
-        for file in self.strat_files:
-            os.remove(
-                os.path.join(self.results_path, self.opt_name, "temp", file)
-            )
-
-        os.rmdir(os.path.join(self.results_path, self.opt_name, "temp"))
-
     def save_optimization_results(self) -> None:
 
         strats_results = self._get_strategy_summary()
@@ -176,11 +177,94 @@ class Summarizer:
                 f"{strats_results[2]['Best instruments']}"
             )
 
+    def save_walk_forward_results(self, folds: List[Dict[str, Any]]) -> None:
+
+        folds_results = []
+        for fold in folds:
+            in_sample = self._summarize_strategy(fold["In sample result"])
+            out_of_sample = self._summarize_strategy(
+                fold["Out of sample result"]
+            )
+            res = {
+                "Fold": fold["Fold"],
+                "Name": in_sample["Name"],
+                "In sample start": fold["In sample"][0],
+                "In sample end": fold["In sample"][1],
+                "Out of sample start": fold["Out of sample"][0],
+                "Out of sample end": fold["Out of sample"][1],
+                "In sample trades": in_sample["Trades"],
+                "In sample win rate": in_sample["Win rate"],
+                "In sample SQN": in_sample["SQN"],
+                "In sample returns": in_sample["Returns"],
+            }
+            for key, value in out_of_sample.items():
+                if key != "Name":
+                    res[f"Out of sample {key[0].lower()}{key[1:]}"] = value
+            folds_results.append(res)
+
+        summary_file = os.path.join(
+            self.results_path,
+            self.opt_name,
+            f"{self.opt_name}_walk_forward.xlsx"
+        )
+
+        # Create xlsxwriter workbook
+        workbook = xlsxwriter.Workbook(
+            summary_file, {"nan_inf_to_errors": True}
+        )
+        worksheet = workbook.add_worksheet("Walk forward")
+
+        # Add a format for the successful operation
+        successful = workbook.add_format({
+            'border': 0,
+            'bg_color': '#94eb9e',
+            'align': 'center',
+            'valign': 'vcenter',
+        })
+
+        # Add a format for the unsuccessful operation
+        unsuccessful = workbook.add_format({
+            'border': 0,
+            'bg_color': '#fa7f7f',
+            'align': 'center',
+            'valign': 'vcenter',
+        })
+
+        # Create the folds table
+        worksheet.add_table(
+            0, 0, len(folds_results), len(folds_results[0].keys()) - 1,
+            {"columns": [{"header": col} for col in folds_results[0].keys()]}
+        )
+
+        for i, fold in enumerate(folds_results):
+            worksheet.write_row(
+                i + 1, 0, fold.values(),
+                cell_format=successful
+                if fold["Out of sample returns"] > 0 else unsuccessful
+            )
+
+        workbook.close()
+
+        print("============================================")
+        print("*********** WALK FORWARD RESULTS ***********")
+        for fold in folds_results:
+            print(
+                f"Fold {fold['Fold']} ({fold['Out of sample start']} - "
+                f"{fold['Out of sample end']}): {fold['Name']} --> "
+                f"Trades: {fold['Out of sample trades']} - Win rate: "
+                f"{fold['Out of sample win rate']:.3f} - Returns: "
+                f"{fold['Out of sample returns']:.2f} {self.currency}"
+            )
+        print(
+            "Out of sample returns: "
+            f"{sum(f['Out of sample returns'] for f in folds_results):.2f} "
+            f"{self.currency}"
+        )
+
     def save_instruments_plots(self):
 
         # Do not create figure if there is only one instrument
         if len(self.instruments) == 1:
-            self._remove_temp_files()
             return
 
         df_strats = pd.read_excel(
@@ -320,8 +404,6 @@ class Summarizer:
             )
             plt.close(fig)
 
-        self._remove_temp_files()
-
     def parameters_plots(self):
         optimization_file = None
         for file in os.listdir(
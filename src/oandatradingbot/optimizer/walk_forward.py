@@ -0,0 +1,108 @@
+# Libraries
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+# Locals
+from oandatradingbot.optimizer.engine import FULL_HISTORY, OptimizerEngine, \
+    ParamsType, ResultType, WindowType
+from oandatradingbot.optimizer.search import create_search
+from oandatradingbot.types.config import SearchType, WalkForwardType
+
+FoldType = Dict[str, Any]
+
+
+def walk_forward_folds(
+    folds: int, in_sample: float
+) -> List[Tuple[WindowType, WindowType]]:
+    """Splits the history into rolling (in-sample, out-of-sample) windows.
+    Every fold window is ``in_sample`` in-sample and the rest out-of-sample,
+    and the next fold starts an out-of-sample length later, so the
+    out-of-sample windows are consecutive and end with the history.
+    """
+    length = 1 / (in_sample + folds * (1 - in_sample))
+    out_of_sample = length * (1 - in_sample)
+    windows = []
+    for fold in range(folds):
+        start = fold * out_of_sample
+        split = start + length * in_sample
+        end = 1.0 if fold == folds - 1 else split + out_of_sample
+        windows.append(((start, split), (split, end)))
+    return windows
+
+
+class FoldEngine:
+    """Backtests the combinations within the in-sample window of a fold, so
+    the search strategies see that window as the whole history
+    """
+
+    def __init__(self, engine: OptimizerEngine, window: WindowType) -> None:
+        self.engine = engine
+        self.window = window
+        self.workers = engine.workers
+
+    def evaluate(
+        self,
+        combinations: List[ParamsType],
+        window: WindowType = FULL_HISTORY
+    ) -> List[ResultType]:
+        if window == FULL_HISTORY:
+            return self.engine.evaluate(combinations, self.window)
+        start, end = self.window
+        return self.engine.evaluate(
+            combinations,
+            (
+                start + (end - start) * window[0],
+                start + (end - start) * window[1]
+            )
+        )
+
+
+class WalkForward:
+    """Walk-forward optimization: the parameter search is run over the
+    in-sample window of every fold and its best combination is backtested
+    over the following out-of-sample window. The folds are run at the same
+    time so the workers of the engine are shared by all of them.
+    """
+
+    def __init__(
+        self,
+        values: Dict[str, List[Any]],
+        search: SearchType,
+        walk_forward: WalkForwardType
+    ) -> None:
+        self.values = values
+        self.search = search
+        self.folds = walk_forward_folds(
+            walk_forward["folds"] if "folds" in walk_forward else 4,
+            walk_forward["in_sample"] if "in_sample" in walk_forward
+            else 0.75
+        )
+
+    def run(self, engine: OptimizerEngine) -> List[FoldType]:
+        # A single worker runs in this process, which is not thread safe
+        threads = len(self.folds) if engine.workers > 1 else 1
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(
+                lambda fold: self._run_fold(engine, *fold),
+                enumerate(self.folds, start=1)
+            ))
+
+    def _run_fold(
+        self,
+        engine: OptimizerEngine,
+        number: int,
+        windows: Tuple[WindowType, WindowType]
+    ) -> FoldType:
+        in_sample, out_of_sample = windows
+        search = create_search(self.values, self.search)
+        results = search.run(FoldEngine(engine, in_sample))
+        best = search.rank(results)[0]
+        print(f"Fold {number}: best in-sample strategy {best['Name']}")
+        result = engine.evaluate([best["Parameters"]], out_of_sample)[0]
+        return {
+            "Fold": number,
+            "In sample": engine.window_dates(in_sample),
+            "Out of sample": engine.window_dates(out_of_sample),
+            "In sample result": best,
+            "Out of sample result": result,
+        }
@@ -0,0 +1,81 @@
+# Libraries
+from datetime import datetime
+import json
+from typing import Any, Dict, List
+
+# Packages
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean
+
+# Locals
+from oandatradingbot.repository.base import Base
+from oandatradingbot.types.trade import TradeType
+
+
+class BacktestTrade(Base):
+    __tablename__ = "backtest_trades"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String(50), index=True)
+    strategy = Column(String(100), index=True)
+    # JSON object of the strategy parameters
+    parameters = Column(String(500))
+    # Fraction of the history backtested, e.g. 0.00-0.75
+    window = Column(String(20))
+    instrument = Column(String(30), index=True)
+    entry_time = Column(DateTime)
+    exit_time = Column(DateTime)
+    operation = Column(String(10))
+    entry_price = Column(Float)
+    exit_price = Column(Float)
+    stop_loss = Column(Float)
+    stop_loss_pips = Column(Float)
+    take_profit = Column(Float)
+    take_profit_pips = Column(Float)
+    canceled = Column(Boolean)
+    profit = Column(Float)
+
+    def __repr__(self) -> str:
+        return (
+            f"BacktestTrade(run={self.run_id}, strategy={self.strategy}, "
+            f"instrument={self.instrument}, type={self.operation}, "
+            f"entry={self.entry_time}, exit={self.exit_time}, "
+            f"{'profit' if self.profit >= 0 else 'loss'}={self.profit})"
+        )
+
+
+def backtest_trade_rows(
+    run_id: str,
+    strategy: str,
+    parameters: Dict[str, Any],
+    trades: Dict[str, List[TradeType]],
+    window: str = ""
+) -> List[Dict[str, Any]]:
+    """Rows of the backtest_trades table of the trades of every instrument
+    of a backtest"""
+    params = json.dumps(parameters, sort_keys=True)
+    return [
+        {
+            "run_id": run_id,
+            "strategy": strategy,
+            "parameters": params,
+            "window": window,
+            "instrument": instrument,
+            "entry_time": datetime.strptime(
+                trade["Entry"], "%Y-%m-%d %H:%M:%S"
+            ),
+            "exit_time": datetime.strptime(
+                trade["Exit"], "%Y-%m-%d %H:%M:%S"
+            ),
+            "operation": trade["Operation"],
+            "entry_price": trade["Entry price"],
+            "exit_price": trade["Exit price"],
+            "stop_loss": trade["SL"],
+            "stop_loss_pips": trade["SL (pips)"],
+            "take_profit": trade["TK"],
+            "take_profit_pips": trade["TK (pips)"],
+            "canceled": trade["Canceled"],
+            "profit": trade["PL"],
+        }
+        for instrument, instrument_trades in trades.items()
+        for trade in instrument_trades
+    ]
@@ -0,0 +1,52 @@
+# Libraries
+from threading import Lock
+import time
+from typing import Any, Dict
+
+# Packages
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryMetrics:
+    """Number of queries and time spent by the database of an engine,
+    grouped by statement (SELECT, INSERT...)"""
+
+    def __init__(self, engine: Engine) -> None:
+        self.queries: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.lock = Lock()
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(
+        self, conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(
+        self, conn: Any, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        name = statement.lstrip().split(" ", 1)[0].upper()
+        with self.lock:
+            self.queries[name] = self.queries.get(name, 0) + 1
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    @property
+    def total(self) -> int:
+        with self.lock:
+            return sum(self.queries.values())
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {
+                name: {
+                    "queries": self.queries[name],
+                    "total (ms)": round(self.seconds[name] * 1000, 2),
+                    "mean (ms)": round(
+                        self.seconds[name] / self.queries[name] * 1000, 2
+                    ),
+                }
+                for name in self.queries
+            }
@@ -1,70 +1,197 @@
 # Libraries
-from datetime import datetime
-from typing import List, Union
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Tuple, Union
 
 # Packages
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import Session
+from sqlalchemy import case, create_engine, func, insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
 
 # Locals
-from oandatradingbot.types.trade import TradeDbType
+from oandatradingbot.types.trade import TradeDbType, TradeSummaryType
+from oandatradingbot.repository.backtest_trade import BacktestTrade
 from oandatradingbot.repository.base import Base
+from oandatradingbot.repository.metrics import QueryMetrics
 from oandatradingbot.repository.trade import Trade
 
+# Connections kept open by the pool and opened on top of them when needed
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+# Seconds after which a connection is replaced, before the server drops it
+POOL_RECYCLE = 1800
+
+_engines: Dict[str, Tuple[Engine, "sessionmaker[Session]", QueryMetrics]] = {}
+_engines_lock = Lock()
+
+
+def get_engine(
+    db_uri: str
+) -> Tuple[Engine, "sessionmaker[Session]", QueryMetrics]:
+    """Returns the engine, the session factory and the query metrics shared
+    by every repository of the same database. The tables are created the
+    first time"""
+    with _engines_lock:
+        if db_uri not in _engines:
+            # SQLite keeps its own pool
+            kwargs = {} if make_url(db_uri).get_backend_name() == "sqlite" \
+                else {
+                    "pool_size": POOL_SIZE,
+                    "max_overflow": MAX_OVERFLOW,
+                    "pool_recycle": POOL_RECYCLE,
+                    "pool_pre_ping": True,
+                }
+            engine = create_engine(db_uri, **kwargs)
+            metrics = QueryMetrics(engine)
+            Base.metadata.create_all(engine)
+            # Indexes added after the table was created
+            for index in Trade.__table__.indexes:  # type: ignore
+                index.create(engine, checkfirst=True)
+            _engines[db_uri] = (
+                engine,
+                sessionmaker(bind=engine, expire_on_commit=False),
+                metrics
+            )
+        return _engines[db_uri]
+
+
+def dispose_engines() -> None:
+    with _engines_lock:
+        for engine, _, _ in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
 
 class Repository:
     def __init__(self, db_uri: str) -> None:
         self.db_uri = db_uri
+        try:
+            self.engine, self.session_factory, self.metrics = \
+                get_engine(db_uri)
+        except Exception as e:
+            raise SystemExit(f"ERROR: Could not connect to dabatase {e}")
         self._check_session()
 
     def _check_session(self) -> None:
-        session = self.start_session()
-        session.close()
-
-    def start_session(self) -> Session:
         try:
-            engine = create_engine(self.db_uri)
-            Base.metadata.create_all(engine)
-            return Session(bind=engine)
+            with self.engine.connect():
+                pass
         except Exception as e:
             raise SystemExit(f"ERROR: Could not connect to dabatase {e}")
 
+    def start_session(self) -> Session:
+        return self.session_factory()
+
     def save_trade(self, trade: TradeDbType) -> None:
         with self.start_session() as session:
             trade_db = Trade(**trade)
             session.add(trade_db)
             session.commit()
 
+    def save_trades(self, trades: List[TradeDbType]) -> List[int]:
+        """Inserts the trades not saved yet with a single commit. Returns
+        the ids of the inserted trades"""
+        with self.start_session() as session:
+            saved = {
+                id for id, in session.query(Trade.id).filter(
+                    Trade.id.in_([trade["id"] for trade in trades])
+                )
+            }
+            new = [trade for trade in trades if trade["id"] not in saved]
+            session.bulk_insert_mappings(Trade, new)  # type: ignore
+            session.commit()
+        return [trade["id"] for trade in new]
+
     def get_trade(self, id: int) -> Union[Trade, None]:
-        session = self.start_session()
-        trade = session.query(Trade).filter(Trade.id == id).first()
-        session.close()
+        with self.start_session() as session:
+            trade = session.query(Trade).filter(Trade.id == id).first()
         return trade  # type: ignore[no-any-return]
 
     def remove_trade(self, id: int) -> None:
-        trade = self.get_trade(id)
-
-        if trade is None:
-            return
         with self.start_session() as session:
-            session.delete(trade)
+            session.query(Trade).filter(Trade.id == id).delete()
             session.commit()
 
     def get_day_trades(self, day: datetime) -> List[Trade]:
-        session = self.start_session()
-        trades = session.query(Trade).filter(
-                func.DATE(Trade.exit_time) == day.date()
-            ).all()
-        session.close()
+        start = datetime(day.year, day.month, day.day)
+        with self.start_session() as session:
+            trades = session.query(Trade).filter(
+                Trade.exit_time >= start,
+                Trade.exit_time < start + timedelta(days=1)
+            ).order_by(Trade.exit_time).all()
         return trades  # type: ignore[no-any-return]
 
     def get_week_trades(
         self, monday: datetime, friday: datetime
     ) -> List[Trade]:
-        session = self.start_session()
-        trades = session.query(Trade).filter(
-            Trade.exit_time >= monday,
-            Trade.exit_time <= friday
-        ).all()
-        session.close()
+        with self.start_session() as session:
+            trades = session.query(Trade).filter(
+                Trade.exit_time >= monday,
+                Trade.exit_time <= friday
+            ).order_by(Trade.exit_time).all()
+        return trades  # type: ignore[no-any-return]
+
+    def get_summary(self, start: datetime, end: datetime) -> TradeSummaryType:
+        """Number of trades, winning trades and profit of the trades closed
+        between start and end (both included)"""
+        with self.start_session() as session:
+            trades, wins, profit = session.query(
+                func.count(Trade.id),
+                func.sum(case((Trade.profit >= 0, 1), else_=0)),
+                func.sum(Trade.profit)
+            ).filter(
+                Trade.exit_time >= start,
+                Trade.exit_time <= end
+            ).one()
+        return {
+            "trades": trades,
+            "wins": int(wins or 0),
+            "profit": float(profit or 0.0),
+        }
+
+    def get_instrument_summaries(
+        self, start: datetime, end: datetime
+    ) -> Dict[str, TradeSummaryType]:
+        """Summary of every instrument with trades closed between start and
+        end, in the order of their first trade"""
+        with self.start_session() as session:
+            rows = session.query(
+                Trade.instrument,
+                func.count(Trade.id),
+                func.sum(case((Trade.profit >= 0, 1), else_=0)),
+                func.sum(Trade.profit)
+            ).filter(
+                Trade.exit_time >= start,
+                Trade.exit_time <= end
+            ).group_by(
+                Trade.instrument
+            ).order_by(func.min(Trade.exit_time)).all()
+        return {
+            instrument: {
+                "trades": trades, "wins": int(wins), "profit": float(profit)
+            }
+            for instrument, trades, wins, profit in rows
+        }
+
+    def get_day_summary(self, day: datetime) -> TradeSummaryType:
+        start = datetime(day.year, day.month, day.day)
+        return self.get_summary(
+            start, start + timedelta(days=1) - timedelta(microseconds=1)
+        )
+
+    def save_backtest_trades(self, rows: List[Dict[str, Any]]) -> int:
+        """Inserts rows of the backtest_trades table (see
+        backtest_trade_rows) with a single executemany"""
+        if len(rows) == 0:
+            return 0
+        with self.start_session() as session:
+            session.execute(insert(BacktestTrade), rows)
+            session.commit()
+        return len(rows)
+
+    def get_backtest_trades(self, run_id: str) -> List[BacktestTrade]:
+        with self.start_session() as session:
+            trades = session.query(BacktestTrade).filter(
+                BacktestTrade.run_id == run_id
+            ).order_by(BacktestTrade.id).all()
         return trades  # type: ignore[no-any-return]
@@ -9,10 +9,10 @@ class Trade(Base):
     __tablename__ = "trades"
 
     id = Column(Integer, primary_key=True)
-    instrument = Column(String(30))
-    account = Column(String(20))
+    instrument = Column(String(30), index=True)
+    account = Column(String(20), index=True)
     entry_time = Column(DateTime)
-    exit_time = Column(DateTime)
+    exit_time = Column(DateTime, index=True)
     duration = Column(Integer)
     operation = Column(String(10))
     size = Column(Float)
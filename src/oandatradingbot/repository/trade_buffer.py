@@ -0,0 +1,121 @@
+# Libraries
+from datetime import datetime
+import json
+import os
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+# Locals
+from oandatradingbot.repository.repository import Repository
+from oandatradingbot.types.trade import TradeDbType
+
+# Trades kept before they are saved
+BUFFER_SIZE = 50
+# Seconds a trade is kept before it is saved
+BUFFER_DELAY = 5.0
+
+DATETIME_FIELDS = ["entry_time", "exit_time"]
+
+
+def trade_to_json(trade: TradeDbType) -> str:
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in trade.items()
+    })
+
+
+def trade_from_json(line: str) -> TradeDbType:
+    trade: Dict[str, Any] = json.loads(line)
+    for key in DATETIME_FIELDS:
+        trade[key] = datetime.fromisoformat(trade[key])
+    return trade  # type: ignore[return-value]
+
+
+class TradeBuffer:
+    """Write-behind buffer of the trades saved in a repository. The trades
+    are inserted together once ``max_size`` trades are buffered or every
+    ``max_delay`` seconds, so there is one commit for many trades.
+
+    Every buffered trade is appended to a JSON lines journal first, which
+    is emptied once its trades are saved. The trades of the journal left by
+    a crash are saved when the buffer is created. ``close()`` saves the
+    pending trades.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        journal_path: str,
+        max_size: int = BUFFER_SIZE,
+        max_delay: float = BUFFER_DELAY,
+        on_flush: Optional[Callable[[List[TradeDbType]], Any]] = None
+    ) -> None:
+        self.repository = repository
+        self.journal_path = journal_path
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.on_flush = on_flush
+        self.trades: List[TradeDbType] = []
+        self.lock = Lock()
+        self.stopped = Event()
+        self._recover()
+        self.journal = open(journal_path, "a")
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _recover(self) -> None:
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r") as file:
+            for line in file:
+                # The last line may be incomplete
+                try:
+                    self.trades.append(trade_from_json(line))
+                except ValueError:
+                    pass
+        if len(self.trades) > 0:
+            print(f"Saving {len(self.trades)} trades of the journal")
+            self.flush()
+        else:
+            os.truncate(self.journal_path, 0)
+
+    def add(self, trade: TradeDbType) -> None:
+        with self.lock:
+            self.journal.write(f"{trade_to_json(trade)}\n")
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.trades.append(trade)
+            full = len(self.trades) >= self.max_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Saves the buffered trades. Returns the number of saved trades.
+        ``on_flush`` only receives the inserted ones, the trades recovered
+        from the journal may have been saved before the crash"""
+        with self.lock:
+            trades = self.trades
+            if len(trades) == 0:
+                return 0
+            try:
+                inserted = set(self.repository.save_trades(trades))
+            except Exception as e:
+                print(f"WARNING: Could not save {len(trades)} trades: {e}")
+                return 0
+            self.trades = []
+            os.truncate(self.journal_path, 0)
+        if self.on_flush is not None:
+            self.on_flush([
+                trade for trade in trades if trade["id"] in inserted
+            ])
+        return len(trades)
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.max_delay):
+            self.flush()
+
+    def close(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.flush()
+        self.journal.close()
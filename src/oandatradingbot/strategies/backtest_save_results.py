@@ -5,7 +5,6 @@ from typing import Dict, List, Union
 
 # Packages
 import numpy as np
-import pandas as pd
 import xlsxwriter
 
 # Locals
@@ -19,24 +18,12 @@ class SaveResults:
         self.profit_risk_ratio = profit_risk_ratio
         self.account_currency = config["account_currency"]
 
-    def _create_optimization_folder(self, optimization_name: str) -> None:
-        try:
-            os.mkdir(os.path.join(self.path, optimization_name, "temp"))
-        except OSError as e:
-            if e.errno == 17:
-                pass
-            else:
-                raise SystemExit(e)
-
-    def save_optimization_results(
+    def get_optimization_results(
         self,
-        optimization_name: str,
         strategy_name: str,
         instruments: List[str],
         trades: Dict[str, List[TradeType]]
-    ) -> None:
-        self._create_optimization_folder(optimization_name)
-
+    ) -> Dict[str, Union[int, float]]:
         pl_stats: Dict[str, Union[int, float]] = {
             "Trades": 0,
             "Won": 0,
@@ -96,22 +83,18 @@ class SaveResults:
         pl_stats["SQN"] = np.mean(r_multiples) / np.std(r_multiples) \
             * np.sqrt(r_multiples.size)
 
-        # Print strategy brief results
+        # Print strategy brief results. A short window may have no trades
+        win_rate = pl_stats["Won"] / pl_stats["Trades"] \
+            if pl_stats["Trades"] > 0 else 0.0
         print(
             f"{strategy_name} --> Won: {pl_stats['Won']} - Lost: "
-            f"{pl_stats['Lost']} - Win rate: "
-            f"{(pl_stats['Won'] / (pl_stats['Won'] + pl_stats['Lost'])):.3f} "
+            f"{pl_stats['Lost']} - Win rate: {win_rate:.3f} "
             f"- Returns: "
             f"{(pl_stats['Total profit'] - pl_stats['Total loss']):.2f} "
             f"{self.account_currency}"
         )
 
-        # Save a temporary summary file
-        df = pd.DataFrame([pl_stats])
-        df.to_csv(os.path.join(
-                self.path, optimization_name, "temp", f"{strategy_name}.csv"
-            ), sep=";"
-        )
+        return pl_stats
 
     def save_backtest_results(
         self,
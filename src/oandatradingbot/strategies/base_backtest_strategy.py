@@ -35,6 +35,7 @@ class BaseBackTestStrategy(bt.Strategy):
             self.broker
         )
         self.save_results = SaveResults(self.config, self.p.profit_risk_ratio)
+        self.optimization_results: Dict[str, Union[int, float]] = {}
         self.initialize_dicts()
 
     @staticmethod
@@ -100,7 +101,7 @@ class BaseBackTestStrategy(bt.Strategy):
                             (
                                 f"Instrument: {instrument} - "
                                 f"Close: {close:.4f} - "
-                                f"ATR: {self.atr[instrument].atr[0]:.4f} - "
+                                f"ATR: {self.get_atr(instrument):.4f} - "
                                 f"SL (pips): {s_l_pips:.2f} - TK (pips): "
                                 f"{(take_profit * units):.2f} - "
                                 f"SL price: {sl_price:.5f} - "
@@ -140,7 +141,7 @@ class BaseBackTestStrategy(bt.Strategy):
                             (
                                 f"Instrument: {instrument} - "
                                 f"Close: {close:.4f} - "
-                                f"ATR: {self.atr[instrument].atr[0]:.4f} - "
+                                f"ATR: {self.get_atr(instrument):.4f} - "
                                 f"SL (pips): {s_l_pips:.2f} - TK (pips): "
                                 f"{(take_profit * units):.2f} - "
                                 f"SL price: {sl_price:.5f} - "
@@ -165,12 +166,12 @@ class BaseBackTestStrategy(bt.Strategy):
     def stop(self) -> None:
         # Skip the trades summary when optimizing
         if self.optimize:
-            self.save_results.save_optimization_results(
-                self.config["opt_name"],
-                self.strat_name,
-                self.instruments,
-                self.order_manager.trades
-            )
+            self.optimization_results = \
+                self.save_results.get_optimization_results(
+                    self.strat_name,
+                    self.instruments,
+                    self.order_manager.trades
+                )
             return
 
         # Not optimizing -> just backtest:
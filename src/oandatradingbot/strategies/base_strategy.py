@@ -9,11 +9,11 @@ import backtrader as bt
 
 # Local
 from oandatradingbot.types.config import ConfigType
-from oandatradingbot.utils.instrument_manager import InstrumentManager
+from oandatradingbot.utils.instrument_manager import InstrumentManager, \
+    use_price_stream
 from oandatradingbot.utils.messages import Messages
 from oandatradingbot.utils.order_manager import OrderManager
 from oandatradingbot.utils.telegram_bot import TelegramBot
-from oandatradingbot.utils.tts import TTS
 
 LANGUAGES = ["ES-ES", "EN-US"]
 
@@ -31,9 +31,9 @@ class BaseStrategy(bt.Strategy):
         self.messages = Messages(
             self.config["language"], self.config["account_currency"]
         )
-        if self.config["tts"]:
-            self.tts = TTS(self.config["language_tts"], 120)
         self.instrument_manager = InstrumentManager(self.config)
+        if use_price_stream(self.config):
+            self.instrument_manager.start_price_stream()
         # Create TelegramBot instance if the bot is reachable
         if "telegram_token" in self.config:
             self.telegram_bot = TelegramBot(self.config)
@@ -117,6 +117,15 @@ class BaseStrategy(bt.Strategy):
         if timername == "session_close":
             self.order_manager.cancel_pending_trades()
 
+    def stop(self) -> None:
+        self.instrument_manager.stop_price_stream()
+        self.order_manager.close()
+        if self.config["debug"]:
+            print("OANDA REST API latencies:")
+            pprint(self.instrument_manager.client.latency_summary())
+            print("Database queries:")
+            pprint(self.order_manager.repository.metrics.summary())
+
     def next(self) -> None:
         # Iterate over each currency instrument since data
         # is a list of feeds named by each instrument
@@ -136,12 +145,12 @@ class BaseStrategy(bt.Strategy):
             if not self.order_manager.has_buyed(instrument):
                 if self.near_buy_signal(instrument):
                     self.log(self.messages.near_buy_signal(instrument))
-                    if self.config["tts"]:
-                        self.tts.say(
-                            self.messages.near_buy_signal(
-                                f"{' '.join(instrument.split('_'))}"
-                            )
+                    self.order_manager.notifications.submit(
+                        "tts",
+                        self.messages.near_buy_signal(
+                            f"{' '.join(instrument.split('_'))}"
                         )
+                    )
                 if self.enter_buy_signal(instrument) and not self.testing:
                     # Calculate SL and TK based on ATR and Profit/Risk ratio
                     units = self.instrument_manager.get_units(instrument)
@@ -193,12 +202,12 @@ class BaseStrategy(bt.Strategy):
             if not self.order_manager.has_selled(instrument):
                 if self.near_sell_signal(instrument):
                     self.log(self.messages.near_sell_signal(instrument))
-                    if self.config["tts"]:
-                        self.tts.say(
-                            self.messages.near_sell_signal(
-                                f"{' '.join(instrument.split('_'))}"
-                            )
+                    self.order_manager.notifications.submit(
+                        "tts",
+                        self.messages.near_sell_signal(
+                            f"{' '.join(instrument.split('_'))}"
                         )
+                    )
                 if self.enter_sell_signal(instrument) and not self.testing:
                     # Calculate SL and TK based on ATR and Profit/Risk ratio
                     units = self.instrument_manager.get_units(instrument)
@@ -0,0 +1,53 @@
+# Libraries
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple, TypeVar
+
+# Packages
+import numpy as np
+
+T = TypeVar("T")
+
+# (instrument, timeframe interval, indicator name, indicator parameters)
+IndicatorKeyType = Tuple[str, str, str, Tuple[Hashable, ...]]
+
+
+class IndicatorCache:
+    """Bounded least recently used cache of indicator arrays, so strategies
+    run in the same process (e.g. the optimizer combinations) reuse the
+    indicators already computed with the same parameters. Cached arrays are
+    made read only since they are shared.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.items: "OrderedDict[IndicatorKeyType, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key: IndicatorKeyType) -> bool:
+        return key in self.items
+
+    def get(self, key: IndicatorKeyType, compute: Callable[[], T]) -> T:
+        if key in self.items:
+            self.hits += 1
+            self.items.move_to_end(key)
+            value: T = self.items[key]
+            return value
+
+        self.misses += 1
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        if self.maxsize > 0:
+            self.items[key] = value
+            if len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,5 +1,5 @@
 # Libraries
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 # Packages
 from backtrader.indicators.atr import AverageTrueRange as ATR
@@ -8,11 +8,13 @@ from backtrader.indicators.macd import MACD
 from backtrader.lineseries import LineSeries
 from backtrader.lineiterator import LineIterator
 from backtrader.indicator import Indicator
-import numpy as np
 
 # Locals
 from oandatradingbot.strategies.base_backtest_strategy \
     import BaseBackTestStrategy
+from oandatradingbot.strategies.macd_ema_atr_signals \
+    import MacdEmaAtrSignals, feed_arrays
+from oandatradingbot.strategies.rolling_slope import RollingSlope
 from oandatradingbot.types.config import StrategyParamsType
 
 
@@ -29,6 +31,10 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
     }
 
     def __init__(self, **kwargs) -> None:
+        # Signals computed beforehand by the optimizer, shared by every
+        # combination with the same indicator parameters
+        self.precomputed_signals: Dict[str, MacdEmaAtrSignals] = \
+            kwargs.pop("signals", None) or {}
         super().__init__(**kwargs)
         self.strat_name = "MACDEMAATR_({}-{}-{}-{}-{})-{}{}".format(
             self.p.macd_fast_ema,
@@ -45,8 +51,11 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
         ""
         # Dictionaries whose keys are the fx instruments
         self.data: Dict[str, LineIterator] = {}
+        self.data_higher_frame: Dict[str, LineIterator] = {}
+        self.signals: Dict[str, MacdEmaAtrSignals] = {}
         self.macd: Dict[str, Indicator] = {}
         self.ema: Dict[str, List[Indicator]] = {}
+        self.slope: Dict[str, List[Indicator]] = {}
         self.atr: Dict[str, Indicator] = {}
         self.data_ready: Dict[str, bool] = {}
         # Fill the previous dictionaries
@@ -61,6 +70,15 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
                     and d._name != data0._name
                 ][0]
             self.data[instrument] = data0
+            self.data_ready[instrument] = False
+            if len(self.timeframes) > 1:
+                self.data_higher_frame[instrument] = data1
+            if instrument in self.precomputed_signals:
+                # No need to compute the indicators again
+                self.signals[instrument] = \
+                    self.precomputed_signals[instrument]
+                continue
+
             self.macd[instrument] = MACD(
                 data0.close,
                 period_me1=self.p.macd_fast_ema,
@@ -73,22 +91,107 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
             )
             if len(self.timeframes) > 1:
                 self.ema[instrument].append(EMA(data1.close, period=100))
+            self.slope[instrument] = [
+                RollingSlope(ema, period=period)  # type: ignore
+                for ema, period in zip(self.ema[instrument], (10, 5))
+            ]
             self.atr[instrument] = ATR(data0, period=self.p.atr_period)
-            self.data_ready[instrument] = False
+
+            # Precompute the entry signals over the whole feed
+            arrays = feed_arrays(data0)
+            close_higher_frame = None
+            if len(self.timeframes) > 1:
+                arrays_higher_frame = feed_arrays(data1)
+                if arrays_higher_frame is None:
+                    arrays = None
+                else:
+                    close_higher_frame = arrays_higher_frame["close"]
+            if arrays is not None:
+                self.signals[instrument] = MacdEmaAtrSignals(
+                    arrays["high"],
+                    arrays["low"],
+                    arrays["close"],
+                    self.p.macd_fast_ema,
+                    self.p.macd_slow_ema,
+                    self.p.macd_signal_ema,
+                    self.p.ema_period,
+                    self.p.atr_period,
+                    close_higher_frame
+                )
+
+    def get_atr(self, instrument: str) -> float:
+        if instrument in self.atr:
+            return self.atr[instrument].atr[0]  # type: ignore
+        index = self._get_signals_index(instrument)
+        return float(self.signals[instrument].atr[index[0]])  # type: ignore
 
     def get_stop_loss(self, instrument: str) -> float:
         return (  # type: ignore
-            self.atr[instrument].atr[0] * self.p.atr_distance
+            self.get_atr(instrument) * self.p.atr_distance
         )
 
     def get_take_profit(self, instrument: str) -> float:
         return (  # type: ignore
-            self.atr[instrument].atr[0]
+            self.get_atr(instrument)
             * self.p.atr_distance
             * self.p.profit_risk_ratio
         )
 
+    def _get_signals_index(
+        self, instrument: str
+    ) -> Optional[Tuple[int, Optional[int]]]:
+        """Returns the index of the current bar within the precomputed
+        signals of both time frames. If the bars delivered by the feeds do not
+        match the precomputed ones (e.g. the feed is resampled to a different
+        compression) the precomputed signals are discarded and None returned.
+        """
+        signals = self.signals[instrument]
+        data0 = self.data[instrument]
+        index = len(data0) - 1
+        if index >= signals.close.size \
+                or signals.close[index] != data0.close[0]:
+            self._discard_signals(instrument)
+            return None
+        if signals.close_higher_frame is None:
+            return index, None
+
+        data1 = self.data_higher_frame[instrument]
+        index_higher_frame = len(data1) - 1
+        if index_higher_frame >= signals.close_higher_frame.size \
+                or signals.close_higher_frame[index_higher_frame] \
+                != data1.close[0]:
+            self._discard_signals(instrument)
+            return None
+        return index, index_higher_frame
+
+    def _discard_signals(self, instrument: str) -> None:
+        if instrument in self.precomputed_signals:
+            # There are no indicators to fall back on
+            raise SystemExit(
+                f"ERROR: The precomputed signals of {instrument} do not "
+                "match its feed"
+            )
+        self.signals.pop(instrument, None)
+
     def enter_buy_signal(self, instrument: str) -> bool:
+        """Looks up the current bar in the precomputed buy signals, otherwise
+        checks the buy conditions on the current bar"""
+        if instrument in self.signals:
+            index = self._get_signals_index(instrument)
+            if index is not None:
+                return self.signals[instrument].enter_buy_signal(*index)
+        return self.check_buy_signal(instrument)
+
+    def enter_sell_signal(self, instrument: str) -> bool:
+        """Looks up the current bar in the precomputed sell signals,
+        otherwise checks the sell conditions on the current bar"""
+        if instrument in self.signals:
+            index = self._get_signals_index(instrument)
+            if index is not None:
+                return self.signals[instrument].enter_sell_signal(*index)
+        return self.check_sell_signal(instrument)
+
+    def check_buy_signal(self, instrument: str) -> bool:
         """Returns True if the following conditions are met:
             - MACD line above signal line
             - MACD line and signal line are below 0
@@ -112,8 +215,6 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
         macd: LineSeries = self.macd[instrument].macd
         signal: LineSeries = self.macd[instrument].signal
         ema: LineSeries = self.ema[instrument][0].ema
-        if len(self.ema[instrument]) > 1:
-            ema_higher_frame: LineSeries = self.ema[instrument][1].ema
         close: LineSeries = self.data[instrument].close
 
         # Look for previous positive MACD signal values
@@ -126,16 +227,12 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
         ]
 
         # Check price trend in both time frames
-        x_ema = np.arange(len(close.get(size=10)))
-        slope_ema, _ = np.polyfit(x_ema, ema.get(size=10), 1)
-        if len(self.ema[instrument]) < 2:
+        slope_ema = self.slope[instrument][0].slope[0]
+        if len(self.slope[instrument]) < 2:
             # To always be True if there is only one timeframe
             slope_ema_higher_frame = 1
         else:
-            x_ema_higher_frame = np.arange(len(close.get(size=5)))
-            slope_ema_higher_frame, _ = np.polyfit(
-                x_ema_higher_frame, ema_higher_frame.get(size=5), 1
-            )
+            slope_ema_higher_frame = self.slope[instrument][1].slope[0]
 
         return (
             macd[0] > signal[0]
@@ -148,7 +245,7 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
             and slope_ema_higher_frame > 0
         )
 
-    def enter_sell_signal(self, instrument: str) -> bool:
+    def check_sell_signal(self, instrument: str) -> bool:
         """Returns True if the following conditions are met:
             - MACD line below signal line
             - MACD line and signal line are above 0
@@ -172,8 +269,6 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
         macd: LineSeries = self.macd[instrument].macd
         signal: LineSeries = self.macd[instrument].signal
         ema: LineSeries = self.ema[instrument][0].ema
-        if len(self.ema[instrument]) > 1:
-            ema_higher_frame: LineSeries = self.ema[instrument][1].ema
         close: LineSeries = self.data[instrument].close
 
         # Look for previous negatives MACD signal values
@@ -186,16 +281,12 @@ class MacdEmaAtrBackTest(BaseBackTestStrategy):
         ]
 
         # Check price trend in both time frames
-        x_ema = np.arange(len(close.get(size=10)))
-        slope_ema, _ = np.polyfit(x_ema, ema.get(size=10), 1)
-        if len(self.ema[instrument]) < 2:
+        slope_ema = self.slope[instrument][0].slope[0]
+        if len(self.slope[instrument]) < 2:
             # To always be True if there is only one timeframe
             slope_ema_higher_frame = -1
         else:
-            x_ema_higher_frame = np.arange(len(close.get(size=5)))
-            slope_ema_higher_frame, _ = np.polyfit(
-                x_ema_higher_frame, ema_higher_frame.get(size=5), 1
-            )
+            slope_ema_higher_frame = self.slope[instrument][1].slope[0]
 
         return (
             macd[0] < signal[0]
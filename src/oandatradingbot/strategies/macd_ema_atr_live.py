@@ -8,10 +8,10 @@ from backtrader.indicators.macd import MACD
 from backtrader.lineseries import LineSeries
 from backtrader.lineiterator import LineIterator
 from backtrader.indicator import Indicator
-import numpy as np
 
 # Locals
 from oandatradingbot.strategies.base_strategy import BaseStrategy
+from oandatradingbot.strategies.rolling_slope import RollingSlope
 from oandatradingbot.types.config import StrategyParamsType
 
 
@@ -45,6 +45,7 @@ class MacdEmaAtrLive(BaseStrategy):
         self.data: Dict[str, LineIterator] = {}
         self.macd: Dict[str, Indicator] = {}
         self.ema: Dict[str, List[Indicator]] = {}
+        self.slope: Dict[str, List[Indicator]] = {}
         self.atr: Dict[str, Indicator] = {}
         self.data_ready: Dict[str, bool] = {}
         # Fill the previous dictionaries
@@ -71,6 +72,10 @@ class MacdEmaAtrLive(BaseStrategy):
             )
             if len(self.timeframes) > 1:
                 self.ema[instrument].append(EMA(data1.close, period=100))
+            self.slope[instrument] = [
+                RollingSlope(ema, period=period)  # type: ignore
+                for ema, period in zip(self.ema[instrument], (10, 5))
+            ]
             self.atr[instrument] = ATR(data0, period=self.p.atr_period)
             self.data_ready[instrument] = False
 
@@ -150,8 +155,6 @@ class MacdEmaAtrLive(BaseStrategy):
         macd: LineSeries = self.macd[instrument].macd
         signal: LineSeries = self.macd[instrument].signal
         ema: LineSeries = self.ema[instrument][0].ema
-        if len(self.ema[instrument]) > 1:
-            ema_higher_frame: LineSeries = self.ema[instrument][1].ema
         close: LineSeries = self.data[instrument].close
 
         # Look for previous positive MACD signal values
@@ -164,16 +167,12 @@ class MacdEmaAtrLive(BaseStrategy):
         ]
 
         # Check price trend in both time frames
-        x_ema = np.arange(len(close.get(size=10)))
-        slope_ema, _ = np.polyfit(x_ema, ema.get(size=10), 1)
-        if len(self.ema[instrument]) < 2:
+        slope_ema = self.slope[instrument][0].slope[0]
+        if len(self.slope[instrument]) < 2:
             # To always be True if there is only one timeframe
             slope_ema_higher_frame = 1
         else:
-            x_ema_higher_frame = np.arange(len(close.get(size=5)))
-            slope_ema_higher_frame, _ = np.polyfit(
-                x_ema_higher_frame, ema_higher_frame.get(size=5), 1
-            )
+            slope_ema_higher_frame = self.slope[instrument][1].slope[0]
 
         return (
             macd[0] > signal[0]
@@ -249,8 +248,6 @@ class MacdEmaAtrLive(BaseStrategy):
         macd: LineSeries = self.macd[instrument].macd
         signal: LineSeries = self.macd[instrument].signal
         ema: LineSeries = self.ema[instrument][0].ema
-        if len(self.ema[instrument]) > 1:
-            ema_higher_frame: LineSeries = self.ema[instrument][1].ema
         close: LineSeries = self.data[instrument].close
 
         # Look for previous negatives MACD signal values
@@ -262,16 +259,12 @@ class MacdEmaAtrLive(BaseStrategy):
         ]
 
         # Check price trend in both time frames
-        x_ema = np.arange(len(close.get(size=10)))
-        slope_ema, _ = np.polyfit(x_ema, ema.get(size=10), 1)
-        if len(self.ema[instrument]) < 2:
+        slope_ema = self.slope[instrument][0].slope[0]
+        if len(self.slope[instrument]) < 2:
             # To always be True if there is only one timeframe
             slope_ema_higher_frame = -1
         else:
-            x_ema_higher_frame = np.arange(len(close.get(size=5)))
-            slope_ema_higher_frame, _ = np.polyfit(
-                x_ema_higher_frame, ema_higher_frame.get(size=5), 1
-            )
+            slope_ema_higher_frame = self.slope[instrument][1].slope[0]
 
         return (
             macd[0] < signal[0]
@@ -0,0 +1,325 @@
+# Libraries
+import copy
+import math
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# Packages
+import numpy as np
+from numpy.typing import NDArray
+from pandas import DataFrame
+
+# Locals
+from oandatradingbot.strategies.indicator_cache import IndicatorCache
+from oandatradingbot.utils.feed_cache import COMPACT_DTYPE
+
+FloatArray = NDArray[np.floating[Any]]
+BoolArray = NDArray[np.bool_]
+
+# Number of bars checked by the entry conditions
+MACD_BARS = 5
+PRICE_BARS = 20
+EMA_SLOPE_BARS = 10
+HIGHER_FRAME_EMA_PERIOD = 100
+HIGHER_FRAME_SLOPE_BARS = 5
+# Arrays indexed by the bars of each time frame
+WINDOW_ARRAYS = (
+    "close", "macd", "signal", "ema", "atr", "slope_ema", "buy", "sell"
+)
+WINDOW_ARRAYS_HIGHER_FRAME = (
+    "close_higher_frame", "bullish_higher_frame", "bearish_higher_frame"
+)
+
+
+def float_array(values: Any) -> FloatArray:
+    """Values as float64, or float32 if they are already float32 (compact
+    feeds)"""
+    array: FloatArray = np.asarray(values)
+    if array.dtype == COMPACT_DTYPE:
+        return array
+    return array.astype(np.float64, copy=False)
+
+
+def feed_arrays(data: Any) -> Optional[Dict[str, FloatArray]]:
+    """Returns the high, low and close arrays of a backtrader data feed
+    created from a pandas DataFrame or NumPy arrays (ArrayData), or None if
+    the feed is not backed by them (e.g. a live feed)
+    """
+    dataname = getattr(data.p, "dataname", None)
+    if isinstance(dataname, DataFrame):
+        return frame_arrays(dataname)
+    if isinstance(dataname, dict):
+        try:
+            return {
+                line: float_array(dataname[line.capitalize()])
+                for line in ("high", "low", "close")
+            }
+        except KeyError:
+            return None
+    return None
+
+
+def frame_arrays(frame: DataFrame) -> Optional[Dict[str, FloatArray]]:
+    """Returns the high, low and close columns of an OHLC DataFrame"""
+    columns = {str(col).lower(): col for col in frame.columns}
+    try:
+        return {
+            line: float_array(frame[columns[line]].to_numpy())
+            for line in ("high", "low", "close")
+        }
+    except KeyError:
+        return None
+
+
+def shift(values: FloatArray, bars: int) -> FloatArray:
+    """Values of the array ``bars`` bars ago, NaN where there is no data"""
+    shifted = np.full(values.shape, np.nan, dtype=values.dtype)
+    if bars < values.size:
+        shifted[bars:] = values[:values.size - bars]
+    return shifted
+
+
+def exponential_smoothing(
+    values: FloatArray, period: int, alpha: float, first: int = 0
+) -> FloatArray:
+    """Exponential smoothing seeded with the arithmetic mean of the first
+    ``period`` values, starting at the ``first`` index (the first index where
+    the input has a value). It is computed exactly as backtrader does so both
+    produce the same floating point results.
+    """
+    result = np.full(values.size, np.nan)
+    seed = first + period - 1
+    if seed >= values.size:
+        return result
+    data = values.tolist()
+    prev = math.fsum(data[first:seed + 1]) / period
+    smoothed = [prev]
+    alpha1 = 1.0 - alpha
+    # The recursion depends on the previous value and cannot be vectorized
+    for value in data[seed + 1:]:
+        prev = prev * alpha1 + value * alpha
+        smoothed.append(prev)
+    result[seed:] = smoothed
+    return result
+
+
+def ema(values: FloatArray, period: int, first: int = 0) -> FloatArray:
+    return exponential_smoothing(values, period, 2.0 / (1.0 + period), first)
+
+
+def macd(
+    close: FloatArray, fast_period: int, slow_period: int, signal_period: int
+) -> Dict[str, FloatArray]:
+    macd_line = ema(close, fast_period) - ema(close, slow_period)
+    return {
+        "macd": macd_line,
+        "signal": ema(
+            macd_line, signal_period, max(fast_period, slow_period) - 1
+        )
+    }
+
+
+def atr(
+    high: FloatArray, low: FloatArray, close: FloatArray, period: int
+) -> FloatArray:
+    prev_close = shift(close, 1)
+    # Same comparisons as python max and min to handle NaN like backtrader
+    true_high = np.where(prev_close > high, prev_close, high)
+    true_low = np.where(prev_close < low, prev_close, low)
+    # The true range needs the previous close, so it starts at the 2nd bar
+    return exponential_smoothing(
+        true_high - true_low, period, 1.0 / period, 1
+    )
+
+
+def rolling_count(condition: BoolArray, bars: int) -> FloatArray:
+    """Number of times the condition has been met during the last ``bars``
+    bars, NaN where there are not enough bars
+    """
+    counts = np.zeros(condition.size + 1)
+    counts[1:] = np.cumsum(condition)
+    window = np.full(condition.size, np.nan)
+    window[bars - 1:] = counts[bars:] - counts[:-bars]
+    return window
+
+
+def rolling_slope(values: FloatArray, bars: int) -> FloatArray:
+    """Least squares slope of the last ``bars`` values, NaN if any of those
+    values is NaN or there are not enough bars
+    """
+    slope = np.full(values.size, np.nan)
+    if values.size < bars:
+        return slope
+    windows = np.lib.stride_tricks.sliding_window_view(values, bars)
+    x = np.arange(bars, dtype=np.float64)
+    x -= x.mean()
+    slope[bars - 1:] = windows @ x / np.dot(x, x)
+    return slope
+
+
+class MacdEmaAtrSignals:
+    """Computes the MACD, EMA and ATR indicators and the entry conditions of
+    the MACD-EMA-ATR strategy over the whole feed at once, so a backtest only
+    has to index the resulting boolean arrays on every bar.
+
+    The conditions of the higher time frame are computed over its own bars,
+    so they are indexed separately with the index of the higher time frame.
+
+    If an indicator cache is given, the indicators are looked up in it by
+    instrument and the ``intervals`` of both time frames before computing
+    them. The indicators of float32 (compact) feeds are kept as float32.
+    """
+
+    def __init__(
+        self,
+        high: FloatArray,
+        low: FloatArray,
+        close: FloatArray,
+        macd_fast_ema: int,
+        macd_slow_ema: int,
+        macd_signal_ema: int,
+        ema_period: int,
+        atr_period: int,
+        close_higher_frame: Optional[FloatArray] = None,
+        cache: Optional[IndicatorCache] = None,
+        instrument: str = "",
+        intervals: Sequence[str] = ("", "")
+    ) -> None:
+        self.cache = cache
+        self.instrument = instrument
+        self.intervals = intervals
+
+        self.close = close
+        fast = self._cached(
+            0, "ema", (macd_fast_ema,), lambda: ema(close, macd_fast_ema)
+        )
+        slow = self._cached(
+            0, "ema", (macd_slow_ema,), lambda: ema(close, macd_slow_ema)
+        )
+        self.macd = self._cached(
+            0, "macd", (macd_fast_ema, macd_slow_ema), lambda: fast - slow
+        )
+        self.signal = self._cached(
+            0,
+            "macd_signal",
+            (macd_fast_ema, macd_slow_ema, macd_signal_ema),
+            lambda: ema(
+                self.macd,
+                macd_signal_ema,
+                max(macd_fast_ema, macd_slow_ema) - 1
+            )
+        )
+        self.ema = self._cached(
+            0, "ema", (ema_period,), lambda: ema(close, ema_period)
+        )
+        self.atr = self._cached(
+            0, "atr", (atr_period,), lambda: atr(high, low, close, atr_period)
+        )
+        self.slope_ema = self._cached(
+            0,
+            "ema_slope",
+            (ema_period, EMA_SLOPE_BARS),
+            lambda: rolling_slope(self.ema, EMA_SLOPE_BARS)
+        )
+        self._compute_entries()
+
+        self.close_higher_frame = close_higher_frame
+        self.higher_frame = close_higher_frame is not None
+        if close_higher_frame is not None:
+            ema_higher_frame = self._cached(
+                1,
+                "ema",
+                (HIGHER_FRAME_EMA_PERIOD,),
+                lambda: ema(close_higher_frame, HIGHER_FRAME_EMA_PERIOD)
+            )
+            slope_higher_frame = self._cached(
+                1,
+                "ema_slope",
+                (HIGHER_FRAME_EMA_PERIOD, HIGHER_FRAME_SLOPE_BARS),
+                lambda: rolling_slope(
+                    ema_higher_frame, HIGHER_FRAME_SLOPE_BARS
+                )
+            )
+            self.bullish_higher_frame = slope_higher_frame > 0
+            self.bearish_higher_frame = slope_higher_frame < 0
+
+    def _cached(
+        self,
+        timeframe: int,
+        name: str,
+        params: Tuple[int, ...],
+        compute: Callable[[], FloatArray]
+    ) -> FloatArray:
+        def compute_as_feed() -> FloatArray:
+            return compute().astype(self.close.dtype, copy=False)
+
+        if self.cache is None:
+            return compute_as_feed()
+        return self.cache.get(
+            (self.instrument, self.intervals[timeframe], name, params),
+            compute_as_feed
+        )
+
+    def _compute_entries(self) -> None:
+        macd, signal, ema = self.macd, self.signal, self.ema
+        macd_ago = shift(macd, MACD_BARS)
+        signal_ago = shift(signal, MACD_BARS)
+        ema_prev = shift(ema, 1)
+        ema_ago = shift(ema, EMA_SLOPE_BARS)
+
+        # The strategy does not run until every indicator has a value
+        ready = np.isfinite(self.atr)
+        self.buy: BoolArray = (
+            ready
+            & (macd > signal)
+            & (signal < 0)
+            & (macd_ago < signal_ago)
+            & (rolling_count(macd > 0, MACD_BARS) == 0)
+            & (rolling_count(self.close > ema, PRICE_BARS) == PRICE_BARS)
+            & (ema_prev >= ema_ago)
+            & (self.slope_ema > 0)
+        )
+        self.sell: BoolArray = (
+            ready
+            & (macd < signal)
+            & (signal > 0)
+            & (macd_ago > signal_ago)
+            & (rolling_count(macd < 0, MACD_BARS) == 0)
+            & (rolling_count(self.close < ema, PRICE_BARS) == PRICE_BARS)
+            & (ema_prev <= ema_ago)
+            & (self.slope_ema < 0)
+        )
+
+    def window(
+        self, start: int, start_higher_frame: int = 0
+    ) -> "MacdEmaAtrSignals":
+        """Signals of the bars from ``start`` (``start_higher_frame`` in the
+        higher time frame) on, for a backtest of a window of the feed. They
+        are computed with the bars before the window, so there is no warm up
+        within it. The arrays are views, not copies"""
+        signals = copy.copy(self)
+        for name in WINDOW_ARRAYS:
+            setattr(signals, name, getattr(self, name)[start:])
+        if self.higher_frame:
+            for name in WINDOW_ARRAYS_HIGHER_FRAME:
+                setattr(
+                    signals, name, getattr(self, name)[start_higher_frame:]
+                )
+        return signals
+
+    def enter_buy_signal(
+        self, index: int, index_higher_frame: Optional[int] = None
+    ) -> bool:
+        if not self.buy[index]:
+            return False
+        if self.higher_frame and index_higher_frame is not None:
+            return bool(self.bullish_higher_frame[index_higher_frame])
+        return True
+
+    def enter_sell_signal(
+        self, index: int, index_higher_frame: Optional[int] = None
+    ) -> bool:
+        if not self.sell[index]:
+            return False
+        if self.higher_frame and index_higher_frame is not None:
+            return bool(self.bearish_higher_frame[index_higher_frame])
+        return True
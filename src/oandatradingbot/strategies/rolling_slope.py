@@ -0,0 +1,84 @@
+# Libraries
+import math
+from typing import Any
+
+# Packages
+from backtrader.indicator import Indicator
+
+
+class RollingSlope(Indicator):
+    """Least squares slope of the last ``period`` values of the data, i.e.
+    the slope returned by ``np.polyfit(np.arange(period), values, 1)``.
+
+    The sum of the values and the sum of the values weighted by their
+    position in the window are kept as running sums, so each bar is updated
+    in O(1). The sums are recomputed from the window every ``resync`` bars to
+    bound the accumulated rounding error.
+    """
+
+    lines: Any = ("slope",)
+    params = (("period", 10), ("resync", 1000))
+
+    def __init__(self) -> None:
+        self.addminperiod(self.p.period)
+        n = self.p.period
+        # Sum of the x values and denominator of the least squares slope
+        self.sum_x = n * (n - 1) / 2
+        self.denominator = n * n * (n - 1) * (n + 1) / 12
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+        self.bars = 0
+        # Sums before the update of the current bar and its length
+        self.prev_sums = (self.sum_y, self.sum_xy, self.bars)
+        self.length = 0
+
+    def _slope(self) -> float:
+        return (  # type: ignore
+            self.p.period * self.sum_xy - self.sum_x * self.sum_y
+        ) / self.denominator
+
+    def _resync(self, values) -> None:
+        self.sum_y = math.fsum(values)
+        self.sum_xy = math.fsum(i * y for i, y in enumerate(values))
+        self.bars = 0
+
+    def _update(self, oldest: float, newest: float) -> None:
+        # Every value moves one position back in the window: x*y becomes
+        # (x-1)*y, the oldest one leaves and the newest enters at period-1
+        self.sum_y -= oldest
+        self.sum_xy -= self.sum_y
+        self.sum_y += newest
+        self.sum_xy += (self.p.period - 1) * newest
+        self.bars += 1
+
+    def nextstart(self) -> None:
+        self._resync(self.data.get(size=self.p.period))
+        self.length = len(self)
+        self.lines.slope[0] = self._slope()
+
+    def next(self) -> None:
+        if len(self) == self.length:
+            # The same bar is calculated again when the data clock has not
+            # moved (e.g. a higher time frame), so undo its previous update
+            self.sum_y, self.sum_xy, self.bars = self.prev_sums
+        else:
+            self.prev_sums = (self.sum_y, self.sum_xy, self.bars)
+            self.length = len(self)
+        if self.bars >= self.p.resync \
+                or math.isnan(self.sum_y) or math.isnan(self.sum_xy):
+            self._resync(self.data.get(size=self.p.period))
+        else:
+            self._update(self.data[-self.p.period], self.data[0])
+        self.lines.slope[0] = self._slope()
+
+    def once(self, start: int, end: int) -> None:
+        data = self.data.array
+        slope = self.lines.slope.array
+        period = self.p.period
+        for i in range(start, end):
+            if i == start or self.bars >= self.p.resync \
+                    or math.isnan(self.sum_y) or math.isnan(self.sum_xy):
+                self._resync(data[i - period + 1:i + 1])
+            else:
+                self._update(data[i - period], data[i])
+            slope[i] = self._slope()
@@ -29,11 +29,37 @@ TimeFrameType = TypedDict(
     }
 )
 
+SearchType = TypedDict(
+    "SearchType",
+    {
+        "method": Literal["grid", "random", "halving", "tpe"],
+        "metric": Literal["SQN", "Returns", "Win rate"],
+        "samples": int,
+        "seed": int,
+        "min_fraction": float,
+        "eta": int,
+        "startup": int,
+        "candidates": int,
+        "gamma": float,
+    },
+    total=False,
+)
+
+WalkForwardType = TypedDict(
+    "WalkForwardType", {"folds": int, "in_sample": float}, total=False
+)
+
 
 ConfigType = TypedDict(
     "ConfigType",
     {
         "results_path": str,
+        "cache_path": str,
+        "derive_higher_timeframe": bool,
+        "compact_feeds": bool,
+        "data_source": Union[Literal["yahoo"], Literal["oanda"]],
+        "history_start": str,
+        "candle_price": str,
         "instruments": List[str],
         "cash": float,
         "risk": float,
@@ -41,18 +67,29 @@ ConfigType = TypedDict(
         "language": Union[Literal["ES-ES"], Literal["EN-US"]],
         "timeframes": List[TimeFrameType],
         "strategy_params": StrategyParamsType,
+        "search": SearchType,
+        "walk_forward": WalkForwardType,
         "profit_risk_ratio": float,
         "debug": bool,
         "testing": bool,
         "testing_date": datetime,
         "testing_directory": str,
         "optimize": bool,
+        "workers": int,
         "opt_name": str,
+        "run_id": str,
         "database_uri": str,
         "account_type": Literal["Demo", "Brokerage"],
         "practice": bool,
         "oanda_token": str,
         "oanda_account_id": str,
+        "oanda_connect_timeout": float,
+        "oanda_read_timeout": float,
+        "oanda_retries": int,
+        "price_stream": bool,
+        "trade_buffer_size": int,
+        "trade_buffer_delay": float,
+        "trade_journal": str,
         "language_tts": Union[Literal["ES-ES"], Literal["EN-US"]],
         "telegram_token": str,
         "telegram_chat_id": str,
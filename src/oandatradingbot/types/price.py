@@ -0,0 +1,14 @@
+# Libraries
+from typing import TypedDict
+
+PriceType = TypedDict(
+    "PriceType",
+    {
+        "bid": float,
+        "ask": float,
+        # Time of the price sent by OANDA
+        "time": str,
+        # time.monotonic() when the price was received
+        "received": float,
+    },
+)
@@ -33,6 +33,15 @@ TradeDbType = TypedDict(
     },
 )
 
+TradeSummaryType = TypedDict(
+    "TradeSummaryType",
+    {
+        "trades": int,
+        "wins": int,
+        "profit": float,
+    },
+)
+
 TradeType = TypedDict(
     "TradeType",
     {
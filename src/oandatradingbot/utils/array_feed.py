@@ -0,0 +1,107 @@
+# Libraries
+from typing import Any, Dict, List, Tuple
+
+# Packages
+import backtrader as bt
+from numpy.typing import NDArray
+import pandas as pd
+from pandas import DataFrame
+
+# Locals
+from oandatradingbot.types.config import TimeFrameType
+
+# Key of the bar timestamps (int64 nanoseconds since epoch, UTC)
+INDEX = "index"
+# Lines of the feed and the columns they are read from
+COLUMNS: List[Tuple[str, str]] = [
+    ("open", "Open"),
+    ("high", "High"),
+    ("low", "Low"),
+    ("close", "Close"),
+    ("volume", "Volume"),
+]
+NS_PER_DAY = 24 * 60 * 60 * 10 ** 9
+# Backtrader (matplotlib) number of 1970-01-01
+EPOCH_DAYS = 719163.0
+
+ArraysType = Dict[str, NDArray[Any]]
+
+
+def arrays_from_frame(frame: DataFrame) -> ArraysType:
+    """Timestamps and columns of a feed. The columns are views of the
+    DataFrame (not copies) when their values are stored together"""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC")
+    arrays: ArraysType = {INDEX: index.asi8}
+    for _, column in COLUMNS:
+        if column in frame.columns:
+            arrays[column] = frame[column].to_numpy()
+    return arrays
+
+
+class ArrayData(bt.feed.DataBase):
+    """Backtrader feed reading the bars from NumPy arrays, which ``dataname``
+    maps by column name plus the timestamps under ``INDEX`` (see
+    arrays_from_frame and FeedCache.load_arrays). The arrays are not copied,
+    so they can be memory mapped files or shared memory read by several
+    processes.
+
+    Every bar is two array lookups per line, instead of the DataFrame
+    lookups of bt.feeds.PandasData.
+    """
+
+    def start(self) -> None:
+        super().start()
+        arrays: ArraysType = self.p.dataname
+        self._datetimes = arrays[INDEX] / NS_PER_DAY + EPOCH_DAYS
+        self._columns = [
+            (getattr(self.lines, line), arrays[column])
+            for line, column in COLUMNS if column in arrays
+        ]
+        self._idx = -1
+
+    def _load(self) -> bool:
+        self._idx += 1
+        if self._idx >= len(self._datetimes):
+            return False
+        idx = self._idx
+        self.lines.datetime[0] = self._datetimes[idx]
+        for line, values in self._columns:
+            line[0] = values[idx]
+        return True
+
+
+def add_feeds(
+    cerebro: bt.Cerebro,
+    instrument: str,
+    feeds: List[DataFrame],
+    timeframes: List[TimeFrameType],
+    preresampled: bool = False
+) -> None:
+    """Adds the feed of every timeframe to cerebro. Preresampled feeds
+    already hold the bars of their timeframe, so they are added without
+    backtrader's resampler filter"""
+    for i, tframe in enumerate(timeframes):
+        # The arrays are views of the feeds, not copies
+        arrays = arrays_from_frame(feeds[i])
+        if i == 0:
+            data_name = instrument
+        else:
+            data_name = f"{instrument}t{tframe['compression']}"
+        timeframe = getattr(bt.TimeFrame, tframe["timeframe"])
+
+        if preresampled:
+            cerebro.adddata(ArrayData(
+                dataname=arrays,
+                name=data_name,
+                timeframe=timeframe,
+                compression=tframe["compression"]
+            ))
+        else:
+            cerebro.resampledata(
+                ArrayData(dataname=arrays, name=instrument),
+                name=data_name,
+                timeframe=timeframe,
+                compression=tframe["compression"]
+            )
@@ -4,14 +4,14 @@ from datetime import datetime
 from typing import Literal
 import os
 
-# Packages
-import requests
-
 # Locals
+from oandatradingbot.optimizer.search import METRICS, SEARCH_METHODS
 from oandatradingbot.repository.repository import Repository
 from oandatradingbot.types.config import ConfigType
-from oandatradingbot.utils.financial_feed import INTERVALS
-from oandatradingbot.utils.instrument_manager import practice_url, prod_url
+from oandatradingbot.utils.financial_feed import DATA_SOURCES, INTERVALS, \
+    timeframe_rule
+from oandatradingbot.utils.oanda_candles import granularity, valid_price
+from oandatradingbot.utils.oanda_client import get_client
 from oandatradingbot.utils.telegram_bot import TelegramBot
 
 LANGUAGES = ["EN-US", "ES-ES"]
@@ -41,6 +41,29 @@ def check_config(
         raise SystemExit(
             "ERROR: timeframes can only contain up to two objects"
         )
+    if "data_source" in config and config["data_source"] not in DATA_SOURCES:
+        raise SystemExit(
+            f"ERROR: Invalid data_source. Valid values are {DATA_SOURCES}"
+        )
+    # Backtest with OANDA candles instead of Yahoo Finance feeds
+    oanda_feeds = mode != "live" and "data_source" in config \
+        and config["data_source"] == "oanda"
+    if oanda_feeds:
+        for timeframe in ch_config["timeframes"]:
+            granularity(timeframe)
+        if "candle_price" in config \
+                and not valid_price(config["candle_price"]):
+            raise SystemExit(
+                "ERROR: Invalid candle_price. Use M, B, A or several of them, "
+                "e.g. BA"
+            )
+        if "history_start" in config:
+            try:
+                datetime.fromisoformat(config["history_start"])
+            except ValueError:
+                raise SystemExit(
+                    "ERROR: history_start must be a date, e.g. 2021-01-31"
+                )
     if mode != "live":
         for timeframe in ch_config["timeframes"]:
             if "interval" not in timeframe:
@@ -48,6 +71,10 @@ def check_config(
                     f"ERROR: Please define a timeframe interval in the "
                     f"config file. Valid values are {INTERVALS}"
                 )
+        if "derive_higher_timeframe" in config \
+                and config["derive_higher_timeframe"]:
+            for timeframe in ch_config["timeframes"][1:]:
+                timeframe_rule(timeframe)
     if "strategy_params" not in config:
         raise SystemExit(
             "ERROR: Please define the strategy parameters in the config file"
@@ -78,8 +105,9 @@ def check_config(
         )
         ch_config["database_uri"] = f"sqlite:///{db_path}"
 
-    # Check database connection
-    if mode == "live" and "database_uri" in ch_config:
+    # Check database connection. Backtest trades are only saved in the
+    # database if database_uri is provided
+    if "database_uri" in ch_config:
         repository = Repository(ch_config["database_uri"])
         repository._check_session()
 
@@ -117,7 +145,7 @@ def check_config(
         ch_config["testing"] = False
 
     # Manage account_type (internal field) and check oanda token
-    if mode == "live":
+    if mode == "live" or oanda_feeds:
         if "practice" not in config:
             ch_config["practice"] = True
         ch_config["account_type"] = \
@@ -136,12 +164,30 @@ def check_config(
                 "ERROR: Please define the oanda_token in the config file"
             )
 
+        # Check the settings of the requests to Oanda
+        if "oanda_connect_timeout" in config \
+                and config["oanda_connect_timeout"] <= 0:
+            raise SystemExit(
+                "ERROR: oanda_connect_timeout must be greater than 0"
+            )
+        if "oanda_read_timeout" in config \
+                and config["oanda_read_timeout"] <= 0:
+            raise SystemExit(
+                "ERROR: oanda_read_timeout must be greater than 0"
+            )
+        if "oanda_retries" in config and config["oanda_retries"] < 0:
+            raise SystemExit("ERROR: oanda_retries cannot be negative")
+        if "trade_buffer_size" in config \
+                and config["trade_buffer_size"] < 1:
+            raise SystemExit("ERROR: trade_buffer_size must be at least 1")
+        if "trade_buffer_delay" in config \
+                and config["trade_buffer_delay"] <= 0:
+            raise SystemExit(
+                "ERROR: trade_buffer_delay must be greater than 0"
+            )
+
         # Make a request to Oanda to check token and account id
-        check_oanda_account(
-            ch_config["practice"],
-            ch_config["oanda_token"],
-            ch_config["oanda_account_id"]
-        )
+        check_oanda_account(ch_config)
 
     # Create results path
     if mode != "live":
@@ -167,6 +213,50 @@ def check_config(
             else:
                 raise SystemExit(e)
 
+    # Check the search strategy of the optimizer
+    if mode == "optimize" and "search" in config:
+        search = config["search"]
+        if "method" in search and search["method"] not in SEARCH_METHODS:
+            raise SystemExit(
+                f"ERROR: Invalid search method. Valid values are "
+                f"{SEARCH_METHODS}"
+            )
+        if "metric" in search and search["metric"] not in METRICS:
+            raise SystemExit(
+                f"ERROR: Invalid search metric. Valid values are {METRICS}"
+            )
+        if "min_fraction" in search \
+                and not 0 < search["min_fraction"] <= 1:
+            raise SystemExit(
+                "ERROR: The search min_fraction must be within ]0, 1]"
+            )
+        if "eta" in search and search["eta"] < 2:
+            raise SystemExit("ERROR: The search eta must be at least 2")
+        for key in ("samples", "startup", "candidates"):
+            value = search.get(key, 1)
+            if type(value) != int or value < 1:
+                raise SystemExit(
+                    f"ERROR: The search {key} must be a positive integer"
+                )
+        if "gamma" in search and not 0 < search["gamma"] < 1:
+            raise SystemExit("ERROR: The search gamma must be within ]0, 1[")
+
+    # Check the walk-forward folds of the optimizer
+    if mode == "optimize" and "walk_forward" in config:
+        walk_forward = config["walk_forward"]
+        if "folds" in walk_forward and walk_forward["folds"] < 1:
+            raise SystemExit("ERROR: walk_forward folds must be at least 1")
+        if "in_sample" in walk_forward \
+                and not 0 < walk_forward["in_sample"] < 1:
+            raise SystemExit(
+                "ERROR: walk_forward in_sample must be within ]0, 1["
+            )
+
+    # Identifier of the backtest trades saved in the database
+    if mode != "live" and "run_id" not in config:
+        ch_config["run_id"] = ch_config["opt_name"] if mode == "optimize" \
+            else f"Backtest_{datetime.now():%Y-%m-%d_%H-%M-%S}"
+
     # Check there are no repeated instruments
     ch_config["instruments"] = list(set(ch_config["instruments"]))
 
@@ -180,21 +270,15 @@ def check_config(
     return ch_config
 
 
-def check_oanda_account(practice: bool, token: str, account_id: str) -> None:
-    url = practice_url if practice else prod_url
-    response = requests.get(
-        f"{url}/v3/accounts",
-        headers={
-            "content-type": "application/json",
-            "Authorization": f"Bearer {token}"
-        },
-    )
+def check_oanda_account(config: ConfigType) -> None:
+    response = get_client(config).get("/v3/accounts")
     if response.status_code != 200:
         raise SystemExit("ERROR: invalid oanda_token")
 
     accounts = response.json()["accounts"]
     account_found = [
-        True if acc["id"] == account_id else False for acc in accounts
+        True if acc["id"] == config["oanda_account_id"] else False
+        for acc in accounts
     ]
     if True not in account_found:
         raise SystemExit("ERROR: invalid oanda_account_id")
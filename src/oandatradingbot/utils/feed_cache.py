@@ -0,0 +1,219 @@
+# Libraries
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Literal, Optional, TypedDict
+
+# Packages
+import numpy as np
+from numpy.typing import NDArray
+import pandas as pd
+from pandas import DataFrame
+
+INDEX_FILE = "index.npy"
+META_FILE = "meta.json"
+# Float type of the compact feeds, FX prices need about 6 significant digits
+COMPACT_DTYPE = np.float32
+# Folder suffix of the compact feeds
+COMPACT_SUFFIX = "_compact"
+
+FeedMetaType = TypedDict(
+    "FeedMetaType",
+    {
+        "columns": List[str],
+        "rows": int,
+        "index_name": Optional[str],
+        # Type of the float columns
+        "dtype": str,
+    },
+    total=False
+)
+
+
+def compact_frame(frame: DataFrame) -> DataFrame:
+    """Feed with its float columns converted to float32, half the memory"""
+    return frame.astype({
+        col: COMPACT_DTYPE for col in frame.columns
+        if pd.api.types.is_float_dtype(frame[col])
+    })
+
+
+class FeedCache:
+    """Persistent OHLCV bar cache. Every (instrument, interval) pair is stored
+    in its own folder as one NumPy file per column plus an int64 file with the
+    bar timestamps (nanoseconds since epoch, UTC), so columns can be loaded
+    independently or memory mapped.
+
+    A ``compact`` cache saves the float columns as float32 in folders of
+    their own, so the full precision feeds are never merged with float32
+    bars. A compact feed starts from the full precision one if there is one.
+    """
+
+    def __init__(self, path: str, compact: bool = False) -> None:
+        self.path = path
+        self.compact = compact
+        self.dtype = np.dtype(COMPACT_DTYPE if compact else np.float64).name
+        os.makedirs(self.path, exist_ok=True)
+
+    def _feed_dir(self, instrument: str, interval: str) -> str:
+        suffix = COMPACT_SUFFIX if self.compact else ""
+        return os.path.join(self.path, f"{instrument}_{interval}{suffix}")
+
+    def _read_meta(
+        self, instrument: str, interval: str
+    ) -> Optional[FeedMetaType]:
+        meta_file = os.path.join(
+            self._feed_dir(instrument, interval), META_FILE
+        )
+        if not os.path.exists(meta_file):
+            if self.compact:
+                return self._compact_full_feed(instrument, interval)
+            return None
+        with open(meta_file, "r") as file:
+            meta: FeedMetaType = json.load(file)
+        # Feeds saved before the type was recorded are full precision
+        if meta.get("dtype", "float64") != self.dtype:
+            print(
+                f"WARNING: The cached {instrument} {interval} feed is "
+                f"{meta['dtype']}, not {self.dtype}. It is not used"
+            )
+            return None
+        return meta
+
+    def _compact_full_feed(
+        self, instrument: str, interval: str
+    ) -> Optional[FeedMetaType]:
+        feed = FeedCache(self.path).load(instrument, interval)
+        if feed is None:
+            return None
+        self.save(instrument, interval, feed)
+        return self._read_meta(instrument, interval)
+
+    def has_feed(self, instrument: str, interval: str) -> bool:
+        return self._read_meta(instrument, interval) is not None
+
+    def columns(self, instrument: str, interval: str) -> List[str]:
+        meta = self._read_meta(instrument, interval)
+        return [] if meta is None else meta["columns"]
+
+    def load_arrays(
+        self, instrument: str, interval: str, mmap: bool = True
+    ) -> Optional[Dict[str, NDArray[Any]]]:
+        """Columns of a feed by name plus its timestamps under "index", as
+        read-only memory mapped arrays unless ``mmap`` is False"""
+        meta = self._read_meta(instrument, interval)
+        if meta is None:
+            return None
+        feed_dir = self._feed_dir(instrument, interval)
+        mmap_mode: Optional[Literal["r"]] = "r" if mmap else None
+        arrays = {
+            col: np.load(
+                os.path.join(feed_dir, f"{col}.npy"), mmap_mode=mmap_mode
+            )
+            for col in meta["columns"]
+        }
+        arrays["index"] = np.load(
+            os.path.join(feed_dir, INDEX_FILE), mmap_mode=mmap_mode
+        )
+        return arrays
+
+    def load(
+        self, instrument: str, interval: str, mmap: bool = False
+    ) -> Optional[DataFrame]:
+        meta = self._read_meta(instrument, interval)
+        arrays = self.load_arrays(instrument, interval, mmap)
+        if meta is None or arrays is None:
+            return None
+        index = arrays.pop("index")
+        feed = DataFrame(
+            arrays,
+            index=pd.to_datetime(np.asarray(index), utc=True),
+            columns=meta["columns"]
+        )
+        feed.index.name = meta["index_name"]
+        return feed
+
+    def last_timestamp(
+        self, instrument: str, interval: str
+    ) -> Optional[pd.Timestamp]:
+        meta = self._read_meta(instrument, interval)
+        if meta is None or meta["rows"] == 0:
+            return None
+        index = np.load(
+            os.path.join(self._feed_dir(instrument, interval), INDEX_FILE),
+            mmap_mode="r"
+        )
+        return pd.Timestamp(int(index[-1]), tz="UTC")
+
+    def save(self, instrument: str, interval: str, feed: DataFrame) -> None:
+        feed_dir = self._feed_dir(instrument, interval)
+        # Write into a temporary folder first so an interrupted write never
+        # leaves a half updated feed behind
+        tmp_dir = f"{feed_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        index = pd.DatetimeIndex(feed.index)
+        index = index.tz_convert("UTC") if index.tz is not None \
+            else index.tz_localize("UTC")
+        np.save(
+            os.path.join(tmp_dir, INDEX_FILE),
+            index.asi8.astype(np.int64)
+        )
+        feed = feed.astype({
+            col: self.dtype for col in feed.columns
+            if pd.api.types.is_float_dtype(feed[col])
+        })
+        columns = [str(col) for col in feed.columns]
+        for col in columns:
+            np.save(
+                os.path.join(tmp_dir, f"{col}.npy"),
+                np.ascontiguousarray(feed[col].to_numpy())
+            )
+        with open(os.path.join(tmp_dir, META_FILE), "w") as file:
+            json.dump(
+                {
+                    "columns": columns,
+                    "rows": len(feed),
+                    "index_name": feed.index.name,
+                    "dtype": self.dtype,
+                },
+                file
+            )
+
+        shutil.rmtree(feed_dir, ignore_errors=True)
+        os.replace(tmp_dir, feed_dir)
+
+    def update(
+        self, instrument: str, interval: str, tail: DataFrame
+    ) -> DataFrame:
+        """Merges the freshly downloaded bars with the cached ones and saves
+        the result. Overlapping bars are replaced by the downloaded ones since
+        the last cached bar may have been incomplete when it was stored.
+
+        Parameters
+        ----------
+        instrument : str
+            The instrument of the feed, e.g. EUR_USD
+        interval : str
+            The feed interval, e.g. 5m
+        tail : DataFrame
+            The bars downloaded since the last cached bar
+
+        Returns
+        -------
+        DataFrame
+            The merged feed
+        """
+        cached = self.load(instrument, interval)
+        if cached is None or cached.size == 0:
+            feed = tail
+        else:
+            tail = tail.copy()
+            tail.index = tail.index.tz_convert("UTC") \
+                if tail.index.tz is not None \
+                else tail.index.tz_localize("UTC")
+            feed = pd.concat([cached, tail.reindex(columns=cached.columns)])
+            feed = feed[~feed.index.duplicated(keep="last")].sort_index()
+        self.save(instrument, interval, feed)
+        return feed
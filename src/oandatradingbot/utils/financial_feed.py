@@ -1,30 +1,91 @@
 # Libraries
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import product
 import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 # Packages
 import yfinance as yf
+import pandas as pd
 from pandas import DataFrame
 
+# Locals
+from oandatradingbot.types.config import ConfigType, TimeFrameType
+from oandatradingbot.utils.feed_cache import FeedCache, compact_frame
+from oandatradingbot.utils.oanda_candles import OandaCandleLoader
+from oandatradingbot.utils.oanda_client import get_client
+
 CRYPTOS = ["BTC", "BCH", "ETH", "LTC"]
+DATA_SOURCES = ["yahoo", "oanda"]
+# Days of OANDA candles loaded if history_start is not set
+HISTORY_DAYS = 365
 INTERVALS = [
     "1m", "2m", "5m", "15m", "30m", "60m", "90m",
     "1h", "1d", "5d", "1wk", "1mo", "3mo"
 ]
+# pandas frequency of the timeframes and intervals that can be resampled
+FREQUENCIES = {"Minutes": "min", "Days": "D", "m": "min", "h": "h", "d": "D"}
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+# Download attempts after the first one, waiting RETRY_DELAY seconds before
+# the first retry and twice as long before every next one
+RETRIES = 3
+RETRY_DELAY = 0.5
+# Feeds downloaded at the same time by fetch_many
+DOWNLOAD_WORKERS = 8
+
+DownloadType = Callable[[str, date, date, str], DataFrame]
+
+
+def download(ticker: str, start: date, end: date, interval: str) -> DataFrame:
+    """Bars of a Yahoo Finance ticker. Unlike yf.download, Ticker.history
+    does not share its results between threads"""
+    return yf.Ticker(ticker).history(
+        start=start,
+        end=end,
+        interval=interval,
+        auto_adjust=False,
+        actions=False,
+        debug=False
+    )
 
 
 class FinancialFeed:
-    def __init__(self, instrument: str, interval="5m") -> None:
+    def __init__(
+        self,
+        instrument: str,
+        interval="5m",
+        cache_path: Optional[str] = None,
+        downloader: DownloadType = download,
+        retry_delay: float = RETRY_DELAY,
+        compact: bool = False
+    ) -> None:
         if interval not in INTERVALS:
             raise SystemExit(
                 f"Invalid interval. Valid intervals are {INTERVALS}"
             )
         self.interval = interval
+        self.downloader = downloader
+        self.retry_delay = retry_delay
         self.set_instrument(instrument)
         self.get_start_end()
-        self.retrieve_feed()
+        if cache_path is None:
+            self.retrieve_feed()
+        else:
+            self.cache = FeedCache(cache_path, compact)
+            self.retrieve_cached_feed()
+        if compact:
+            self.feed = compact_frame(self.get_feed())
 
     def set_instrument(self, instrument: str) -> None:
+        self.name = instrument
         market = "fx" if instrument.split("_")[0] not in CRYPTOS else "crypto"
         instrument = instrument.replace("_", "")
         instrument = instrument.replace("/", "")
@@ -48,27 +109,197 @@ class FinancialFeed:
             self.start = (datetime.now() - timedelta(days=30 * 365)).date()
             self.end = (datetime.now() + timedelta(days=1)).date()
 
+    @classmethod
+    def fetch_many(
+        cls,
+        instruments: List[str],
+        intervals: List[str],
+        cache_path: Optional[str] = None,
+        workers: int = DOWNLOAD_WORKERS,
+        **kwargs
+    ) -> Dict[Tuple[str, str], DataFrame]:
+        """Feeds of every instrument and interval, keyed by (instrument,
+        interval). Up to ``workers`` feeds are downloaded at the same time"""
+        keys = list(dict.fromkeys(product(instruments, intervals)))
+        with ThreadPoolExecutor(max(1, min(workers, len(keys)))) as executor:
+            futures = {
+                key: executor.submit(
+                    cls, key[0], key[1], cache_path, **kwargs
+                )
+                for key in keys
+            }
+            return {
+                key: future.result().get_feed()
+                for key, future in futures.items()
+            }
+
     def retrieve_feed(self, counter: int = 0) -> None:
-        feed: DataFrame = yf.download(
-            tickers=self.instrument,
-            start=self.start,
-            end=self.end,
-            interval=self.interval
-        )
+        try:
+            feed = self.downloader(
+                self.instrument, self.start, self.end, self.interval
+            )
+        except Exception as e:
+            print(f"Could not download {self.instrument} feed: {e}")
+            feed = DataFrame()
         # Remove time zone localization
         try:
             feed = feed.tz_localize('UTC')
         except Exception:
             print("Cannot determine feed timezone. Assuming UTC.")
-            if feed.size == 0 and counter < 3:
-                time.sleep(1)
-                return self.retrieve_feed(counter + 1)
+        if feed.size == 0 and counter < RETRIES:
+            time.sleep(self.retry_delay * 2 ** counter)
+            return self.retrieve_feed(counter + 1)
         if feed.size == 0:
             raise SystemExit("Invalid instrument, not found in Yahoo Finance")
         self.feed = feed
 
+    def retrieve_cached_feed(self) -> None:
+        last_bar = self.cache.last_timestamp(self.name, self.interval)
+        if last_bar is not None:
+            # Only download the missing tail. The last cached bar is
+            # downloaded again since it may have been stored incomplete
+            self.start = max(self.start, last_bar.date())
+        try:
+            self.retrieve_feed()
+        except SystemExit:
+            # Nothing new to download (market closed or offline)
+            cached = self.cache.load(self.name, self.interval)
+            if cached is None:
+                raise
+            print(
+                f"Could not update {self.name} {self.interval} feed. "
+                "Using cached bars."
+            )
+            self.feed = cached
+            return
+        self.feed = self.cache.update(self.name, self.interval, self.feed)
+
     def get_feed(self) -> DataFrame:
         return self.feed
 
     def print_feed(self) -> None:
         print(self.feed)
+
+
+def timeframe_rule(tframe: TimeFrameType) -> str:
+    if tframe["timeframe"] not in FREQUENCIES:
+        raise SystemExit(
+            f"ERROR: Cannot resample feeds to {tframe['timeframe']} "
+            "timeframes. Use Minutes or Days"
+        )
+    return f"{tframe['compression']}{FREQUENCIES[tframe['timeframe']]}"
+
+
+def interval_rule(interval: str) -> Optional[str]:
+    """pandas rule of a Yahoo Finance interval, if it can be resampled"""
+    if interval[-1] not in FREQUENCIES or not interval[:-1].isdigit():
+        return None
+    return f"{interval[:-1]}{FREQUENCIES[interval[-1]]}"
+
+
+def resample_feed(feed: DataFrame, tframe: TimeFrameType) -> DataFrame:
+    """Bars of a higher timeframe, computed from the bars of the feed.
+    They are labelled by their start, like the downloaded bars"""
+    aggregations = {
+        column: aggregation for column, aggregation in AGGREGATIONS.items()
+        if column in feed.columns
+    }
+    return feed.resample(timeframe_rule(tframe)).agg(aggregations).dropna()
+
+
+def derive_higher_timeframe(config: ConfigType) -> bool:
+    return "derive_higher_timeframe" in config \
+        and config["derive_higher_timeframe"]
+
+
+def oanda_feeds(config: ConfigType) -> bool:
+    return "data_source" in config and config["data_source"] == "oanda"
+
+
+def load_oanda_feeds(
+    instruments: List[str],
+    timeframes: List[TimeFrameType],
+    config: ConfigType
+) -> Dict[str, List[DataFrame]]:
+    """Feeds of the OANDA candles of every instrument and timeframe, from
+    history_start (HISTORY_DAYS ago by default) until now"""
+    loader = OandaCandleLoader(
+        get_client(config),
+        config["cache_path"] if "cache_path" in config else None,
+        compact="compact_feeds" in config and config["compact_feeds"]
+    )
+    if "history_start" in config:
+        start = datetime.fromisoformat(config["history_start"])
+    else:
+        start = datetime.now() - timedelta(days=HISTORY_DAYS)
+    price = config["candle_price"] if "candle_price" in config else "M"
+    feeds: Dict[str, List[DataFrame]] = {}
+    for instrument in instruments:
+        print(f"Loading {instrument} OANDA candles since {start:%Y-%m-%d}...")
+        feeds[instrument] = [
+            loader.load(instrument, tframe, start, price=price)
+            for tframe in timeframes
+        ]
+    return feeds
+
+
+def get_feeds(
+    instruments: List[str], config: ConfigType
+) -> Dict[str, List[DataFrame]]:
+    """Feeds of every instrument and timeframe, downloaded from Yahoo Finance
+    or loaded from the OANDA candles if data_source is oanda. The higher
+    timeframe is resampled from the first one if derive_higher_timeframe is
+    set, otherwise it is downloaded too. The prices are float32 if
+    compact_feeds is set"""
+    timeframes = config["timeframes"]
+    if derive_higher_timeframe(config):
+        timeframes = timeframes[:1]
+
+    if oanda_feeds(config):
+        feeds = load_oanda_feeds(instruments, timeframes, config)
+    else:
+        intervals = [tframe["interval"] for tframe in timeframes]
+        print(
+            f"Downloading {', '.join(instruments)} feeds with intervals "
+            f"{', '.join(dict.fromkeys(intervals))}..."
+        )
+        downloaded = FinancialFeed.fetch_many(
+            instruments,
+            intervals,
+            config["cache_path"] if "cache_path" in config else None,
+            compact="compact_feeds" in config and config["compact_feeds"]
+        )
+        feeds = {
+            instrument: [
+                downloaded[(instrument, interval)] for interval in intervals
+            ]
+            for instrument in instruments
+        }
+
+    for instrument in instruments:
+        for tframe in config["timeframes"][len(timeframes):]:
+            print(
+                f"Resampling {instrument} feed to {tframe['compression']} "
+                f"{tframe['timeframe']}..."
+            )
+            feeds[instrument].append(
+                resample_feed(feeds[instrument][0], tframe)
+            )
+    return feeds
+
+
+def preresampled(config: ConfigType) -> bool:
+    """Whether the feeds of get_feeds already hold the bars of their
+    timeframes, so backtrader does not have to resample them. Only minute
+    bars, backtrader moves daily bars to the end of their session. OANDA
+    candles are always bars of their timeframe"""
+    for i, tframe in enumerate(config["timeframes"]):
+        if tframe["timeframe"] != "Minutes":
+            return False
+        if oanda_feeds(config) or i > 0 and derive_higher_timeframe(config):
+            continue
+        rule = interval_rule(tframe["interval"])
+        if rule is None \
+                or pd.Timedelta(rule) != pd.Timedelta(timeframe_rule(tframe)):
+            return False
+    return True
@@ -1,14 +1,18 @@
 # Libraries
-from typing import Dict, List
-
-# Packages
-import requests
+from typing import Dict, List, Optional
 
 # Locals
 from oandatradingbot.types.config import ConfigType
+from oandatradingbot.utils.oanda_client import get_client
+from oandatradingbot.utils.price_cache import PriceCache, stream_prices
+
 
-practice_url = "https://api-fxpractice.oanda.com"
-prod_url = "https://api-fxtrade.oanda.com"
+def use_price_stream(config: ConfigType) -> bool:
+    """Whether the prices are kept from the pricing stream, by default only
+    outside the test runs"""
+    if "price_stream" in config:
+        return config["price_stream"]
+    return not ("testing" in config and config["testing"])
 
 
 class InstrumentManager:
@@ -17,18 +21,17 @@ class InstrumentManager:
         self.account_type = config["practice"]
         self.token = config["oanda_token"]
         self.account_id = config["oanda_account_id"]
-        self.url = practice_url if self.account_type else prod_url
+        self.client = get_client(config)
+        self.url = self.client.url
+        self.instruments = config["instruments"]
+        self.prices: Optional[PriceCache] = None
         self._get_instrument_units(config["instruments"])
 
     def _get_instrument_units(self, instruments: List[str]) -> None:
         units: Dict[str, float] = {}
 
-        response = requests.get(
-            f"{self.url}/v3/accounts/{self.account_id}/instruments",
-            headers={
-                "content-type": "application/json",
-                "Authorization": f"Bearer {self.token}"
-            },
+        response = self.client.get(
+            f"{self.client.account_path}/instruments",
             params={"instruments": ",".join(instruments)}
         )
 
@@ -42,26 +45,52 @@ class InstrumentManager:
     def get_units(self, instrument: str) -> float:
         return self.units[instrument]
 
+    def start_price_stream(self, prices: Optional[PriceCache] = None) -> None:
+        """Keeps the prices of the instruments up to date from the OANDA
+        pricing stream, so the bid and ask prices are not requested"""
+        self.prices = prices if prices is not None else PriceCache()
+        self.prices.start(
+            lambda: stream_prices(self.client, self.instruments)
+        )
+
+    def stop_price_stream(self) -> None:
+        if self.prices is not None:
+            self.prices.stop(timeout=1)
+            self.prices = None
+
     def get_bid_price(self, instrument: str) -> float:
-        response = requests.get(
-            f"{self.url}/v3/accounts/{self.account_id}/pricing",
-            headers={
-                "content-type": "application/json",
-                "Authorization": f"Bearer {self.token}"
-            },
+        # Request the price if the stream is not running or is stale
+        if self.prices is not None:
+            bid = self.prices.get_bid(instrument)
+            if bid is not None:
+                return bid
+        response = self.client.get(
+            f"{self.client.account_path}/pricing",
             params={"instruments": instrument}
         )
 
         return float(response.json()["prices"][0]["closeoutBid"])
 
     def get_ask_price(self, instrument: str) -> float:
-        response = requests.get(
-            f"{self.url}/v3/accounts/{self.account_id}/pricing",
-            headers={
-                "content-type": "application/json",
-                "Authorization": f"Bearer {self.token}"
-            },
+        if self.prices is not None:
+            ask = self.prices.get_ask(instrument)
+            if ask is not None:
+                return ask
+        response = self.client.get(
+            f"{self.client.account_path}/pricing",
             params={"instruments": instrument}
         )
 
         return float(response.json()["prices"][0]["closeoutAsk"])
+
+    def get_home_conversion(self, instrument: str) -> float:
+        """Factor converting an amount in the quote currency of the
+        instrument into the account currency"""
+        response = self.client.get(
+            f"{self.client.account_path}/pricing",
+            params={"instruments": instrument}
+        )
+        price = response.json()["prices"][0]
+        if "quoteHomeConversionFactors" not in price:
+            return 1.0
+        return float(price["quoteHomeConversionFactors"]["positiveUnits"])
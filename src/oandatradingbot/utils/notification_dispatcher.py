@@ -0,0 +1,93 @@
+# Libraries
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Notifications waiting to be sent
+QUEUE_SIZE = 100
+# Seconds to wait for more notifications to send them together
+COALESCE_DELAY = 0.5
+# Seconds to wait for room in a full queue before dropping a notification
+PUT_TIMEOUT = 1.0
+
+HandlerType = Callable[[List[Any]], Any]
+
+
+class NotificationDispatcher:
+    """Sends the notifications (speech, Telegram messages...) from a
+    background thread, so the transactions are handled without waiting for
+    them. The notifications of every channel received within
+    ``coalesce_delay`` seconds are passed together to its handler, e.g. a
+    single message when several trades close at once.
+
+    The queue holds up to ``max_size`` notifications. When it is full, a new
+    notification waits up to ``put_timeout`` seconds and is dropped after
+    that.
+    """
+
+    def __init__(
+        self,
+        max_size: int = QUEUE_SIZE,
+        coalesce_delay: float = COALESCE_DELAY,
+        put_timeout: float = PUT_TIMEOUT
+    ) -> None:
+        self.coalesce_delay = coalesce_delay
+        self.put_timeout = put_timeout
+        self.handlers: Dict[str, HandlerType] = {}
+        self.queue: "Queue[Optional[Tuple[str, Any]]]" = Queue(max_size)
+        self.sent = 0
+        self.dropped = 0
+        self.lock = Lock()
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add_channel(self, channel: str, handler: HandlerType) -> None:
+        self.handlers[channel] = handler
+
+    def submit(self, channel: str, item: Any) -> bool:
+        """Queues a notification. Returns False if the channel has no
+        handler or the notification is dropped"""
+        if channel not in self.handlers or not self.thread.is_alive():
+            return False
+        try:
+            self.queue.put((channel, item), timeout=self.put_timeout)
+            return True
+        except Full:
+            with self.lock:
+                self.dropped += 1
+            print(f"WARNING: {channel} notification dropped, queue is full")
+            return False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Sends the queued notifications and stops the worker"""
+        if not self.thread.is_alive():
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _next_batch(self) -> Tuple[Dict[str, List[Any]], bool]:
+        batch: Dict[str, List[Any]] = {}
+        notification = self.queue.get()
+        deadline = time.monotonic() + self.coalesce_delay
+        while notification is not None:
+            batch.setdefault(notification[0], []).append(notification[1])
+            try:
+                notification = self.queue.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        closed = False
+        while not closed:
+            batch, closed = self._next_batch()
+            for channel, items in batch.items():
+                try:
+                    self.handlers[channel](items)
+                except Exception as e:
+                    print(f"WARNING: {channel} notification failed: {e}")
+                with self.lock:
+                    self.sent += len(items)
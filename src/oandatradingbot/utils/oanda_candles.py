@@ -0,0 +1,238 @@
+# Libraries
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import Lock
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Packages
+import pandas as pd
+from pandas import DataFrame
+
+# Locals
+from oandatradingbot.types.config import TimeFrameType
+from oandatradingbot.utils.feed_cache import FeedCache, compact_frame
+from oandatradingbot.utils.oanda_client import OandaClient
+
+# Times are requested as UNIX timestamps, as backtrader does, so the
+# transactions are registered as the ones of the backtrader store
+UNIX_TIMES = {"Accept-Datetime-Format": "UNIX"}
+
+TIMEFRAME_SECONDS = {
+    "Minutes": 60,
+    "Days": 24 * 60 * 60,
+    "Weeks": 7 * 24 * 60 * 60,
+}
+# Most candles returned by a request
+MAX_CANDLES = 5000
+# Chunks requested at the same time, within the connections of the client
+LOADER_WORKERS = 4
+# OANDA allows 120 requests per second
+REQUESTS_PER_SECOND = 100.0
+# Candle components (mid, bid and ask) and their column prefixes
+PRICES = {"M": ("mid", ""), "B": ("bid", "Bid "), "A": ("ask", "Ask ")}
+OHLC = {"o": "Open", "h": "High", "l": "Low", "c": "Close"}
+
+
+def granularity(tframe: TimeFrameType) -> str:
+    """OANDA candles granularity of a time frame"""
+    compression = tframe["compression"]
+    if tframe["timeframe"] == "Minutes":
+        if compression in [1, 2, 4, 5, 10, 15, 30]:
+            return f"M{compression}"
+        hours = compression // 60
+        if compression % 60 == 0 and hours in [1, 2, 3, 4, 6, 8, 12]:
+            return f"H{hours}"
+    if tframe["timeframe"] == "Days" and compression == 1:
+        return "D"
+    if tframe["timeframe"] == "Weeks" and compression == 1:
+        return "W"
+    raise SystemExit(
+        f"ERROR: The time frame {compression} {tframe['timeframe']} is not "
+        "supported by OANDA candles"
+    )
+
+
+def bar_seconds(tframe: TimeFrameType) -> int:
+    return TIMEFRAME_SECONDS[tframe["timeframe"]] * tframe["compression"]
+
+
+def chunk_ranges(
+    start: float, end: float, seconds: int, candles: int = MAX_CANDLES
+) -> List[Tuple[float, float]]:
+    """Consecutive (from, to) UNIX time ranges of up to ``candles`` bars
+    of ``seconds`` seconds covering [start, end)"""
+    span = seconds * candles
+    return [
+        (chunk_start, min(chunk_start + span, end))
+        for chunk_start in range(int(start), int(end), span)
+    ]
+
+
+def valid_price(price: str) -> bool:
+    return price != "" and all(component in PRICES for component in price)
+
+
+def candles_frame(candles: List[Dict[str, Any]], price: str) -> DataFrame:
+    """OHLCV feed of the complete candles. The first component of ``price``
+    (M, B or A) gives the OHLC columns and the bid and ask components give
+    "Bid ..." and "Ask ..." columns too"""
+    candles = [candle for candle in candles if candle["complete"]]
+    columns: Dict[str, List[Any]] = {}
+    for component in price:
+        key, prefix = PRICES[component]
+        if component == price[0]:
+            prefix = ""
+        elif prefix == "":
+            continue
+        for short, name in OHLC.items():
+            columns[f"{prefix}{name}"] = [
+                float(candle[key][short]) for candle in candles
+            ]
+    columns["Volume"] = [int(candle["volume"]) for candle in candles]
+    return DataFrame(
+        columns,
+        index=pd.to_datetime(
+            [float(candle["time"]) for candle in candles], unit="s", utc=True
+        )
+    )
+
+
+class RateLimiter:
+    """Spaces the calls of several threads at least 1 / ``rate`` seconds"""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate
+        self.next_time = 0.0
+        self.lock = Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class OandaCandleLoader:
+    """Loads long histories of OANDA candles. The time range is split in
+    chunks of up to ``chunk`` candles, which are requested concurrently
+    from ``workers`` threads and at most ``rate`` requests per second.
+
+    If a cache path is given, the bars are saved in the feed cache and only
+    the bars before the first and after the last cached ones are requested
+    by the next loads. The prices are float32 if ``compact`` is set.
+    """
+
+    def __init__(
+        self,
+        client: OandaClient,
+        cache_path: Optional[str] = None,
+        workers: int = LOADER_WORKERS,
+        chunk: int = MAX_CANDLES,
+        rate: float = REQUESTS_PER_SECOND,
+        compact: bool = False
+    ) -> None:
+        self.client = client
+        self.compact = compact
+        self.cache = None if cache_path is None \
+            else FeedCache(cache_path, compact)
+        self.workers = workers
+        self.chunk = min(chunk, MAX_CANDLES)
+        self.limiter = RateLimiter(rate)
+
+    def _get_chunk(
+        self,
+        instrument: str,
+        granularity: str,
+        price: str,
+        chunk: Tuple[float, float]
+    ) -> List[Dict[str, Any]]:
+        self.limiter.wait()
+        response = self.client.get(
+            f"/v3/instruments/{instrument}/candles",
+            params={
+                "granularity": granularity,
+                "price": price,
+                "from": f"{chunk[0]:.0f}",
+                "to": f"{chunk[1]:.0f}",
+            },
+            headers=UNIX_TIMES
+        )
+        if not response.ok:
+            raise SystemExit(
+                f"ERROR: Could not load {instrument} {granularity} candles "
+                f"({response.status_code}): {response.text}"
+            )
+        candles: List[Dict[str, Any]] = response.json()["candles"]
+        return candles
+
+    def _missing_ranges(
+        self, key: str, instrument: str, start: float, end: float
+    ) -> List[Tuple[float, float]]:
+        if self.cache is None:
+            return [(start, end)]
+        feed = self.cache.load_arrays(instrument, key)
+        if feed is None or len(feed["index"]) == 0:
+            return [(start, end)]
+        first = feed["index"][0] / 10 ** 9
+        # The last cached bar is requested again, as FinancialFeed does
+        last = feed["index"][-1] / 10 ** 9
+        ranges = [(start, min(first, end)), (max(last, start), end)]
+        return [(a, b) for a, b in ranges if a < b]
+
+    def load(
+        self,
+        instrument: str,
+        tframe: TimeFrameType,
+        start: datetime,
+        end: Optional[datetime] = None,
+        price: str = "M"
+    ) -> DataFrame:
+        """Bars of the instrument from ``start`` to ``end`` (now by
+        default), priced by the ``price`` components (M, B, A or several
+        of them, e.g. BA)"""
+        if not valid_price(price):
+            raise SystemExit(
+                f"ERROR: Invalid candles price {price}. Use M, B, A or "
+                "several of them, e.g. BA"
+            )
+        gran = granularity(tframe)
+        key = f"{gran}_{price}"
+        now = datetime.now(timezone.utc).timestamp()
+        start_time = start.replace(tzinfo=start.tzinfo or timezone.utc)
+        end_time = now if end is None else min(
+            end.replace(tzinfo=end.tzinfo or timezone.utc).timestamp(), now
+        )
+        seconds = bar_seconds(tframe)
+        chunks = [
+            chunk
+            for first, last in self._missing_ranges(
+                key, instrument, start_time.timestamp(), end_time
+            )
+            for chunk in chunk_ranges(first, last, seconds, self.chunk)
+        ]
+        with ThreadPoolExecutor(max(1, self.workers)) as executor:
+            pages = list(executor.map(
+                lambda chunk: self._get_chunk(
+                    instrument, gran, price, chunk
+                ),
+                chunks
+            ))
+        feed = candles_frame(
+            [candle for page in pages for candle in page], price
+        )
+        # The candle at the limit of two chunks may be returned by both
+        feed = feed[~feed.index.duplicated(keep="last")].sort_index()
+        if self.cache is not None:
+            cached = self.cache.load(instrument, key)
+            if len(chunks) > 0 or cached is None:
+                feed = self.cache.update(instrument, key, feed)
+            else:
+                feed = cached
+        if self.compact:
+            feed = compact_frame(feed)
+        return feed[
+            (feed.index >= start_time) & (feed.index.asi8 < end_time * 1e9)
+        ]
@@ -0,0 +1,219 @@
+# Libraries
+import json
+import re
+from threading import Lock
+import time
+from typing import Any, Dict, Iterator, Tuple
+
+# Packages
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Locals
+from oandatradingbot.types.config import ConfigType
+
+practice_url = "https://api-fxpractice.oanda.com"
+prod_url = "https://api-fxtrade.oanda.com"
+stream_practice_url = "https://stream-fxpractice.oanda.com"
+stream_prod_url = "https://stream-fxtrade.oanda.com"
+
+# Seconds to connect and to read every response
+DEFAULT_TIMEOUT = (5.0, 10.0)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.3
+POOL_SIZE = 10
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Seconds without data before a stream is considered dead. OANDA sends a
+# heartbeat every 5 seconds
+STREAM_TIMEOUT = 20.0
+
+
+class EndpointLatency:
+    """Number of requests, failed requests and latency of an endpoint"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float, error: bool) -> None:
+        self.requests += 1
+        self.errors += int(error)
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean (ms)": round(self.total / self.requests * 1000, 2),
+            "max (ms)": round(self.max * 1000, 2),
+            "last (ms)": round(self.last * 1000, 2),
+        }
+
+
+class OandaClient:
+    """Client of the OANDA REST API keeping a pool of alive connections, so
+    every request does not open a new TLS connection. Requests have a
+    timeout and are retried with exponential backoff on connection errors.
+    GET requests are retried on the ``RETRY_STATUS`` responses too, the
+    requests changing the account only if they ask for it since the error
+    may come after the change is done. The latency of every endpoint is
+    recorded, with the account and the numeric ids of the path replaced
+    so the requests to the same endpoint are grouped.
+
+    Use get_client() to share the same client between modules.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        account_id: str,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        stream_url: str = ""
+    ) -> None:
+        self.url = url
+        self.stream_url = stream_url if stream_url != "" else url
+        self.token = token
+        self.account_id = account_id
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update({
+            "content-type": "application/json",
+            "Authorization": f"Bearer {token}"
+        })
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=POOL_SIZE,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=RETRY_STATUS,
+                allowed_methods=frozenset(["GET"]),
+                # Return the last response so its status can be checked
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.latencies: Dict[str, EndpointLatency] = {}
+        self.lock = Lock()
+
+    @property
+    def account_path(self) -> str:
+        return f"/v3/accounts/{self.account_id}"
+
+    def endpoint(self, method: str, path: str) -> str:
+        if self.account_id != "":
+            path = path.replace(self.account_id, "{accountID}")
+        return f"{method} {re.sub(r'/[0-9]+(?=/|$)', '/{id}', path)}"
+
+    def request(
+        self, method: str, path: str, **kwargs: Any
+    ) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        error = True
+        try:
+            response = self.session.request(
+                method, f"{self.url}{path}", **kwargs
+            )
+            error = not response.ok
+            return response
+        finally:
+            endpoint = self.endpoint(method, path)
+            with self.lock:
+                if endpoint not in self.latencies:
+                    self.latencies[endpoint] = EndpointLatency()
+                self.latencies[endpoint].add(
+                    time.perf_counter() - start, error
+                )
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def put(
+        self, path: str, retry: bool = False, **kwargs: Any
+    ) -> requests.Response:
+        """``retry`` retries the request on the RETRY_STATUS responses, only
+        for requests that can be repeated (e.g. closing a trade by its id)"""
+        for attempt in range(self.retries if retry else 0):
+            response = self.request("PUT", path, **kwargs)
+            if response.status_code not in RETRY_STATUS:
+                return response
+            time.sleep(self.backoff * 2 ** attempt)
+        return self.request("PUT", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        # POST requests (e.g. orders) are not retried
+        return self.request("POST", path, **kwargs)
+
+    def stream(self, path: str, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        """Yields the JSON messages of a streaming endpoint until the
+        connection is closed"""
+        with self.session.get(
+            f"{self.stream_url}{path}",
+            stream=True,
+            timeout=(self.timeout[0], STREAM_TIMEOUT),
+            **kwargs
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {
+                endpoint: latency.summary()
+                for endpoint, latency in self.latencies.items()
+            }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[Tuple[str, str, str], OandaClient] = {}
+_clients_lock = Lock()
+
+
+def get_client(config: ConfigType) -> OandaClient:
+    """Returns the client shared by every module using the same OANDA
+    account"""
+    url = practice_url if config["practice"] else prod_url
+    stream_url = stream_practice_url if config["practice"] \
+        else stream_prod_url
+    key = (url, config["oanda_token"], config["oanda_account_id"])
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = OandaClient(
+                *key,
+                timeout=(
+                    config["oanda_connect_timeout"]
+                    if "oanda_connect_timeout" in config
+                    else DEFAULT_TIMEOUT[0],
+                    config["oanda_read_timeout"]
+                    if "oanda_read_timeout" in config
+                    else DEFAULT_TIMEOUT[1]
+                ),
+                retries=config["oanda_retries"] if "oanda_retries" in config
+                else DEFAULT_RETRIES,
+                stream_url=stream_url
+            )
+        return _clients[key]
+
+
+def close_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
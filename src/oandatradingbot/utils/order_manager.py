@@ -1,15 +1,15 @@
 # Libraries
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import re
-from typing import Optional
-
-# Packages
-import requests
+from typing import Any, Dict, List, Optional
 
 # Locals
 from oandatradingbot.types.config import ConfigType
 from oandatradingbot.types.order import OperationType
-from oandatradingbot.types.api_transaction import ApiTransactionType
+from oandatradingbot.types.api_transaction \
+    import ApiTransactionType, empty_transaction
+from oandatradingbot.utils.oanda_client import POOL_SIZE
 from oandatradingbot.utils.transaction_manager import TransactionManager
 from oandatradingbot.utils.telegram_bot import TelegramBot
 
@@ -37,17 +37,8 @@ class OrderManager(TransactionManager):
         self.recover_orders()
 
     def _get_order(self, id: int) -> ApiTransactionType:
-        url = self.instrument_manager.url
-        account_id = self.instrument_manager.account_id
-        token = self.instrument_manager.token
-
-        response = requests.get(
-            f"{url}/v3/accounts/{account_id}/transactions/{id}",
-            headers={
-                "content-type": "application/json",
-                "Authorization": f"Bearer {token}"
-            }
-        )
+        client = self.instrument_manager.client
+        response = client.get(f"{client.account_path}/transactions/{id}")
         transaction: ApiTransactionType = response.json()["transaction"]
         return transaction
 
@@ -57,35 +48,57 @@ class OrderManager(TransactionManager):
     def has_selled(self, instrument: str) -> bool:
         return self.is_buyed_selled["SELL"][instrument]
 
-    def recover_orders(self) -> int:
-        url = self.instrument_manager.url
-        account_id = self.instrument_manager.account_id
-        token = self.instrument_manager.token
+    @staticmethod
+    def _timestamp(time: str) -> str:
+        # OANDA times have nanoseconds, datetime parses up to microseconds
         time_pattern = r"\d{4}-\d{2}-\d{2}[T]\d{2}:\d{2}:\d{2}[.]\d{6}"
+        entry_time = re.match(time_pattern, time).group()  # type: ignore
+        return str(datetime.strptime(
+            entry_time, "%Y-%m-%dT%H:%M:%S.%f"
+        ).timestamp())
+
+    @staticmethod
+    def _trade_order(
+        trade_id: str, type: str, order: Dict[str, str]
+    ) -> ApiTransactionType:
+        """Transaction of a take profit or stop loss order of a trade"""
+        transaction: ApiTransactionType = {
+            **empty_transaction,
+            "type": type,
+            "reason": "ON_FILL",
+            "id": order["id"],
+            "tradeID": trade_id,
+            "price": order["price"],
+            "time": order["createTime"],
+        }
+        return transaction
 
-        response = requests.get(
-            f"{url}/v3/accounts/{account_id}/pendingOrders",
-            headers={
-                "content-type": "application/json",
-                "Authorization": f"Bearer {token}"
-            },
-        )
-        orders = response.json()["orders"]
+    def recover_orders(self) -> int:
+        """Registers the open trades of the account and their take profit and
+        stop loss orders. The trades, with their orders, are requested at
+        once and only their fill transactions are requested, concurrently.
+        Returns the number of pending take profit and stop loss orders.
+        """
+        client = self.instrument_manager.client
+
+        response = client.get(f"{client.account_path}/openTrades")
+        trades = response.json()["trades"]
 
-        if len(orders) == 0:
+        if len(trades) == 0:
             print("There is no pending orders")
             return 0
 
-        for order in orders:
-            # Get main market order
-            main_order = self._get_order(order["tradeID"])
-            entry_time = re.match(  # type: ignore
-                time_pattern, main_order["time"]
-            ).group()
+        with ThreadPoolExecutor(
+            max_workers=min(POOL_SIZE, len(trades))
+        ) as executor:
+            main_orders = list(executor.map(
+                self._get_order, [trade["id"] for trade in trades]
+            ))
+
+        pending_orders = 0
+        for trade, main_order in zip(trades, main_orders):
             # Transform time string to timestamp
-            main_order["time"] = str(datetime.strptime(
-                entry_time, "%Y-%m-%dT%H:%M:%S.%f"
-            ).timestamp())
+            main_order["time"] = self._timestamp(main_order["time"])
 
             # Register market order
             if main_order["reason"] == "MARKET_ORDER" \
@@ -105,60 +118,96 @@ class OrderManager(TransactionManager):
                 self.is_buyed_selled[operation_type][instrument] = True
                 print(f"{operation_type} order {instrument} recovered")
 
+            if main_order["id"] not in self.trades_registry:
+                continue
+            instrument = self.trades_registry[main_order["id"]]["instrument"]
+            op_type = self.trades_registry[main_order["id"]]["op_type"]
+
             # Register stop loss
-            full_order = self._get_order(order["id"])
-            if full_order["type"] == "STOP_LOSS_ORDER" \
-                and full_order["reason"] == "ON_FILL" \
-                    and full_order["tradeID"] == main_order["id"]:
-                instrument = \
-                    self.trades_registry[full_order["tradeID"]]["instrument"]
-                op_type = self.trades_registry[
-                    full_order["tradeID"]]["op_type"]
-                self.orders[op_type][instrument]["SL"] = full_order
+            if "stopLossOrder" in trade:
+                self.orders[op_type][instrument]["SL"] = self._trade_order(
+                    trade["id"], "STOP_LOSS_ORDER", trade["stopLossOrder"]
+                )
+                pending_orders += 1
 
             # Register take profit
-            full_order = self._get_order(order["id"])
-            if full_order["type"] == "TAKE_PROFIT_ORDER" \
-                and full_order["reason"] == "ON_FILL" \
-                    and full_order["tradeID"] == main_order["id"]:
-                instrument = \
-                    self.trades_registry[full_order["tradeID"]]["instrument"]
-                op_type = self.trades_registry[
-                    full_order["tradeID"]]["op_type"]
-                self.orders[op_type][instrument]["TK"] = full_order
-
-        return len(orders)
-
-    def cancel_pending_trades(self) -> None:
-        url = self.instrument_manager.url
-        account_id = self.instrument_manager.account_id
-        token = self.instrument_manager.token
-
-        response = requests.get(
-            f"{url}/v3/accounts/{account_id}/trades",
-            headers={
-                "content-type": "application/json",
-                "Authorization": f"Bearer {token}"
-            },
+            if "takeProfitOrder" in trade:
+                self.orders[op_type][instrument]["TK"] = self._trade_order(
+                    trade["id"], "TAKE_PROFIT_ORDER", trade["takeProfitOrder"]
+                )
+                pending_orders += 1
+
+        return pending_orders
+
+    def _close_trade(self, trade_id: str) -> bool:
+        client = self.instrument_manager.client
+        # Closing the same trade again cannot close any other trade
+        response = client.put(
+            f"{client.account_path}/trades/{trade_id}/close", retry=True
+        )
+        return response.status_code == 200
+
+    def _close_position(
+        self, instrument: str, trades: List[Dict[str, Any]]
+    ) -> Dict[str, bool]:
+        """Closes all the trades of an instrument with a single request, or
+        one by one if the position could not be closed. The request is not
+        retried, it could close a position opened in the meantime"""
+        client = self.instrument_manager.client
+        sides = {}
+        if any(float(trade["currentUnits"]) > 0 for trade in trades):
+            sides["longUnits"] = "ALL"
+        if any(float(trade["currentUnits"]) < 0 for trade in trades):
+            sides["shortUnits"] = "ALL"
+        response = client.put(
+            f"{client.account_path}/positions/{instrument}/close",
+            json=sides
         )
+        if response.status_code == 200:
+            return {trade["id"]: True for trade in trades}
+        return {
+            trade["id"]: self._close_trade(trade["id"]) for trade in trades
+        }
+
+    def cancel_pending_trades(self) -> Dict[str, bool]:
+        """Closes all the open trades, closing the positions of the
+        instruments concurrently. Returns whether each trade was closed.
+        """
+        client = self.instrument_manager.client
+
+        response = client.get(f"{client.account_path}/trades")
         trades = response.json()["trades"]
 
         if len(trades) == 0:
             print("There is no pending trades")
-            return
+            return {}
 
+        positions: Dict[str, List[Dict[str, Any]]] = {}
         for trade in trades:
-            trade_id = trade["id"]
-            instrument = trade["instrument"]
-            response = requests.put(
-                f"{url}/v3/accounts/{account_id}/trades/{trade_id}/close",
-                headers={
-                    "content-type": "application/json",
-                    "Authorization": f"Bearer {token}"
-                },
-            )
-            if response.status_code == 200:
-                print(f"Closing trade {instrument} with id {trade_id}")
+            positions.setdefault(trade["instrument"], []).append(trade)
+
+        with ThreadPoolExecutor(
+            max_workers=min(POOL_SIZE, len(positions))
+        ) as executor:
+            results = list(executor.map(
+                lambda position: self._close_position(*position),
+                positions.items()
+            ))
+
+        closed: Dict[str, bool] = {}
+        for (instrument, position_trades), result in zip(
+            positions.items(), results
+        ):
+            for trade in position_trades:
+                if result[trade["id"]]:
+                    print(f"Closing trade {instrument} with id {trade['id']}")
+                else:
+                    print(
+                        f"ERROR: Could not close trade {instrument} with id "
+                        f"{trade['id']}"
+                    )
+            closed.update(result)
+        return closed
 
     def manage_transaction(self, transaction: ApiTransactionType) -> str:
         # Submit market order
@@ -0,0 +1,123 @@
+# Libraries
+import json
+from threading import Event, Lock, Thread
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Locals
+from oandatradingbot.types.price import PriceType
+from oandatradingbot.utils.oanda_client import OandaClient
+
+# Seconds after which a price is not used to place orders
+MAX_PRICE_AGE = 10.0
+# Seconds to wait before reconnecting a closed stream, doubled on every
+# consecutive failure
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+PriceSourceType = Callable[[], Iterable[Dict[str, Any]]]
+
+
+def stream_prices(
+    client: OandaClient, instruments: List[str]
+) -> Iterator[Dict[str, Any]]:
+    """Messages of the OANDA pricing stream of the instruments"""
+    return client.stream(
+        f"{client.account_path}/pricing/stream",
+        params={"instruments": ",".join(instruments)}
+    )
+
+
+def replay_prices(
+    file_path: str, delay: float = 0.0
+) -> Iterator[Dict[str, Any]]:
+    """Messages of a pricing stream recorded in a JSON lines file, waiting
+    ``delay`` seconds between them"""
+    with open(file_path, "r") as file:
+        for line in file:
+            if line.strip() == "":
+                continue
+            yield json.loads(line)
+            if delay > 0:
+                time.sleep(delay)
+
+
+class PriceCache:
+    """Latest bid and ask prices of every instrument, kept up to date by a
+    pricing stream read in a background thread, so the order prices are a
+    dictionary lookup instead of a request to OANDA. Prices older than
+    ``max_age`` seconds are not returned, e.g. when the stream is down.
+    """
+
+    def __init__(self, max_age: float = MAX_PRICE_AGE) -> None:
+        self.max_age = max_age
+        self.prices: Dict[str, PriceType] = {}
+        self.lock = Lock()
+        self.stopped = Event()
+        self.thread: Optional[Thread] = None
+
+    def update(self, message: Dict[str, Any]) -> bool:
+        """Stores the price of a stream message. Returns False if the
+        message is not a price (e.g. a heartbeat)"""
+        if message.get("type") != "PRICE":
+            return False
+        try:
+            price: PriceType = {
+                "bid": float(message["closeoutBid"]),
+                "ask": float(message["closeoutAsk"]),
+                "time": message["time"],
+                "received": time.monotonic(),
+            }
+        except (KeyError, ValueError):
+            return False
+        with self.lock:
+            self.prices[message["instrument"]] = price
+        return True
+
+    def get(self, instrument: str) -> Optional[PriceType]:
+        with self.lock:
+            price = self.prices.get(instrument)
+        if price is None \
+                or time.monotonic() - price["received"] > self.max_age:
+            return None
+        return price
+
+    def get_bid(self, instrument: str) -> Optional[float]:
+        price = self.get(instrument)
+        return None if price is None else price["bid"]
+
+    def get_ask(self, instrument: str) -> Optional[float]:
+        price = self.get(instrument)
+        return None if price is None else price["ask"]
+
+    def start(self, source: PriceSourceType, reconnect: bool = True) -> None:
+        """Reads the messages of ``source`` in a daemon thread. The source is
+        called again when its messages end or fail if ``reconnect``"""
+        self.stopped.clear()
+        self.thread = Thread(
+            target=self._run, args=(source, reconnect), daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        # The thread may be blocked reading the stream until its timeout
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _run(self, source: PriceSourceType, reconnect: bool) -> None:
+        delay = RECONNECT_DELAY
+        while not self.stopped.is_set():
+            try:
+                for message in source():
+                    if self.stopped.is_set():
+                        return
+                    self.update(message)
+                    delay = RECONNECT_DELAY
+            except Exception as e:
+                print(f"WARNING: Pricing stream failed: {e}")
+            if not reconnect:
+                return
+            self.stopped.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
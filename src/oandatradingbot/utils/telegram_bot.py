@@ -1,6 +1,6 @@
 # Libraries
 from datetime import datetime, timedelta
-from typing import Union
+from typing import List, Union
 
 # Packages
 import requests
@@ -15,6 +15,8 @@ currency_emoji = {
     "GBP": "💷",
     "JPY": "💴"
 }
+# Characters of a Telegram message
+MAX_MESSAGE_LENGTH = 4096
 
 
 class TelegramBot:
@@ -58,17 +60,17 @@ class TelegramBot:
         return msg
 
     def _format_daily_report(self, day: datetime) -> str:
-        trades = self.repository.get_day_trades(day)
+        summary = self.repository.get_day_summary(day)
 
-        if len(trades) == 0:
+        if summary["trades"] == 0:
             return ""
-        wins = len([tr for tr in trades if tr.profit >= 0])
-        losses = len([tr for tr in trades if tr.profit < 0])
-        win_ratio = wins / len(trades)
-        total_pl = sum([tr.profit for tr in trades])
+        wins = summary["wins"]
+        losses = summary["trades"] - wins
+        win_ratio = wins / summary["trades"]
+        total_pl = summary["profit"]
 
         trades_summary = ""
-        for trade in trades:
+        for trade in self.repository.get_day_trades(day):
             trades_summary += (
                 f"•{trade.instrument} -> {trade.operation}: "
                 f"<b>{trade.profit:.2f} {self.currency}</b>\n"
@@ -88,28 +90,25 @@ class TelegramBot:
         monday = friday - timedelta(days=5)
         monday_start = datetime(monday.year, monday.month, monday.day, 0, 0)
 
-        trades = self.repository.get_week_trades(monday_start, friday)
+        summary = self.repository.get_summary(monday_start, friday)
 
-        if len(trades) == 0:
+        if summary["trades"] == 0:
             return ""
 
-        wins = len([tr for tr in trades if tr.profit >= 0])
-        losses = len([tr for tr in trades if tr.profit < 0])
-        win_ratio = wins / len(trades)
-        total_pl = sum([tr.profit for tr in trades])
+        wins = summary["wins"]
+        losses = summary["trades"] - wins
+        win_ratio = wins / summary["trades"]
+        total_pl = summary["profit"]
 
-        instruments = {}
-        for trade in trades:
-            if trade.instrument not in instruments:
-                instruments[trade.instrument] = {"Trades": 0, "Profit": 0}
-            instruments[trade.instrument]["Trades"] += 1
-            instruments[trade.instrument]["Profit"] += trade.profit
+        instruments = self.repository.get_instrument_summaries(
+            monday_start, friday
+        )
 
         trades_summary = ""
         for key, val in instruments.items():
             trades_summary += (
-                f"•{key} -> {val['Trades']} trades, "
-                f"profit: <b>{val['Profit']:.2f}</b>\n"
+                f"•{key} -> {val['trades']} trades, "
+                f"profit: <b>{val['profit']:.2f}</b>\n"
             )
         curr_emoji = currency_emoji[self.currency] \
             if self.currency in currency_emoji else "💵"
@@ -151,6 +150,23 @@ class TelegramBot:
             return None
         return self._notify(text)
 
+    def notify_trades(self, trade_ids: List[int]) -> int:
+        """Notifies several trades with as few messages as possible. Returns
+        the number of messages sent"""
+        if self.report_freq != "Trade":
+            return 0
+        texts = [self._format_trade(trade_id) for trade_id in trade_ids]
+        messages: List[str] = []
+        for text in [text for text in texts if text != ""]:
+            if len(messages) > 0 and \
+                    len(messages[-1]) + len(text) + 2 <= MAX_MESSAGE_LENGTH:
+                messages[-1] += f"\n\n{text}"
+            else:
+                messages.append(text)
+        for message in messages:
+            self._notify(message)
+        return len(messages)
+
     def daily_report(self, day: datetime) -> Union[requests.Response, None]:
         if self.report_freq == "Weekly":
             return None
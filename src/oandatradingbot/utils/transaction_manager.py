@@ -1,9 +1,11 @@
 # Libraries
 from datetime import datetime
-from typing import Dict, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 # Locals
 from oandatradingbot.repository.repository import Repository
+from oandatradingbot.repository.trade_buffer import BUFFER_DELAY, \
+    TradeBuffer
 from oandatradingbot.types.api_transaction \
     import ApiTransactionType, empty_transaction
 from oandatradingbot.types.config import ConfigType
@@ -11,6 +13,8 @@ from oandatradingbot.types.order import OperationType, OrdersType
 from oandatradingbot.types.trade import TradeRegistryType, TradeDbType
 from oandatradingbot.utils.instrument_manager import InstrumentManager
 from oandatradingbot.utils.messages import Messages
+from oandatradingbot.utils.notification_dispatcher import \
+    NotificationDispatcher
 from oandatradingbot.utils.telegram_bot import TelegramBot
 from oandatradingbot.utils.tts import TTS
 
@@ -27,12 +31,32 @@ class TransactionManager:
             config["language"], config["account_currency"]
         )
         self.repository = Repository(config["database_uri"])
+        # Speech and Telegram notifications are sent in the background
+        self.notifications = NotificationDispatcher()
         if "tts" in config and config["tts"]:
             self.tts = TTS(
                 config["language_tts"] if "language_tts" in config else "EN-US"
             )
+            tts = self.tts
+            self.notifications.add_channel(
+                "tts", lambda messages: tts.say(" ".join(messages))
+            )
         if telegram_bot is not None:
             self.telegram_bot = telegram_bot
+            self.notifications.add_channel(
+                "telegram", telegram_bot.notify_trades
+            )
+        # Closed trades are saved in batches if a buffer size is given
+        if "trade_buffer_size" in config:
+            self.trade_buffer = TradeBuffer(
+                self.repository,
+                config["trade_journal"] if "trade_journal" in config
+                else "trades_journal.jsonl",
+                config["trade_buffer_size"],
+                config["trade_buffer_delay"]
+                if "trade_buffer_delay" in config else BUFFER_DELAY,
+                self._trades_saved
+            )
         self.account_type = config["account_type"]
         self.trades_registry: TradeRegistryType = {}
         self.is_buyed_selled: IsBuyedSelledType = {"BUY": {}, "SELL": {}}
@@ -86,10 +110,21 @@ class TransactionManager:
             "canceled": False if exit_type in ["SL", "TK"] else True,
             "profit": round(float(main_order[exit_type]["pl"]), 2)
         }
-        self.repository.save_trade(trade)
+        if hasattr(self, "trade_buffer"):
+            self.trade_buffer.add(trade)
+        else:
+            self.repository.save_trade(trade)
+            self._trades_saved([trade])
+
+    def _trades_saved(self, trades: List[TradeDbType]) -> None:
+        for trade in trades:
+            self.notifications.submit("telegram", trade["id"])
 
-        if hasattr(self, "telegram_bot"):
-            self.telegram_bot.notify_trade(int(main_order["MK"]["id"]))
+    def close(self) -> None:
+        """Saves the buffered trades and sends the pending notifications"""
+        if hasattr(self, "trade_buffer"):
+            self.trade_buffer.close()
+        self.notifications.close()
 
     def market_order_submitted(self, transaction: ApiTransactionType) -> str:
         instrument = transaction["instrument"]
@@ -158,8 +193,7 @@ class TransactionManager:
                 float(transaction["price"]),
                 transaction["id"]
             )
-        if hasattr(self, "tts"):
-            self.tts.say(message)
+        self.notifications.submit("tts", message)
         return message
 
     def register_take_profit_order(
@@ -236,8 +270,7 @@ class TransactionManager:
             message = self.messages.limit_sell_order(
                 f"{' '.join(instrument.split('_'))}", profit, this_trade_id
             )
-        if hasattr(self, "tts"):
-            self.tts.say(message)
+        self.notifications.submit("tts", message)
         return message
 
     def stop_loss_order_completed(
@@ -268,8 +301,7 @@ class TransactionManager:
             message = self.messages.stop_sell_order(
                 f"{' '.join(instrument.split('_'))}", profit, this_trade_id
             )
-        if hasattr(self, "tts"):
-            self.tts.say(message)
+        self.notifications.submit("tts", message)
         return message
 
     def market_order_canceled(self, transaction: ApiTransactionType) -> str:
@@ -298,6 +330,5 @@ class TransactionManager:
             message = self.messages.sell_order_canceled(
                 f"{' '.join(instrument.split('_'))}", profit, this_trade_id
             )
-        if hasattr(self, "tts"):
-            self.tts.say(message)
+        self.notifications.submit("tts", message)
         return message
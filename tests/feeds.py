@@ -0,0 +1,33 @@
+# Packages
+import numpy as np
+import pandas as pd
+
+
+def create_feed(seed: int, periods: int = 6000) -> pd.DataFrame:
+    """Random walk 5 minutes OHLCV feed"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2022-08-01", periods=periods, freq="5min", tz="UTC")
+    close = 1.1 + np.cumsum(rng.normal(0, 3e-4, periods))
+    open = np.concatenate(([close[0]], close[:-1]))
+    return pd.DataFrame(
+        {
+            "Open": open,
+            "High": np.maximum(open, close) + rng.uniform(0, 2e-4, periods),
+            "Low": np.minimum(open, close) - rng.uniform(0, 2e-4, periods),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": np.zeros(periods, dtype=np.int64),
+        },
+        index=index
+    )
+
+
+def create_higher_frame(feed: pd.DataFrame, rule: str = "60min"):
+    return feed.resample(rule).agg({
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Adj Close": "last",
+        "Volume": "sum",
+    }).dropna()
@@ -0,0 +1,267 @@
+# Libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+from threading import Lock, Thread
+import time
+from typing import Any, Dict, List, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+account_id = "101-004-1234567-001"
+
+
+class OandaServer:
+    """Local stand-in of the OANDA REST API serving the open trades, the
+    transactions, the candles and the prices of an account and recording the
+    created orders. Every request waits ``delay`` seconds to simulate the
+    network latency, and ``max_running`` records the most requests served at
+    the same time.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.trades: List[Dict[str, Any]] = []
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[str] = []
+        # Query parameters of the candles requests
+        self.candle_queries: List[Dict[str, str]] = []
+        self.running = 0
+        self.max_running = 0
+        # Candles by instrument and granularity
+        self.candles: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        # Bid and ask prices by instrument
+        self.prices: Dict[str, Tuple[float, float]] = {}
+        self.balance = 10000.0
+        self.orders: List[Dict[str, Any]] = []
+        # Instruments whose positions cannot be closed
+        self.failing_positions: Set[str] = set()
+        self.lock = Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self) -> "OandaServer":
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_trade(
+        self, id: int, instrument: str, units: int, price: float = 1.1
+    ) -> None:
+        """Adds an open trade filled by a market order with its take profit
+        and stop loss orders"""
+        open_time = "2022-10-04T11:30:00.084213532Z"
+        distance = 0.002 if units > 0 else -0.002
+        self.trades.append({
+            "id": str(id),
+            "instrument": instrument,
+            "price": str(price),
+            "openTime": open_time,
+            "initialUnits": str(units),
+            "currentUnits": str(units),
+            "state": "OPEN",
+            "takeProfitOrder": {
+                "id": str(id + 1),
+                "type": "TAKE_PROFIT",
+                "tradeID": str(id),
+                "price": f"{price + distance:.5f}",
+                "createTime": open_time,
+                "state": "PENDING",
+            },
+            "stopLossOrder": {
+                "id": str(id + 2),
+                "type": "STOP_LOSS",
+                "tradeID": str(id),
+                "price": f"{price - distance:.5f}",
+                "createTime": open_time,
+                "state": "PENDING",
+            },
+        })
+        self.transactions[str(id)] = {
+            "id": str(id),
+            "type": "ORDER_FILL",
+            "reason": "MARKET_ORDER",
+            "instrument": instrument,
+            "units": str(units),
+            "price": str(price),
+            "time": open_time,
+        }
+
+    def add_candles(
+        self,
+        instrument: str,
+        granularity: str,
+        feed: Any,
+        spread: float = 0.0002
+    ) -> None:
+        """Adds the complete candles of an OHLC data frame. The bid and ask
+        prices are half the spread below and above them"""
+        self.candles[(instrument, granularity)] = [
+            {
+                "time": f"{index.timestamp():.9f}",
+                "complete": True,
+                "volume": int(row.Volume) if "Volume" in feed.columns else 0,
+                **{
+                    key: {
+                        "o": f"{row.Open + shift:.5f}",
+                        "h": f"{row.High + shift:.5f}",
+                        "l": f"{row.Low + shift:.5f}",
+                        "c": f"{row.Close + shift:.5f}",
+                    }
+                    for key, shift in [
+                        ("mid", 0.0), ("bid", -spread / 2), ("ask", spread / 2)
+                    ]
+                },
+            }
+            for index, row in feed.iterrows()
+        ]
+
+    def _route(
+        self,
+        method: str,
+        path: str,
+        body: Dict[str, Any],
+        query: Dict[str, str]
+    ) -> Any:
+        account = f"/v3/accounts/{account_id}"
+        if method == "GET" and path == "/v3/accounts":
+            return 200, {"accounts": [{"id": account_id}]}
+        if method == "GET" and path == f"{account}/summary":
+            return 200, {"account": {"balance": f"{self.balance:.2f}"}}
+        if method == "GET" and path == f"{account}/instruments":
+            instruments = query["instruments"].split(",")
+            return 200, {"instruments": [
+                {
+                    "name": instrument,
+                    "pipLocation": -4,
+                    "tags": [{"name": "CURRENCY"}],
+                }
+                for instrument in instruments
+            ]}
+        if method == "GET" and path in [
+            f"{account}/openTrades", f"{account}/trades"
+        ]:
+            with self.lock:
+                return 200, {"trades": list(self.trades)}
+        match = re.fullmatch("/v3/instruments/([A-Z_]+)/candles", path)
+        if method == "GET" and match:
+            candles = self.candles.get((match.group(1), query["granularity"]))
+            if candles is None:
+                return 400, {}
+            with self.lock:
+                self.candle_queries.append(query)
+            if "count" in query:
+                candles = candles[-int(query["count"]):]
+            else:
+                candles = [
+                    candle for candle in candles
+                    if float(query["from"]) <= float(candle["time"])
+                    < float(query["to"])
+                ]
+                if len(candles) > 5000:
+                    return 400, {"errorMessage": "Maximum value for 'count'"}
+            keys = [
+                {"M": "mid", "B": "bid", "A": "ask"}[component]
+                for component in query.get("price", "M")
+            ]
+            return 200, {"candles": [
+                {
+                    "time": candle["time"],
+                    "complete": candle["complete"],
+                    "volume": candle.get("volume", 0),
+                    **{key: candle[key] for key in keys if key in candle},
+                }
+                for candle in candles
+            ]}
+        if method == "GET" and path == f"{account}/pricing":
+            prices = []
+            for instrument in query["instruments"].split(","):
+                bid, ask = self.prices.get(instrument, (1.1, 1.1))
+                prices.append({
+                    "instrument": instrument,
+                    "closeoutBid": str(bid),
+                    "closeoutAsk": str(ask),
+                })
+            return 200, {"prices": prices}
+        if method == "POST" and path == f"{account}/orders":
+            with self.lock:
+                self.orders.append(body["order"])
+            return 201, {}
+        match = re.fullmatch(f"{account}/transactions/([0-9]+)", path)
+        if method == "GET" and match:
+            if match.group(1) not in self.transactions:
+                return 404, {}
+            return 200, {"transaction": self.transactions[match.group(1)]}
+        match = re.fullmatch(f"{account}/trades/([0-9]+)/close", path)
+        if method == "PUT" and match:
+            with self.lock:
+                trades = [t for t in self.trades if t["id"] == match.group(1)]
+                if len(trades) == 0:
+                    return 404, {}
+                self.trades.remove(trades[0])
+            return 200, {}
+        match = re.fullmatch(f"{account}/positions/([A-Z_]+)/close", path)
+        if method == "PUT" and match:
+            instrument = match.group(1)
+            if instrument in self.failing_positions:
+                return 503, {}
+            with self.lock:
+                closed = [
+                    trade for trade in self.trades
+                    if trade["instrument"] == instrument and (
+                        "longUnits" in body
+                        and float(trade["currentUnits"]) > 0
+                        or "shortUnits" in body
+                        and float(trade["currentUnits"]) < 0
+                    )
+                ]
+                if len(closed) == 0:
+                    return 400, {"errorCode": "CLOSEOUT_POSITION_DOESNT_EXIST"}
+                for trade in closed:
+                    self.trades.remove(trade)
+            return 200, {}
+        return 404, {}
+
+    def _handler(self) -> Any:
+        oanda = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self) -> None:
+                url = urlsplit(self.path)
+                path = url.path
+                with oanda.lock:
+                    oanda.requests.append(f"{self.command} {path}")
+                    oanda.running += 1
+                    oanda.max_running = max(oanda.max_running, oanda.running)
+                length = int(self.headers["Content-Length"] or 0)
+                request = json.loads(self.rfile.read(length)) if length else {}
+                try:
+                    time.sleep(oanda.delay)
+                    status, body = oanda._route(
+                        self.command, path, request, dict(parse_qsl(url.query))
+                    )
+                finally:
+                    with oanda.lock:
+                        oanda.running -= 1
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = _reply
+            do_PUT = _reply
+            do_POST = _reply
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
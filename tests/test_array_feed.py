@@ -0,0 +1,92 @@
+# Packages
+import backtrader as bt
+import numpy as np
+
+# Locals
+from oandatradingbot.utils.array_feed import ArrayData, add_feeds, \
+    arrays_from_frame
+from oandatradingbot.utils.feed_cache import FeedCache
+from oandatradingbot.utils.financial_feed import resample_feed
+from tests.feeds import create_feed
+
+
+def run(data):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(data)
+    cerebro.addstrategy(bt.Strategy)
+    return cerebro.run()[0].datas[0]
+
+
+def lines(data):
+    return {
+        line: list(getattr(data.lines, line).array)
+        for line in ["datetime", "open", "high", "low", "close", "volume"]
+    }
+
+
+def test_same_bars_as_pandas_feed():
+    feed = create_feed(3, 1000)
+
+    pandas_data = run(bt.feeds.PandasData(dataname=feed, name="EUR_USD"))
+    array_data = run(ArrayData(dataname=arrays_from_frame(feed)))
+
+    assert len(array_data) == len(feed)
+    assert lines(array_data) == lines(pandas_data)
+    assert array_data.datetime.datetime(0) == \
+        feed.index[-1].tz_localize(None).to_pydatetime()
+
+
+def test_arrays_are_views():
+    feed = create_feed(3, 100)
+    window = feed.iloc[50:]
+
+    arrays = arrays_from_frame(window)
+
+    assert np.shares_memory(arrays["Close"], feed["Close"].to_numpy())
+    assert len(arrays["index"]) == len(arrays["Close"]) == 50
+
+
+def test_memory_mapped_feed(tmp_path):
+    feed = create_feed(3, 500)
+    cache = FeedCache(str(tmp_path))
+    cache.save("EUR_USD", "5m", feed)
+
+    arrays = cache.load_arrays("EUR_USD", "5m")
+    data = run(ArrayData(dataname=arrays))
+
+    assert isinstance(arrays["Close"], np.memmap)
+    assert list(data.close.array) == list(feed["Close"])
+
+
+class RecordBars(bt.Strategy):
+    def __init__(self):
+        self.bars = []
+
+    def next(self):
+        self.bars.append(tuple(
+            (data.datetime.datetime(0), len(data), data.close[0])
+            for data in self.datas
+        ))
+
+
+def test_preresampled_feeds():
+    timeframes = [
+        {"timeframe": "Minutes", "compression": 5, "interval": "5m"},
+        {"timeframe": "Minutes", "compression": 60, "interval": "60m"}
+    ]
+    feed = create_feed(3, 1000)
+    feeds = [feed, resample_feed(feed, timeframes[1])]
+
+    bars = []
+    for preresampled in [False, True]:
+        cerebro = bt.Cerebro(stdstats=False)
+        add_feeds(cerebro, "EUR_USD", feeds, timeframes, preresampled)
+        cerebro.addstrategy(RecordBars)
+        strategy = cerebro.run()[0]
+        assert [data._name for data in strategy.datas] == \
+            ["EUR_USD", "EUR_USDt60"]
+        bars.append(strategy.bars)
+
+    # The strategy sees the same bars without the resampler
+    assert len(bars[0]) == len(feed)
+    assert bars[1] == bars[0]
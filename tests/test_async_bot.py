@@ -0,0 +1,193 @@
+# Libraries
+import asyncio
+from datetime import datetime, time, timezone
+from time import tzset
+
+# Packages
+import pandas as pd
+import pytest
+
+# Locals
+from oandatradingbot.async_bot import CANDLE_DELAY, AsyncBot, fresh_candle, \
+    granularity, position_size, seconds_until
+from oandatradingbot.utils import oanda_client
+from tests.feeds import create_feed
+from tests.oanda_server import OandaServer, account_id
+
+# The signals of the 500 candles before this bar of the feed enter a buy
+BUY_BAR = 876
+
+
+@pytest.fixture
+def oanda(monkeypatch):
+    with OandaServer() as server:
+        monkeypatch.setattr(oanda_client, "practice_url", server.url)
+        yield server
+        oanda_client.close_clients()
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "database_uri": f"sqlite:///{tmp_path / 'test.db'}",
+        "oanda_token": "token",
+        "oanda_account_id": account_id,
+        "practice": True,
+        "language": "EN-US",
+        "instruments": ["EUR_USD"],
+        "account_currency": "EUR",
+        "account_type": "Demo",
+        "timeframes": [
+            {"timeframe": "Minutes", "compression": 5, "interval": "5m"}
+        ],
+        "risk": 1,
+        "debug": False,
+        "price_stream": False,
+    }
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    # Half an hour off a whole number of hours
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    tzset()
+    yield
+    monkeypatch.undo()
+    tzset()
+
+
+def test_granularity():
+    assert granularity({"timeframe": "Minutes", "compression": 5}) == "M5"
+    assert granularity({"timeframe": "Minutes", "compression": 240}) == "H4"
+    assert granularity({"timeframe": "Days", "compression": 1}) == "D"
+    with pytest.raises(SystemExit):
+        granularity({"timeframe": "Minutes", "compression": 7})
+
+
+def test_seconds_until():
+    # From Wednesday at noon to Friday at 20:30
+    wednesday = datetime(2022, 10, 5, 12)
+    assert seconds_until(time(20, 30), [5], wednesday) == \
+        (2 * 24 + 8.5) * 60 * 60
+    assert seconds_until(time(20, 30), [], wednesday) == 8.5 * 60 * 60
+    # The same time is the next week
+    friday = datetime(2022, 10, 7, 20, 30)
+    assert seconds_until(time(20, 30), [5], friday) == 7 * 24 * 60 * 60
+
+
+def test_position_size():
+    # 1% of 10000 EUR with a 20 pips stop loss
+    assert position_size(10000, 1, 0.002, 1.0) == 50000
+    assert position_size(10000, 1, 0.002, 2.0) == 25000
+    assert position_size(10000, 1, 0.0, 1.0) == 0
+
+
+def buy_candles():
+    """Candles entering a buy, the last one has just closed"""
+    feed = create_feed(17).iloc[BUY_BAR - 500:BUY_BAR]
+    feed.index += pd.Timestamp.now("UTC").floor("5min") \
+        - pd.Timedelta(minutes=5) - feed.index[-1]
+    return feed
+
+
+def test_fresh_candle():
+    assert fresh_candle(1000, 300, 1300)
+    assert fresh_candle(1000, 300, 1599)
+    assert not fresh_candle(1000, 300, 1600)
+
+
+def test_check_instrument(oanda, config):
+    feed = buy_candles()
+    oanda.add_candles("EUR_USD", "M5", feed)
+    bot = AsyncBot(config)
+
+    assert asyncio.run(bot.check_instrument("EUR_USD"))
+    # No new candle
+    assert asyncio.run(bot.check_instrument("EUR_USD")) is None
+    bot.close()
+
+    assert len(oanda.orders) == 1
+    order = oanda.orders[0]
+    close = feed["Close"].iloc[-1]
+    assert order["instrument"] == "EUR_USD"
+    assert int(order["units"]) > 0
+    assert float(order["stopLossOnFill"]["price"]) < close
+    assert float(order["takeProfitOnFill"]["price"]) > close
+
+
+def test_check_instrument_stale_candle(oanda, config):
+    # The last candle closed long before the bot started
+    oanda.add_candles(
+        "EUR_USD", "M5", create_feed(17).iloc[BUY_BAR - 500:BUY_BAR]
+    )
+    bot = AsyncBot(config)
+
+    assert asyncio.run(bot.check_instrument("EUR_USD")) is None
+    bot.close()
+    assert oanda.orders == []
+
+
+def test_check_instrument_testing(oanda, config):
+    config["testing"] = True
+    oanda.add_candles("EUR_USD", "M5", buy_candles())
+    bot = AsyncBot(config)
+
+    # The buy signal is not traded in a test run
+    assert asyncio.run(bot.check_instrument("EUR_USD")) is None
+    bot.close()
+    assert oanda.orders == []
+
+
+def test_check_instrument_open_trade(oanda, config):
+    oanda.add_trade(100, "EUR_USD", 1000)
+    oanda.add_candles("EUR_USD", "M5", buy_candles())
+    bot = AsyncBot(config)
+
+    # There is already a buy trade of the instrument
+    assert asyncio.run(bot.check_instrument("EUR_USD")) is None
+    bot.close()
+    assert oanda.orders == []
+
+
+def test_run_candles(oanda, config, local_timezone, monkeypatch):
+    config["timeframes"] = [
+        {"timeframe": "Minutes", "compression": 60, "interval": "1h"}
+    ]
+    bot = AsyncBot(config)
+    wake_ups = []
+
+    async def check_instrument(instrument):
+        return None
+
+    async def sleep(delay):
+        wake_ups.append(datetime.now(timezone.utc).timestamp() + delay)
+        bot.stopped.set()
+
+    monkeypatch.setattr(bot, "check_instrument", check_instrument)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    asyncio.run(bot.run_candles())
+    bot.close()
+
+    # The loop wakes up right after the next UTC bar close
+    assert len(wake_ups) == 1
+    assert round(wake_ups[0] - CANDLE_DELAY) % 3600 == 0
+
+
+def test_dispatch_transaction(oanda, config):
+    bot = AsyncBot(config)
+    transaction = {
+        "id": "200",
+        "type": "ORDER_FILL",
+        "reason": "MARKET_ORDER",
+        "orderID": "199",
+        "instrument": "EUR_USD",
+        "units": "1000",
+        "price": "1.1",
+        "time": "1664883000.084213532",
+        "tradeOpened": {"tradeID": "200"},
+    }
+
+    assert asyncio.run(bot.dispatch_transaction({"type": "HEARTBEAT"})) == ""
+    asyncio.run(bot.dispatch_transaction(transaction))
+    bot.close()
+    assert bot.order_manager.has_buyed("EUR_USD")
@@ -1,5 +1,8 @@
 # Libraries
+import copy
 import os
+import shutil
+import sys
 
 # Packages
 import pandas as pd
@@ -61,3 +64,25 @@ def test_backtester():
 
     # Remove the results folder within the tests folder
     os.rmdir(os.path.join(current_dir, "results"))
+
+
+def test_parallel_backtester(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["backtester", "--workers", "2"])
+    parallel_config = copy.deepcopy(config)
+    parallel_config["instruments"] = ["EUR_USD", "EUR_GBP"]
+
+    main(parallel_config)
+    summaries = [
+        file for file in os.listdir(os.path.join(current_dir, "results"))
+        if file.endswith(".xlsx")
+    ]
+    # One workbook per instrument, each one with its summary sheet
+    assert len(summaries) == 2
+    for file in summaries:
+        df_summary = pd.read_excel(
+            os.path.join(current_dir, "results", file),
+            "Summary"
+        )
+        assert df_summary["Name"][0] in parallel_config["instruments"]
+
+    shutil.rmtree(os.path.join(current_dir, "results"), ignore_errors=True)
@@ -1,12 +1,15 @@
 # Libraries
 from datetime import datetime
 import os
+import sqlite3
 
 # Packages
 import pytest
+from sqlalchemy import inspect
 
 # Local
-from oandatradingbot.repository.repository import Repository
+from oandatradingbot.repository.repository import Repository, \
+    dispose_engines
 from tests.trades import trade1, trade2, trade3, trade4
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +21,21 @@ def test_raise_exception_when_db_uri_is_invalid():
         _ = Repository("")
 
 
+def test_engine_is_shared(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'shared.db'}"
+    repository = Repository(uri)
+    other = Repository(uri)
+
+    assert other.engine is repository.engine
+    start = repository.metrics.total
+    other.save_trade(trade1)
+    assert repository.get_trade(1) is not None
+    # Only the insert and the select, the schema is not checked again
+    assert repository.metrics.total - start == 2
+    assert repository.metrics.summary()["INSERT"]["queries"] == 1
+    dispose_engines()
+
+
 def test_create_trade():
     repository = Repository(db_uri)
 
@@ -75,5 +93,53 @@ def test_get_week_trades():
 
     # Should return 3 trades
     assert len(trades) == 3
+
+
+def test_summaries():
+    repository = Repository(db_uri)
+    repository.save_trade({
+        **trade1, "id": 5, "instrument": "EUR_GBP", "profit": -10.0
+    })
+
+    assert repository.get_day_summary(datetime(2022, 10, 4, 22)) == {
+        "trades": 3, "wins": 2, "profit": 25.5 + 28.5 - 10.0
+    }
+    assert repository.get_summary(
+        datetime(2022, 10, 3), datetime(2022, 10, 7, 23, 59)
+    ) == {"trades": 4, "wins": 3, "profit": 25.5 + 28.5 + 22.5 - 10.0}
+    assert repository.get_instrument_summaries(
+        datetime(2022, 10, 3), datetime(2022, 10, 7, 23, 59)
+    ) == {
+        "EUR_USD": {"trades": 3, "wins": 3, "profit": 25.5 + 28.5 + 22.5},
+        "EUR_GBP": {"trades": 1, "wins": 0, "profit": -10.0},
+    }
+    # No trades
+    assert repository.get_day_summary(datetime(2022, 10, 8)) == {
+        "trades": 0, "wins": 0, "profit": 0.0
+    }
     # Delete db
+    dispose_engines()
     os.remove(os.path.join(current_dir, "test.db"))
+
+
+def test_indexes(tmp_path):
+    # Table created before the indexes were declared
+    with sqlite3.connect(tmp_path / "old.db") as connection:
+        connection.execute(
+            "CREATE TABLE trades (id INTEGER PRIMARY KEY, instrument "
+            "VARCHAR(30), account VARCHAR(20), entry_time DATETIME, "
+            "exit_time DATETIME, duration INTEGER, operation VARCHAR(10), "
+            "size FLOAT, entry_price FLOAT, exit_price FLOAT, trade_pips "
+            "FLOAT, stop_loss FLOAT, take_profit FLOAT, canceled BOOLEAN, "
+            "profit FLOAT)"
+        )
+    repository = Repository(f"sqlite:///{tmp_path / 'old.db'}")
+    indexes = [
+        index["column_names"]
+        for index in inspect(repository.engine).get_indexes("trades")
+    ]
+    dispose_engines()
+
+    assert ["exit_time"] in indexes
+    assert ["instrument"] in indexes
+    assert ["account"] in indexes
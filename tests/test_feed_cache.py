@@ -0,0 +1,104 @@
+# Libraries
+import json
+
+# Packages
+import numpy as np
+import pandas as pd
+
+# Locals
+from oandatradingbot.utils.feed_cache import FeedCache
+
+
+def create_feed(start: str, periods: int, offset: float = 0.0):
+    index = pd.date_range(start, periods=periods, freq="5min", tz="UTC")
+    close = np.linspace(1.1, 1.2, periods) + offset
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 0.001,
+            "Low": close - 0.001,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": np.zeros(periods, dtype=np.int64),
+        },
+        index=index
+    )
+
+
+def test_missing_feed(tmp_path):
+    cache = FeedCache(str(tmp_path))
+    assert cache.load("EUR_USD", "5m") is None
+    assert cache.last_timestamp("EUR_USD", "5m") is None
+
+
+def test_save_and_load_feed(tmp_path):
+    cache = FeedCache(str(tmp_path))
+    feed = create_feed("2022-10-03", 100)
+    cache.save("EUR_USD", "5m", feed)
+
+    cached = cache.load("EUR_USD", "5m")
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached, feed, check_freq=False)
+    assert cache.last_timestamp("EUR_USD", "5m") == feed.index[-1]
+    # Memory mapped columns hold the same values
+    mapped = cache.load("EUR_USD", "5m", mmap=True)
+    assert mapped is not None
+    assert np.array_equal(mapped["Close"].values, feed["Close"].values)
+
+
+def test_update_feed(tmp_path):
+    cache = FeedCache(str(tmp_path))
+    cache.save("EUR_USD", "5m", create_feed("2022-10-03", 100))
+    # The tail overlaps the last 10 cached bars, whose values must be replaced
+    tail = create_feed("2022-10-03 07:30", 50, offset=0.5)
+    feed = cache.update("EUR_USD", "5m", tail)
+
+    assert len(feed) == 140
+    assert feed.index.is_monotonic_increasing
+    assert feed.loc[tail.index[0], "Close"] == tail["Close"].iloc[0]
+    cached = cache.load("EUR_USD", "5m")
+    assert cached is not None
+    assert len(cached) == 140
+
+
+def test_compact_feed(tmp_path):
+    cache = FeedCache(str(tmp_path), compact=True)
+    feed = create_feed("2022-10-03", 100)
+    cache.save("EUR_USD", "5m", feed)
+
+    cached = cache.load("EUR_USD", "5m")
+    assert cached is not None
+    assert cached["Close"].dtype == np.float32
+    assert cached["Volume"].dtype == np.int64
+    assert np.allclose(cached["Close"], feed["Close"], rtol=1e-7)
+    assert cached.index.equals(feed.index)
+    # The full precision feeds are cached apart
+    assert FeedCache(str(tmp_path)).load("EUR_USD", "5m") is None
+
+
+def test_compact_feed_from_full_feed(tmp_path):
+    cache = FeedCache(str(tmp_path))
+    feed = create_feed("2022-10-03", 100)
+    cache.save("EUR_USD", "5m", feed)
+
+    compact = FeedCache(str(tmp_path), compact=True)
+    cached = compact.load("EUR_USD", "5m")
+    assert cached is not None
+    assert cached["Close"].dtype == np.float32
+    # The update of the compact feed does not change the full one
+    compact.update("EUR_USD", "5m", create_feed("2022-10-03 08:00", 50))
+    full = cache.load("EUR_USD", "5m")
+    pd.testing.assert_frame_equal(full, feed, check_freq=False)
+
+
+def test_feed_dtype_mismatch(tmp_path):
+    cache = FeedCache(str(tmp_path))
+    cache.save("EUR_USD", "5m", create_feed("2022-10-03", 100))
+    meta_file = tmp_path / "EUR_USD_5m" / "meta.json"
+    meta = json.loads(meta_file.read_text())
+    assert meta["dtype"] == "float64"
+    meta_file.write_text(json.dumps({**meta, "dtype": "float32"}))
+
+    # Float32 bars are never loaded as full precision ones
+    assert cache.load("EUR_USD", "5m") is None
+    assert cache.last_timestamp("EUR_USD", "5m") is None
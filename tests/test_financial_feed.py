@@ -1,8 +1,12 @@
 # Packages
+import pandas as pd
 import pytest
 
 # Locals
-from oandatradingbot.utils.financial_feed import FinancialFeed, INTERVALS
+from oandatradingbot.utils.financial_feed import FinancialFeed, INTERVALS, \
+    preresampled, resample_feed
+from tests.feeds import create_feed, create_higher_frame
+from tests.yahoo_downloader import YahooDownloader
 
 
 # def test_invalid_instrument():
@@ -21,3 +25,90 @@ def test_valid_instrument_and_interval(interval):
     assert feed.size > 0
     feed = FinancialFeed("BTC_USD", interval).get_feed()
     assert feed.size > 0
+
+
+def test_resample_feed():
+    feed = create_feed(3, 1000)
+    tframe = {"timeframe": "Minutes", "compression": 60, "interval": "60m"}
+
+    resampled = resample_feed(feed, tframe)
+
+    pd.testing.assert_frame_equal(resampled, create_higher_frame(feed))
+    assert resampled.index[1] - resampled.index[0] == pd.Timedelta("1h")
+    with pytest.raises(SystemExit):
+        resample_feed(feed, {**tframe, "timeframe": "Weeks"})
+
+
+def test_preresampled():
+    config = {
+        "timeframes": [
+            {"timeframe": "Minutes", "compression": 5, "interval": "5m"},
+            {"timeframe": "Minutes", "compression": 60, "interval": "1h"}
+        ]
+    }
+    assert preresampled(config)
+    # Resampled by backtrader from the 5m bars
+    config["timeframes"][1]["interval"] = "5m"
+    assert not preresampled(config)
+    # Unless the feed is derived or loaded from the OANDA candles
+    config["derive_higher_timeframe"] = True
+    assert preresampled(config)
+    config["derive_higher_timeframe"] = False
+    config["data_source"] = "oanda"
+    assert preresampled(config)
+    config["timeframes"][1]["timeframe"] = "Days"
+    config["timeframes"][1]["compression"] = 1
+    assert not preresampled(config)
+
+
+def test_fetch_many():
+    instruments = [f"PAIR{i}_USD" for i in range(25)]
+    downloader = YahooDownloader(delay=0.05)
+
+    feeds = FinancialFeed.fetch_many(
+        instruments, ["5m", "60m"], workers=10, downloader=downloader
+    )
+
+    assert len(feeds) == 50
+    assert len(downloader.downloads) == 50
+    pd.testing.assert_frame_equal(
+        feeds[("PAIR3_USD", "60m")], downloader.feed("PAIR3USD=X", "60m")
+    )
+    # The downloads run in parallel, at most one per worker
+    assert 1 < downloader.max_running <= 10
+
+
+def test_fetch_many_retries():
+    downloader = YahooDownloader(failures={"EURUSD=X": 2})
+
+    feeds = FinancialFeed.fetch_many(
+        ["EUR_USD", "GBP_USD"], ["5m"],
+        downloader=downloader, retry_delay=0.0
+    )
+
+    assert len(feeds[("EUR_USD", "5m")]) == 500
+    tickers = [download[0] for download in downloader.downloads]
+    assert tickers.count("EURUSD=X") == 3
+    assert tickers.count("GBPUSD=X") == 1
+
+    downloader = YahooDownloader(failures={"EURUSD=X": 4})
+    with pytest.raises(SystemExit):
+        FinancialFeed.fetch_many(
+            ["EUR_USD", "GBP_USD"], ["5m"],
+            downloader=downloader, retry_delay=0.0
+        )
+
+
+def test_fetch_many_cached(tmp_path):
+    downloader = YahooDownloader()
+    FinancialFeed.fetch_many(
+        ["EUR_USD"], ["5m"], str(tmp_path), downloader=downloader
+    )
+    feeds = FinancialFeed.fetch_many(
+        ["EUR_USD"], ["5m"], str(tmp_path), downloader=downloader
+    )
+
+    feed = downloader.feed("EURUSD=X", "5m")
+    assert len(feeds[("EUR_USD", "5m")]) == len(feed)
+    # Only the bars since the last cached one are requested
+    assert downloader.downloads[1][1] == feed.index[-1].date()
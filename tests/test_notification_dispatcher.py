@@ -0,0 +1,83 @@
+# Libraries
+from threading import Event
+import time
+
+# Locals
+from oandatradingbot.utils.notification_dispatcher import \
+    NotificationDispatcher
+
+
+def test_submit_returns_immediately():
+    release = Event()
+    batches = []
+
+    def say(messages):
+        release.wait()
+        batches.append(messages)
+
+    dispatcher = NotificationDispatcher(coalesce_delay=1.0)
+    dispatcher.add_channel("tts", say)
+
+    for i in range(5):
+        assert dispatcher.submit("tts", f"Message {i}")
+    # Every submit returned while the handler cannot finish
+    assert batches == []
+
+    release.set()
+    dispatcher.close()
+    # Messages submitted together are sent together and in order
+    assert batches == [[f"Message {i}" for i in range(5)]]
+    assert dispatcher.sent == 5
+
+
+def test_channels():
+    received = {"tts": [], "telegram": []}
+    dispatcher = NotificationDispatcher(coalesce_delay=0.05)
+    dispatcher.add_channel("tts", received["tts"].extend)
+    dispatcher.add_channel("telegram", received["telegram"].extend)
+
+    assert dispatcher.submit("tts", "Buy order placed")
+    assert dispatcher.submit("telegram", 10)
+    assert dispatcher.submit("telegram", 20)
+    # Channel without handler
+    assert not dispatcher.submit("email", "Buy order placed")
+
+    dispatcher.close()
+    assert received == {"tts": ["Buy order placed"], "telegram": [10, 20]}
+    # Closed dispatcher
+    assert not dispatcher.submit("tts", "Buy order placed")
+
+
+def test_full_queue():
+    release = Event()
+    dispatcher = NotificationDispatcher(
+        max_size=2, coalesce_delay=0.0, put_timeout=0.01
+    )
+    dispatcher.add_channel("tts", lambda messages: release.wait())
+
+    # The handler is blocked, so only a few fit in the queue
+    results = [dispatcher.submit("tts", i) for i in range(6)]
+    release.set()
+    dispatcher.close()
+
+    assert results.count(False) == dispatcher.dropped
+    assert dispatcher.dropped >= 2
+    assert dispatcher.sent + dispatcher.dropped == 6
+
+
+def test_failing_handler():
+    received = []
+
+    def handler(items):
+        if items == ["fail"]:
+            raise ValueError("Cannot send")
+        received.extend(items)
+
+    dispatcher = NotificationDispatcher(coalesce_delay=0.0)
+    dispatcher.add_channel("telegram", handler)
+    dispatcher.submit("telegram", "fail")
+    time.sleep(0.05)
+    dispatcher.submit("telegram", "ok")
+    dispatcher.close()
+
+    assert received == ["ok"]
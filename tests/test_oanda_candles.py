@@ -0,0 +1,117 @@
+# Libraries
+import time
+
+# Packages
+import numpy as np
+import pandas as pd
+import pytest
+
+# Locals
+from oandatradingbot.utils.oanda_candles import OandaCandleLoader, \
+    RateLimiter, candles_frame, chunk_ranges
+from oandatradingbot.utils.oanda_client import OandaClient
+from tests.feeds import create_feed
+from tests.oanda_server import OandaServer, account_id
+
+M5 = {"timeframe": "Minutes", "compression": 5}
+
+
+@pytest.fixture
+def oanda():
+    with OandaServer(delay=0.02) as server:
+        server.add_candles("EUR_USD", "M5", create_feed(3, 3000))
+        yield server
+
+
+@pytest.fixture
+def client(oanda):
+    client = OandaClient(oanda.url, "token", account_id)
+    yield client
+    client.close()
+
+
+def test_chunk_ranges():
+    assert chunk_ranges(0, 1000, 60, 5) == [
+        (0, 300), (300, 600), (600, 900), (900, 1000)
+    ]
+    assert chunk_ranges(0, 0, 60) == []
+
+
+def test_candles_frame():
+    candles = [
+        {
+            "time": f"{1664800000 + 300 * i}.000000000",
+            "complete": i < 2,
+            "volume": 10 + i,
+            "mid": {"o": "1.1", "h": "1.2", "l": "1.0", "c": "1.15"},
+            "bid": {"o": "1.0", "h": "1.1", "l": "0.9", "c": "1.05"},
+        }
+        for i in range(3)
+    ]
+    feed = candles_frame(candles, "MB")
+    # The incomplete candle is left out
+    assert len(feed) == 2
+    assert list(feed.columns) == [
+        "Open", "High", "Low", "Close",
+        "Bid Open", "Bid High", "Bid Low", "Bid Close", "Volume"
+    ]
+    assert feed.index[1] == pd.Timestamp(1664800300, unit="s", tz="UTC")
+    assert feed["Close"].iloc[0] == 1.15
+    assert feed["Volume"].tolist() == [10, 11]
+    # The bid prices are the bars of a B price
+    assert list(candles_frame(candles, "B")["Open"]) == [1.0, 1.0]
+
+
+def test_load_chunks(oanda, client):
+    feed = create_feed(3, 3000)
+    loader = OandaCandleLoader(client, chunk=500)
+    loaded = loader.load(
+        "EUR_USD", M5, feed.index[100], feed.index[2900], price="MBA"
+    )
+
+    assert len(oanda.candle_queries) == 6
+    assert oanda.max_running > 1
+    expected = feed.iloc[100:2900]
+    assert loaded.index.equals(expected.index)
+    np.testing.assert_allclose(loaded["Close"], expected["Close"], atol=1e-5)
+    np.testing.assert_allclose(
+        loaded["Ask Close"] - loaded["Bid Close"], 0.0002, atol=1e-5
+    )
+
+
+def test_load_cache(oanda, client, tmp_path):
+    feed = create_feed(3, 3000)
+    loader = OandaCandleLoader(client, str(tmp_path), chunk=500)
+    loader.load("EUR_USD", M5, feed.index[1000], feed.index[2000])
+    oanda.candle_queries.clear()
+
+    loaded = loader.load("EUR_USD", M5, feed.index[500], feed.index[2500])
+    assert loaded.index.equals(feed.index[500:2500])
+    # Only the bars out of the cached ones are requested
+    assert [
+        (int(query["from"]), int(query["to"]))
+        for query in sorted(oanda.candle_queries, key=lambda q: q["from"])
+    ] == [
+        (feed.index[500].timestamp(), feed.index[1000].timestamp()),
+        (feed.index[1999].timestamp(), feed.index[2499].timestamp()),
+        (feed.index[2499].timestamp(), feed.index[2500].timestamp()),
+    ]
+
+    oanda.candle_queries.clear()
+    loader.load("EUR_USD", M5, feed.index[600], feed.index[1900])
+    assert oanda.candle_queries == []
+
+
+def test_load_invalid_price(client):
+    with pytest.raises(SystemExit):
+        OandaCandleLoader(client).load(
+            "EUR_USD", M5, pd.Timestamp("2022-08-01"), price="X"
+        )
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.1
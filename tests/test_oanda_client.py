@@ -0,0 +1,138 @@
+# Libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Thread
+
+# Packages
+import pytest
+
+# Locals
+from oandatradingbot.utils.oanda_client import OandaClient, get_client
+
+account_id = "101-004-1234567-001"
+
+
+class OandaHandler(BaseHTTPRequestHandler):
+    # Number of 503 responses before answering the pricing and PUT requests
+    failures = 0
+    # Connections accepted by the server
+    connections = 0
+
+    def setup(self) -> None:
+        super().setup()
+        OandaHandler.connections += 1
+
+    def do_GET(self) -> None:
+        if self.path.startswith(f"/v3/accounts/{account_id}/pricing"):
+            if OandaHandler.failures > 0:
+                OandaHandler.failures -= 1
+                self._send(503, {})
+                return
+            self._send(200, {"prices": [{"closeoutAsk": "1.1"}]})
+        else:
+            self._send(404, {})
+
+    def do_PUT(self) -> None:
+        if OandaHandler.failures > 0:
+            OandaHandler.failures -= 1
+            self._send(503, {})
+            return
+        self._send(
+            200 if self.headers["Authorization"] == "Bearer token" else 401,
+            {}
+        )
+
+    def _send(self, status: int, body: dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OandaHandler)
+    # Keep-alive connections need HTTP/1.1
+    OandaHandler.protocol_version = "HTTP/1.1"
+    OandaHandler.failures = 0
+    OandaHandler.connections = 0
+    Thread(target=server.serve_forever, daemon=True).start()
+    client = OandaClient(
+        f"http://127.0.0.1:{server.server_port}", "token", account_id,
+        backoff=0
+    )
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_reused(client):
+    for _ in range(5):
+        response = client.get(f"{client.account_path}/pricing")
+        assert response.json()["prices"][0]["closeoutAsk"] == "1.1"
+    assert OandaHandler.connections == 1
+
+
+def test_retry(client):
+    OandaHandler.failures = 2
+    response = client.get(
+        f"{client.account_path}/pricing", params={"instruments": "EUR_USD"}
+    )
+    assert response.status_code == 200
+    assert OandaHandler.failures == 0
+
+    # Retries exhausted, the last response is returned
+    OandaHandler.failures = 10
+    assert client.get(f"{client.account_path}/pricing").status_code == 503
+
+
+def test_put_retry(client):
+    # The close may have been done before the error
+    OandaHandler.failures = 1
+    assert client.put(f"{client.account_path}/trades/12/close") \
+        .status_code == 503
+    assert OandaHandler.failures == 0
+
+    OandaHandler.failures = 2
+    assert client.put(
+        f"{client.account_path}/trades/12/close", retry=True
+    ).status_code == 200
+    assert OandaHandler.failures == 0
+
+
+def test_latency_metrics(client):
+    client.get(f"{client.account_path}/pricing")
+    client.put(f"{client.account_path}/trades/12/close")
+    client.put(f"{client.account_path}/trades/13/close")
+    client.get(f"{client.account_path}/transactions/1")
+
+    latencies = client.latency_summary()
+    assert set(latencies) == {
+        "GET /v3/accounts/{accountID}/pricing",
+        "PUT /v3/accounts/{accountID}/trades/{id}/close",
+        "GET /v3/accounts/{accountID}/transactions/{id}",
+    }
+    assert latencies["PUT /v3/accounts/{accountID}/trades/{id}/close"][
+        "requests"] == 2
+    assert latencies["GET /v3/accounts/{accountID}/pricing"]["errors"] == 0
+    assert latencies["GET /v3/accounts/{accountID}/transactions/{id}"][
+        "errors"] == 1
+
+
+def test_get_client():
+    config = {
+        "practice": True,
+        "oanda_token": "token",
+        "oanda_account_id": account_id,
+        "oanda_read_timeout": 2.5,
+    }
+    client = get_client(config)
+    assert get_client(config) is client
+    assert client.timeout == (5.0, 2.5)
+    assert get_client({**config, "practice": False}) is not client
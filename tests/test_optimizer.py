@@ -1,12 +1,24 @@
 # Libraries
+import json
 import os
 import shutil
 
 # Packages
 import pandas as pd
+import pytest
 
 # Locals
+from oandatradingbot.optimizer import engine as optimizer_engine
+from oandatradingbot.optimizer.engine import OptimizerEngine, \
+    create_cerebro, group_combinations, parameter_grid, parameter_values
 from oandatradingbot.optimizer.optimizer import main
+from oandatradingbot.optimizer.search import create_search
+from oandatradingbot.optimizer.walk_forward import WalkForward, \
+    walk_forward_folds
+from oandatradingbot.repository.repository import dispose_engines
+from oandatradingbot.strategies.macd_ema_atr_backtest import MacdEmaAtrBackTest
+from oandatradingbot.utils.feed_cache import compact_frame
+from tests.feeds import create_feed, create_higher_frame
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -91,3 +103,418 @@ def test_optimizer():
 
     # Remove the results folder within the tests folder
     shutil.rmtree(os.path.join(current_dir, "results"), ignore_errors=True)
+
+
+def test_group_combinations():
+    values = parameter_values(config["strategy_params"])
+    assert values["ema_period"] == [100, 120]
+    assert values["atr_distance"] == [3.0]
+    combinations = parameter_grid(values)
+    assert len(combinations) == 4
+
+    # One task per indicator parameters group
+    tasks = group_combinations(combinations, 1)
+    assert len(tasks) == 4
+    values["atr_distance"] = [1.5, 2.0, 3.0]
+    tasks = group_combinations(parameter_grid(values), 1)
+    assert len(tasks) == 4
+    assert all(len(task[1]) == 3 for task in tasks)
+    assert tasks[0][0] == {
+        "macd_fast_ema": 5,
+        "macd_slow_ema": 25,
+        "macd_signal_ema": 5,
+        "ema_period": 100,
+        "atr_period": 14,
+    }
+    # Groups are split when there are more workers than groups
+    tasks = group_combinations(parameter_grid(values), 8)
+    assert len(tasks) == 8
+
+
+def test_optimizer_engine():
+    opt_config = {
+        key: value for key, value in config.items()
+        if key != "strategy_params"
+    }
+    opt_config.update({
+        "optimize": True,
+        "debug": False,
+        "opt_name": "Optimization_engine",
+    })
+    os.makedirs(
+        os.path.join(current_dir, "results", "Optimization_engine"),
+        exist_ok=True
+    )
+    feeds = {}
+    for seed, instrument in enumerate(config["instruments"]):
+        feed = create_feed(seed + 15)
+        feeds[instrument] = [feed, create_higher_frame(feed)]
+    values = parameter_values(config["strategy_params"])
+    values["ema_period"] = [50]
+    values["atr_distance"] = [1.5, 3.0]
+    combinations = parameter_grid(values)
+
+    with OptimizerEngine(opt_config, feeds, workers=2) as engine:
+        results = engine.evaluate(combinations)
+        assert len(results) == len(combinations)
+        # Backtest over the last half of the history
+        assert len(engine.evaluate(combinations[:1], (0.5, 1.0))) == 1
+
+    with open(
+        os.path.join(
+            current_dir, "results", "Optimization_engine", "results.jsonl"
+        ), "r"
+    ) as file:
+        results = [json.loads(line) for line in file]
+    assert len(results) == len(combinations) + 1
+    assert results[-1]["Window"] == [0.5, 1.0]
+    assert results[-1]["Trades"] <= results[0]["Trades"]
+    assert sorted(
+        [res["Parameters"] for res in results[:-1]],
+        key=lambda p: (p["macd_fast_ema"], p["atr_distance"])
+    ) == combinations
+    for res in results[:-1]:
+        assert res["Window"] == [0.0, 1.0]
+        assert res["Name"].startswith("MACDEMAATR_")
+        assert res["Trades"] == res["Won"] + res["Lost"]
+
+    # Remove the results folder within the tests folder
+    shutil.rmtree(os.path.join(current_dir, "results"), ignore_errors=True)
+
+
+def test_optimizer_engine_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(optimizer_engine, "INDICATOR_CACHE_SIZE", 12)
+    opt_config = {
+        key: value for key, value in config.items()
+        if key != "strategy_params"
+    }
+    opt_config.update({
+        "results_path": str(tmp_path),
+        "instruments": ["EUR_USD"],
+        "optimize": True,
+        "debug": False,
+        "opt_name": "Optimization_engine",
+    })
+    (tmp_path / "Optimization_engine").mkdir()
+    feed = create_feed(15)
+    feeds = {"EUR_USD": [feed, create_higher_frame(feed)]}
+    values = parameter_values(config["strategy_params"])
+    values["ema_period"] = [50]
+    combinations = parameter_grid(values)
+
+    with OptimizerEngine(opt_config, feeds) as engine:
+        engine.evaluate(combinations)
+        cache = optimizer_engine._worker["cache"]
+        misses = cache.misses
+        for start in [0.25, 0.5, 0.75]:
+            engine.evaluate(combinations, (start, 1.0))
+        # One bounded cache, whose signals are shared by every window
+        assert len(cache) == 12
+        assert cache.misses == misses
+
+
+def test_optimizer_engine_window_warm_up(tmp_path):
+    opt_config = {
+        key: value for key, value in config.items()
+        if key != "strategy_params"
+    }
+    opt_config.update({
+        "results_path": str(tmp_path),
+        "instruments": ["EUR_USD"],
+        "optimize": True,
+        "debug": False,
+        "opt_name": "Optimization_engine",
+        "run_id": "Optimization_engine",
+        "database_uri": f"sqlite:///{tmp_path / 'backtests.db'}",
+    })
+    (tmp_path / "Optimization_engine").mkdir()
+    feed = create_feed(15)
+    feeds = {"EUR_USD": [feed, create_higher_frame(feed)]}
+    values = parameter_values(config["strategy_params"])
+    values["macd_fast_ema"] = [5]
+    values["ema_period"] = [100]
+    combinations = parameter_grid(values)
+
+    with OptimizerEngine(opt_config, feeds) as engine:
+        engine.evaluate(combinations)
+        trades = sorted(
+            engine.repository.get_backtest_trades("Optimization_engine"),
+            key=lambda trade: trade.entry_time
+        )
+        # A trade entered right after the previous one exited, the window
+        # starts 30 bars before it
+        trade = next(
+            trade for previous, trade in zip(trades, trades[1:])
+            if (trade.entry_time - previous.exit_time).total_seconds()
+            > 30 * 5 * 60
+        )
+        entry = pd.Timestamp(trade.entry_time, tz="UTC")
+        start = entry - pd.Timedelta(minutes=30 * 5)
+        window = (
+            (start - feed.index[0]) / (feed.index[-1] - feed.index[0]), 1.0
+        )
+        results = engine.evaluate(combinations, window)
+        window_trades = [
+            trade for trade in
+            engine.repository.get_backtest_trades("Optimization_engine")
+            if trade.window != "0.00-1.00"
+        ]
+
+    assert results[0]["Trades"] == len(window_trades) > 0
+    # The indicators are warmed up by the bars before the window
+    assert min(trade.entry_time for trade in window_trades) \
+        == trade.entry_time
+    assert all(
+        pd.Timestamp(trade.entry_time, tz="UTC") >= start
+        for trade in window_trades
+    )
+    dispose_engines()
+
+
+class OptStrategyBackTest(MacdEmaAtrBackTest):
+    """The runs of optstrategy in the same process share the broker, which
+    keeps the cash of the previous run"""
+
+    def __init__(self, **kwargs):
+        self.broker.set_cash(kwargs["cash"])
+        super().__init__(**kwargs)
+
+
+def test_optimizer_engine_optstrategy(tmp_path):
+    opt_config = {
+        key: value for key, value in config.items()
+        if key != "strategy_params"
+    }
+    opt_config.update({
+        "results_path": str(tmp_path),
+        "instruments": ["EUR_USD"],
+        "optimize": True,
+        "debug": False,
+        "opt_name": "Optimization_engine",
+    })
+    (tmp_path / "Optimization_engine").mkdir()
+    feed = create_feed(15)
+    feeds = {"EUR_USD": [feed, create_higher_frame(feed)]}
+    values = parameter_values(config["strategy_params"])
+    values["macd_fast_ema"] = [5]
+    values["ema_period"] = [50]
+    values["atr_distance"] = [1.5, 2.0, 3.0]
+
+    with OptimizerEngine(opt_config, feeds) as engine:
+        results = engine.evaluate(parameter_grid(values))
+
+    # The same combinations backtested by backtrader's optstrategy
+    cerebro = create_cerebro(opt_config, feeds)
+    cerebro.optstrategy(
+        OptStrategyBackTest,
+        **{
+            key: [value] for key, value in opt_config.items()
+            if key not in values
+        },
+        **values
+    )
+    strategies = [
+        run[0] for run in cerebro.run(optreturn=False, maxcpus=1)
+    ]
+
+    assert len(results) == len(strategies) == 3
+    for result, strategy in zip(
+        sorted(results, key=lambda r: r["Parameters"]["atr_distance"]),
+        sorted(strategies, key=lambda s: s.p.atr_distance)
+    ):
+        assert result["Name"] == strategy.strat_name
+        assert result["Trades"] == strategy.optimization_results["Trades"]
+        assert result["Trades"] > 0
+        assert {
+            key: value for key, value in result.items()
+            if key not in ["Name", "Parameters", "Window"]
+        } == pytest.approx(strategy.optimization_results)
+
+
+def test_optimizer_engine_database(tmp_path):
+    opt_config = {
+        key: value for key, value in config.items()
+        if key != "strategy_params"
+    }
+    opt_config.update({
+        "results_path": str(tmp_path),
+        "optimize": True,
+        "debug": False,
+        "opt_name": "Optimization_engine",
+        "run_id": "Optimization_engine",
+        "database_uri": f"sqlite:///{tmp_path / 'backtests.db'}",
+    })
+    os.makedirs(tmp_path / "Optimization_engine")
+    feeds = {}
+    for seed, instrument in enumerate(config["instruments"]):
+        feed = create_feed(seed + 15)
+        feeds[instrument] = [feed, create_higher_frame(feed)]
+    values = parameter_values(config["strategy_params"])
+    values["ema_period"] = [50]
+    combinations = parameter_grid(values)
+
+    with OptimizerEngine(opt_config, feeds) as engine:
+        results = engine.evaluate(combinations, (0.5, 1.0))
+        trades = engine.repository.get_backtest_trades("Optimization_engine")
+
+    assert len(trades) == sum(result["Trades"] for result in results)
+    assert len(trades) > 0
+    assert {trade.strategy for trade in trades} == \
+        {result["Name"] for result in results}
+    assert {trade.window for trade in trades} == {"0.50-1.00"}
+    assert {
+        json.loads(trade.parameters)["macd_fast_ema"] for trade in trades
+    } == {5, 6}
+    # The trades are not written in the results file
+    with open(tmp_path / "Optimization_engine" / "results.jsonl") as file:
+        assert all("Trades list" not in json.loads(line) for line in file)
+    dispose_engines()
+
+
+class FakeEngine:
+    """Scores every combination without backtesting it, the best ones have
+    the highest macd_fast_ema and the lowest ema_period"""
+
+    workers = 2
+
+    def __init__(self):
+        self.evaluations = []
+
+    def evaluate(self, combinations, window=(0.0, 1.0)):
+        self.evaluations.append((len(combinations), window))
+        return [
+            {
+                "Name": str(params),
+                "Parameters": params,
+                "SQN": params["macd_fast_ema"] - params["ema_period"] / 10,
+                "Window": list(window),
+            }
+            for params in combinations
+        ]
+
+    def window_dates(self, window):
+        return tuple(f"{date:.2f}" for date in window)
+
+
+search_values = {
+    "macd_fast_ema": list(range(5, 15)),
+    "ema_period": list(range(100, 300, 10)),
+    "atr_distance": [1.5, 2.0, 2.5],
+}
+
+
+def test_grid_search():
+    engine = FakeEngine()
+    search = create_search(search_values, {})
+    assert search.size == 600
+    assert search.combination(1) == {
+        "macd_fast_ema": 5, "ema_period": 100, "atr_distance": 2.0
+    }
+    assert search.combination_index(search.combination(321)) == 321
+    assert len(search.run(engine)) == 600
+
+
+def test_random_search():
+    engine = FakeEngine()
+    search = create_search(
+        search_values, {"method": "random", "samples": 40, "seed": 1}
+    )
+    results = search.run(engine)
+    assert len(results) == 40
+    # Combinations are not repeated
+    assert len({search.combination_index(r["Parameters"]) for r in results}) \
+        == 40
+
+
+def test_halving_search():
+    engine = FakeEngine()
+    search = create_search(
+        search_values,
+        {"method": "halving", "min_fraction": 0.25, "eta": 4, "seed": 1}
+    )
+    results = search.run(engine)
+    assert engine.evaluations == [(600, (0.75, 1.0)), (150, (0.0, 1.0))]
+    assert len(results) == 150
+    best = search.rank(results)[0]["Parameters"]
+    assert best["macd_fast_ema"] == 14
+    assert best["ema_period"] == 100
+
+
+def test_tpe_search():
+    engine = FakeEngine()
+    search = create_search(
+        search_values, {"method": "tpe", "samples": 60, "seed": 1}
+    )
+    results = search.run(engine)
+    assert len(results) == 60
+    assert len({search.combination_index(r["Parameters"]) for r in results}) \
+        == 60
+    # The proposals after the random startup are better than random ones
+    startup = [r["SQN"] for r in results[:10]]
+    proposed = [r["SQN"] for r in results[10:]]
+    assert sum(proposed) / len(proposed) > sum(startup) / len(startup)
+
+
+def test_walk_forward_folds():
+    folds = walk_forward_folds(3, 0.6)
+    assert len(folds) == 3
+    assert folds[0][0][0] == 0.0
+    assert folds[-1][1][1] == 1.0
+    for (in_sample, out_of_sample), next_fold in zip(folds, folds[1:]):
+        # Out of sample windows follow the in sample ones and each other
+        assert in_sample[1] == out_of_sample[0]
+        assert out_of_sample[1] == pytest.approx(next_fold[1][0])
+        assert (in_sample[1] - in_sample[0]) / (
+            out_of_sample[1] - in_sample[0]
+        ) == pytest.approx(0.6)
+
+
+def test_walk_forward():
+    engine = FakeEngine()
+    folds = WalkForward(
+        search_values,
+        {"method": "random", "samples": 20, "seed": 1},
+        {"folds": 2, "in_sample": 0.5}
+    ).run(engine)
+
+    assert [fold["Fold"] for fold in folds] == [1, 2]
+    assert folds[0]["In sample"] == ("0.00", "0.33")
+    assert folds[0]["Out of sample"] == ("0.33", "0.67")
+    assert folds[1]["Out of sample"] == ("0.67", "1.00")
+    for fold in folds:
+        best = fold["In sample result"]
+        assert fold["Out of sample result"]["Parameters"] == \
+            best["Parameters"]
+    # 20 in sample and 1 out of sample backtests per fold
+    assert sorted(n for n, _ in engine.evaluations) == [1, 1, 20, 20]
+
+
+def test_optimizer_engine_compact(tmp_path):
+    opt_config = {
+        key: value for key, value in config.items()
+        if key != "strategy_params"
+    }
+    opt_config.update({
+        "results_path": str(tmp_path),
+        "optimize": True,
+        "debug": False,
+        "opt_name": "Optimization_compact",
+    })
+    (tmp_path / "Optimization_compact").mkdir()
+    feeds = {}
+    for seed, instrument in enumerate(config["instruments"]):
+        feed = compact_frame(create_feed(seed + 15))
+        feeds[instrument] = [feed, create_higher_frame(feed)]
+    values = parameter_values(config["strategy_params"])
+    values["ema_period"] = [50]
+    combinations = parameter_grid(values)
+
+    with OptimizerEngine(opt_config, feeds, workers=2) as engine:
+        assert all(
+            shared["dtype"] == "float32"
+            for frames in engine.shared.feeds for shared in frames
+        )
+        results = engine.evaluate(combinations)
+
+    assert len(results) == len(combinations)
+    assert all(result["Trades"] > 0 for result in results)
@@ -0,0 +1,90 @@
+# Libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import time
+from threading import Thread
+
+# Locals
+from oandatradingbot.utils.instrument_manager import use_price_stream
+from oandatradingbot.utils.oanda_client import OandaClient
+from oandatradingbot.utils.price_cache import PriceCache, replay_prices, \
+    stream_prices
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+prices_file = os.path.join(current_dir, "prices.jsonl")
+account_id = "101-004-1234567-001"
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """Pricing stream replaying the recorded prices"""
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.end_headers()
+        with open(prices_file, "rb") as file:
+            for line in file:
+                self.wfile.write(line)
+                self.wfile.flush()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_price_cache():
+    cache = PriceCache(max_age=0.2)
+    assert cache.get_ask("EUR_USD") is None
+
+    assert not cache.update({"type": "HEARTBEAT", "time": ""})
+    assert cache.update({
+        "type": "PRICE",
+        "instrument": "EUR_USD",
+        "time": "2022-10-04T11:30:00.084213532Z",
+        "closeoutBid": "0.99812",
+        "closeoutAsk": "0.99826",
+    })
+    assert cache.get_bid("EUR_USD") == 0.99812
+    assert cache.get_ask("EUR_USD") == 0.99826
+
+    # Stale prices are not returned
+    time.sleep(0.3)
+    assert cache.get("EUR_USD") is None
+
+
+def test_replay_prices():
+    cache = PriceCache()
+    cache.start(lambda: replay_prices(prices_file), reconnect=False)
+    cache.thread.join(5)
+
+    assert cache.get_ask("EUR_USD") == 0.99829
+    assert cache.get_bid("EUR_GBP") == 0.87095
+    assert cache.get("EUR_GBP")["time"] == "2022-10-04T11:30:00.291844717Z"
+
+
+def test_stream_prices():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    client = OandaClient(
+        f"http://127.0.0.1:{server.server_port}", "token", account_id
+    )
+    cache = PriceCache()
+    cache.start(
+        lambda: stream_prices(client, ["EUR_USD", "EUR_GBP"]),
+        reconnect=False
+    )
+    cache.thread.join(5)
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+    assert cache.get_bid("EUR_USD") == 0.99815
+    assert cache.get_ask("EUR_GBP") == 0.87116
+
+
+def test_use_price_stream():
+    assert use_price_stream({})
+    assert use_price_stream({"testing": False})
+    # Test runs do not open the stream unless asked
+    assert not use_price_stream({"testing": True})
+    assert use_price_stream({"testing": True, "price_stream": True})
+    assert not use_price_stream({"price_stream": False})
@@ -0,0 +1,108 @@
+# Packages
+import pytest
+
+# Locals
+from oandatradingbot.utils import oanda_client
+from oandatradingbot.utils.order_manager import OrderManager
+from tests.oanda_server import OandaServer, account_id
+
+instruments = [
+    "EUR_USD", "EUR_GBP", "EUR_JPY", "EUR_CHF", "EUR_CAD",
+    "GBP_USD", "USD_JPY", "USD_CHF", "AUD_USD", "NZD_USD",
+]
+
+
+@pytest.fixture
+def oanda(monkeypatch):
+    with OandaServer(delay=0.05) as server:
+        monkeypatch.setattr(oanda_client, "practice_url", server.url)
+        yield server
+        oanda_client.close_clients()
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "database_uri": f"sqlite:///{tmp_path / 'test.db'}",
+        "oanda_token": "token",
+        "oanda_account_id": account_id,
+        "practice": True,
+        "language": "EN-US",
+        "instruments": instruments,
+        "account_currency": "EUR",
+        "account_type": "Demo",
+    }
+
+
+def test_recover_no_orders(oanda, config):
+    om = OrderManager(config)
+
+    assert om.recover_orders() == 0
+    assert om.trades_registry == {}
+
+
+def test_recover_orders(oanda, config):
+    # A buy and a sell trade of every instrument
+    for i, instrument in enumerate(instruments):
+        oanda.add_trade(100 + 10 * i, instrument, 1000)
+        oanda.add_trade(500 + 10 * i, instrument, -1000)
+
+    om = OrderManager(config)
+
+    # Fill transactions are requested concurrently
+    assert oanda.max_running > 1
+    assert len([r for r in oanda.requests if "/transactions/" in r]) == 20
+    assert len([r for r in oanda.requests if "/openTrades" in r]) == 1
+
+    for i, instrument in enumerate(instruments):
+        assert om.has_buyed(instrument)
+        assert om.has_selled(instrument)
+        buy = om.orders["BUY"][instrument]
+        assert buy["MK"]["id"] == str(100 + 10 * i)
+        assert buy["TK"]["tradeID"] == str(100 + 10 * i)
+        assert buy["TK"]["price"] == "1.10200"
+        assert buy["SL"]["price"] == "1.09800"
+        sell = om.orders["SELL"][instrument]
+        assert sell["MK"]["id"] == str(500 + 10 * i)
+        assert sell["SL"]["price"] == "1.10200"
+
+    # Recovered orders are not registered twice
+    assert om.recover_orders() == 40
+    assert len(om.trades_registry) == 20
+
+
+def test_cancel_pending_trades(oanda, config):
+    assert OrderManager(config).cancel_pending_trades() == {}
+
+    for i, instrument in enumerate(instruments):
+        oanda.add_trade(100 + 10 * i, instrument, 1000)
+        oanda.add_trade(500 + 10 * i, instrument, -1000)
+    om = OrderManager(config)
+    oanda.requests.clear()
+    oanda.max_running = 0
+
+    closed = om.cancel_pending_trades()
+
+    assert len(closed) == 20
+    assert all(closed.values())
+    assert oanda.trades == []
+    # One request per position, closed concurrently
+    assert len([r for r in oanda.requests if r.endswith("/close")]) == 10
+    assert oanda.max_running > 1
+
+
+def test_cancel_pending_trades_position_fails(oanda, config):
+    oanda.add_trade(100, "EUR_USD", 1000)
+    oanda.add_trade(200, "EUR_USD", -1000)
+    oanda.add_trade(300, "EUR_GBP", 1000)
+    om = OrderManager(config)
+    oanda.failing_positions.add("EUR_USD")
+    oanda.requests.clear()
+
+    closed = om.cancel_pending_trades()
+
+    # The EUR_USD trades are closed one by one
+    assert closed == {"100": True, "200": True, "300": True}
+    assert oanda.trades == []
+    assert f"PUT /v3/accounts/{account_id}/trades/100/close" in oanda.requests
+    assert f"PUT /v3/accounts/{account_id}/trades/200/close" in oanda.requests
@@ -0,0 +1,240 @@
+# Libraries
+import os
+
+# Packages
+import backtrader as bt
+import numpy as np
+import pytest
+
+# Locals
+from oandatradingbot.strategies.indicator_cache import IndicatorCache
+from oandatradingbot.strategies.macd_ema_atr_backtest import MacdEmaAtrBackTest
+from oandatradingbot.strategies.macd_ema_atr_signals \
+    import MacdEmaAtrSignals, rolling_slope
+from oandatradingbot.strategies.rolling_slope import RollingSlope
+from oandatradingbot.utils.array_feed import ArrayData, arrays_from_frame
+from oandatradingbot.utils.feed_cache import compact_frame
+from tests.feeds import create_feed, create_higher_frame
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+config = {
+    "results_path": os.path.join(current_dir, "results"),
+    "instruments": ["EUR_USD"],
+    "cash": 10000,
+    "risk": 1,
+    "account_currency": "EUR",
+    "language": "EN-US",
+    "optimize": False,
+    "debug": False,
+    "macd_fast_ema": 5,
+    "macd_slow_ema": 26,
+    "macd_signal_ema": 8,
+    "ema_period": 50,
+    "atr_period": 14,
+    "atr_distance": 1.5,
+    "profit_risk_ratio": 1.5,
+}
+
+
+class ParityStrategy(MacdEmaAtrBackTest):
+    def next(self) -> None:
+        for instrument in self.instruments:
+            self.vectorized.append((
+                self.enter_buy_signal(instrument),
+                self.enter_sell_signal(instrument)
+            ))
+            self.per_bar.append((
+                self.check_buy_signal(instrument),
+                self.check_sell_signal(instrument)
+            ))
+
+    def stop(self) -> None:
+        pass
+
+
+def create_data(feed, arrays: bool):
+    if arrays:
+        return ArrayData(dataname=arrays_from_frame(feed))
+    return bt.feeds.PandasData(dataname=feed)
+
+
+def run_parity_strategy(
+    seed: int, timeframes: int, arrays: bool = False
+) -> ParityStrategy:
+    feed = create_feed(seed)
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.resampledata(
+        create_data(feed, arrays),
+        name="EUR_USD",
+        timeframe=bt.TimeFrame.Minutes,
+        compression=5
+    )
+    tframes = [{"timeframe": "Minutes", "compression": 5, "interval": "5m"}]
+    if timeframes > 1:
+        cerebro.resampledata(
+            create_data(create_higher_frame(feed), arrays),
+            name="EUR_USDt60",
+            timeframe=bt.TimeFrame.Minutes,
+            compression=60
+        )
+        tframes.append(
+            {"timeframe": "Minutes", "compression": 60, "interval": "60m"}
+        )
+    kwargs = dict(config, timeframes=tframes)
+    kwargs["config"] = kwargs
+    cerebro.addstrategy(ParityStrategy, **kwargs)
+    strategy: ParityStrategy = cerebro.run()[0]
+    return strategy
+
+
+@pytest.mark.parametrize("arrays", [False, True])
+@pytest.mark.parametrize("timeframes", [1, 2])
+def test_vectorized_signals_parity(timeframes, arrays):
+    ParityStrategy.vectorized = []
+    ParityStrategy.per_bar = []
+    strategy = run_parity_strategy(17, timeframes, arrays)
+
+    # The precomputed signals have been used during the whole backtest
+    assert "EUR_USD" in strategy.signals
+    assert strategy.vectorized == strategy.per_bar
+    # The feed has bars meeting the buy and sell conditions
+    assert strategy.signals["EUR_USD"].buy.any()
+    assert strategy.signals["EUR_USD"].sell.any()
+
+
+def test_rolling_slope():
+    values = np.cumsum(np.random.default_rng(1).normal(size=50))
+    slope = rolling_slope(values, 10)
+
+    assert np.isnan(slope[:9]).all()
+    for i in range(9, values.size):
+        expected, _ = np.polyfit(np.arange(10), values[i - 9:i + 1], 1)
+        assert slope[i] == pytest.approx(expected)
+
+
+class SlopeStrategy(bt.Strategy):
+    def __init__(self) -> None:
+        self.slope = RollingSlope(self.data.close, period=10, resync=50)
+        self.slopes = []
+        self.expected = []
+
+    def next(self) -> None:
+        self.slopes.append(self.slope.slope[0])
+        expected, _ = np.polyfit(
+            np.arange(10), self.data.close.get(size=10), 1
+        )
+        self.expected.append(expected)
+
+
+@pytest.mark.parametrize("runonce", [True, False])
+def test_rolling_slope_indicator(runonce):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+    cerebro.adddata(bt.feeds.PandasData(dataname=create_feed(3, 500)))
+    cerebro.addstrategy(SlopeStrategy)
+    strategy: SlopeStrategy = cerebro.run()[0]
+
+    assert len(strategy.slopes) == 491
+    assert strategy.slopes == pytest.approx(strategy.expected, abs=1e-12)
+
+
+def test_indicator_cache():
+    cache = IndicatorCache(maxsize=2)
+    values = cache.get(("EUR_USD", "5m", "ema", (10,)), lambda: np.ones(5))
+    assert cache.misses == 1
+    # Cached arrays are shared so they cannot be modified
+    with pytest.raises(ValueError):
+        values[0] = 2
+    assert cache.get(
+        ("EUR_USD", "5m", "ema", (10,)), lambda: np.zeros(5)
+    ) is values
+    assert cache.hits == 1
+
+    cache.get(("EUR_USD", "5m", "ema", (20,)), lambda: np.ones(5))
+    cache.get(("EUR_USD", "5m", "ema", (10,)), lambda: np.ones(5))
+    cache.get(("EUR_USD", "5m", "atr", (14,)), lambda: np.ones(5))
+    # The least recently used array has been evicted
+    assert len(cache) == 2
+    assert ("EUR_USD", "5m", "ema", (20,)) not in cache
+    assert ("EUR_USD", "5m", "ema", (10,)) in cache
+
+
+def test_cached_signals():
+    feed = create_feed(17)
+    higher_frame = create_higher_frame(feed)
+    arrays = [feed["High"].values, feed["Low"].values, feed["Close"].values]
+    cache = IndicatorCache()
+
+    for atr_period, ema_period in ((14, 50), (14, 100), (20, 50)):
+        params = [5, 26, 8, ema_period, atr_period]
+        signals = MacdEmaAtrSignals(
+            *arrays, *params, higher_frame["Close"].values
+        )
+        cached = MacdEmaAtrSignals(
+            *arrays,
+            *params,
+            higher_frame["Close"].values,
+            cache,
+            "EUR_USD",
+            ("5m", "60m")
+        )
+        assert np.array_equal(signals.buy, cached.buy)
+        assert np.array_equal(signals.sell, cached.sell)
+        assert np.array_equal(signals.atr, cached.atr, equal_nan=True)
+
+    # Only the EMA and its slope or the ATR change with their periods
+    assert cache.hits == 7 + 8
+    assert cache.misses == 9 + 2 + 1
+
+
+def test_compact_signals():
+    feed = create_feed(17)
+    compact = compact_frame(feed)
+    higher_frame = create_higher_frame(feed)
+    params = [5, 26, 8, 50, 14]
+
+    signals = MacdEmaAtrSignals(
+        *(feed[col].values for col in ("High", "Low", "Close")),
+        *params,
+        higher_frame["Close"].values
+    )
+    compact_signals = MacdEmaAtrSignals(
+        *(compact[col].values for col in ("High", "Low", "Close")),
+        *params,
+        compact_frame(higher_frame)["Close"].values
+    )
+
+    assert compact_signals.atr.dtype == np.float32
+    assert compact_signals.ema.nbytes == signals.ema.nbytes // 2
+    assert np.allclose(
+        compact_signals.ema, signals.ema, rtol=1e-6, equal_nan=True
+    )
+    assert np.allclose(
+        compact_signals.atr, signals.atr, rtol=1e-4, equal_nan=True
+    )
+    assert np.array_equal(compact_signals.buy, signals.buy)
+    assert np.array_equal(compact_signals.sell, signals.sell)
+
+
+def test_window_signals():
+    feed = create_feed(17)
+    higher_frame = create_higher_frame(feed)
+    signals = MacdEmaAtrSignals(
+        feed["High"].values,
+        feed["Low"].values,
+        feed["Close"].values,
+        12, 26, 9, 200, 14,
+        higher_frame["Close"].values
+    )
+    window = signals.window(3000, 250)
+
+    # The signals of the window are the ones of the whole feed
+    assert np.array_equal(window.buy, signals.buy[3000:])
+    assert np.array_equal(window.atr, signals.atr[3000:])
+    assert window.enter_sell_signal(10, 1) \
+        == signals.enter_sell_signal(3010, 251)
+    assert np.array_equal(
+        window.bullish_higher_frame, signals.bullish_higher_frame[250:]
+    )
+    assert np.shares_memory(window.close, signals.close)
+    assert signals.buy.size == feed.shape[0]
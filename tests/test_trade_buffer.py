@@ -0,0 +1,75 @@
+# Libraries
+import time
+
+# Locals
+from oandatradingbot.repository.repository import Repository, \
+    dispose_engines
+from oandatradingbot.repository.trade_buffer import TradeBuffer
+from tests.trades import trade1, trade2, trade3, trade4
+
+
+def test_flush_on_size(tmp_path):
+    repository = Repository(f"sqlite:///{tmp_path / 'test.db'}")
+    saved = []
+    buffer = TradeBuffer(
+        repository, str(tmp_path / "journal.jsonl"), max_size=3,
+        max_delay=60, on_flush=saved.extend
+    )
+
+    buffer.add(trade1)
+    buffer.add(trade2)
+    assert repository.get_trade(1) is None
+    start = repository.metrics.total
+    buffer.add(trade3)
+
+    # A select of the saved ids and a single insert
+    assert repository.metrics.total - start == 2
+    assert repository.metrics.summary()["INSERT"]["queries"] == 1
+    assert [trade["id"] for trade in saved] == [1, 2, 3]
+    assert repository.get_trade(3) is not None
+    assert (tmp_path / "journal.jsonl").read_text() == ""
+
+    buffer.add(trade4)
+    buffer.close()
+    assert repository.get_trade(4) is not None
+    dispose_engines()
+
+
+def test_flush_on_delay(tmp_path):
+    repository = Repository(f"sqlite:///{tmp_path / 'test.db'}")
+    buffer = TradeBuffer(
+        repository, str(tmp_path / "journal.jsonl"), max_delay=0.05
+    )
+
+    buffer.add(trade1)
+    time.sleep(0.2)
+
+    assert repository.get_trade(1) is not None
+    buffer.close()
+    dispose_engines()
+
+
+def test_recover_journal(tmp_path):
+    repository = Repository(f"sqlite:///{tmp_path / 'test.db'}")
+    journal = str(tmp_path / "journal.jsonl")
+    buffer = TradeBuffer(repository, journal, max_delay=60)
+    buffer.add(trade1)
+    buffer.add(trade2)
+    # Crash: the trades are only in the journal, the last line incomplete
+    buffer.stopped.set()
+    with open(journal, "a") as file:
+        file.write('{"id": 3, "instru')
+    repository.save_trade(trade1)
+
+    saved = []
+    buffer = TradeBuffer(
+        repository, journal, max_delay=60, on_flush=saved.extend
+    )
+
+    # The trade saved before the crash is not notified again
+    assert [trade["id"] for trade in saved] == [2]
+    assert repository.get_trade(2).entry_time == trade2["entry_time"]
+    assert repository.get_trade(3) is None
+    assert open(journal).read() == ""
+    buffer.close()
+    dispose_engines()
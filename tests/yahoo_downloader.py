@@ -0,0 +1,59 @@
+# Libraries
+from datetime import date
+from threading import Lock
+import time
+from typing import Dict, List, Tuple
+
+# Packages
+import pandas as pd
+
+# Locals
+from tests.feeds import create_feed
+
+
+class YahooDownloader:
+    """Local stand-in of the Yahoo Finance downloads serving random walk
+    feeds. Every download waits ``delay`` seconds to simulate the network
+    latency, and the first ``failures[ticker]`` downloads of a ticker
+    fail.
+    """
+
+    def __init__(
+        self, delay: float = 0.0, failures: Dict[str, int] = {}
+    ) -> None:
+        self.delay = delay
+        self.failures = dict(failures)
+        self.feeds: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self.downloads: List[Tuple[str, date, str]] = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = Lock()
+
+    def feed(self, ticker: str, interval: str) -> pd.DataFrame:
+        with self.lock:
+            if (ticker, interval) not in self.feeds:
+                feed = create_feed(len(self.feeds), 500)
+                # Up to date feed
+                feed.index += \
+                    pd.Timestamp.now("UTC").floor("5min") - feed.index[-1]
+                self.feeds[(ticker, interval)] = feed
+            return self.feeds[(ticker, interval)]
+
+    def __call__(
+        self, ticker: str, start: date, end: date, interval: str
+    ) -> pd.DataFrame:
+        with self.lock:
+            self.downloads.append((ticker, start, interval))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            failing = self.failures.get(ticker, 0) > 0
+            if failing:
+                self.failures[ticker] -= 1
+        try:
+            time.sleep(self.delay)
+            if failing:
+                raise ConnectionError("Connection reset by peer")
+            return self.feed(ticker, interval)
+        finally:
+            with self.lock:
+                self.running -= 1